@@ -0,0 +1,3 @@
+# -*- coding: utf8 -*-
+from .runner import BENCHMARKS, compare_results, load_results, run_benchmarks, save_results
+from . import suite  # registers the benchmarks
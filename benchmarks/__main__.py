@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import sys
+from argparse import ArgumentParser
+from terminaltables import SingleTable
+
+from benchmarks import BENCHMARKS, compare_results, load_results, run_benchmarks, save_results
+from benchmarks.runner import BENCHMARK_REPEAT, BENCHMARK_TOLERANCE, get_results_file
+
+
+def main(argv=None):
+    parser = ArgumentParser(prog="python -m benchmarks", description="Benchmark the Python hot paths of the RPL "
+                                                                     "Attacks Framework on synthetic fixtures.")
+    parser.add_argument('patterns', nargs='*', help="run only the benchmarks whose name contains one of these "
+                                                     "substrings (among {})".format(', '.join(BENCHMARKS.keys())))
+    parser.add_argument('-q', '--quick', action='store_true', help="only run each benchmark with its smallest size")
+    parser.add_argument('-r', '--repeat', type=int, default=BENCHMARK_REPEAT,
+                        help="timings per benchmark [default: {}]".format(BENCHMARK_REPEAT))
+    parser.add_argument('-b', '--baseline', default='baseline',
+                        help="results to compare with ('baseline', 'last' or a path to a JSON file) "
+                             "[default: baseline]")
+    parser.add_argument('-t', '--tolerance', type=float, default=BENCHMARK_TOLERANCE,
+                        help="relative slowdown reported as a regression [default: {}]".format(BENCHMARK_TOLERANCE))
+    parser.add_argument('-s', '--save-baseline', action='store_true', help="save the results as the new baseline")
+    args = parser.parse_args(argv)
+    if args.repeat < 1 or args.tolerance < 0:
+        parser.print_usage()
+        return 2
+    # the baseline is loaded before the results of this run are saved, as it may be the last results
+    baseline = load_results(args.baseline)
+
+    def report(key, result):
+        print(" > {}: {:.4f}s (min: {:.4f}s)".format(key, result['median'], result['min']))
+    results = run_benchmarks(args.patterns, args.quick, args.repeat, report)
+    if len(results) == 0:
+        print("No benchmark matches {}".format(', '.join(args.patterns)))
+        return 2
+    save_results(results, 'last')
+    data, regressions, overruns = [['Benchmark', 'Median (s)', 'Baseline (s)', 'Ratio', 'Status']], 0, 0
+    for key, median, reference, ratio, status in compare_results(results, baseline, args.tolerance):
+        data.append([key, '{:.4f}'.format(median), '-' if reference is None else '{:.4f}'.format(reference),
+                     '-' if ratio is None else '{:.2f}'.format(ratio), status])
+        regressions += status == 'slower'
+        overruns += status == 'over budget'
+    print(SingleTable(data, 'Benchmarks (tolerance: {:.0%})'.format(args.tolerance)).table)
+    if args.save_baseline or baseline is None and args.baseline == 'baseline':
+        print("Results saved as the baseline to '{}'".format(save_results(results, 'baseline')))
+    elif regressions > 0:
+        print("{} benchmark(s) slower than the baseline ('{}')".format(regressions, get_results_file(args.baseline)))
+        return 1
+    if overruns > 0:
+        print("{} benchmark(s) over their time budget".format(overruns))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
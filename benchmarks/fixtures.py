@@ -0,0 +1,194 @@
+# -*- coding: utf8 -*-
+from copy import deepcopy
+from jinja2 import Environment, FileSystemLoader
+from math import ceil, sqrt
+from os.path import join
+
+from core.common.helpers import copy_files
+from core.conf.constants import EXPERIMENT_STRUCTURE, MAX_DIST_BETWEEN_MOTES, MIN_DIST_BETWEEN_MOTES, \
+                                TEMPLATES, TEMPLATES_FOLDER
+from core.utils.rpla import check_structure, get_building_blocks, get_path, MoteRows, write_template
+
+
+FIXTURE_TARGET = 'z1'
+POWERTRACKER_SAMPLES = 100  # the simulation script takes 100 measures regardless the duration of the simulation
+
+
+def make_motes(n):
+    """
+    This function generates a WSN of 1 root, n legitimate motes and 1 malicious mote laid out on a grid, without
+     the cost of the topology generator.
+
+    :param n: number of legitimate motes
+    :return: the list of motes (formatted as the ones of generate_motes)
+    """
+    side, motes = int(ceil(sqrt(n + 2))), []
+    for i in range(n + 2):
+        motes.append({'id': i, 'type': 'root' if i == 0 else ('malicious' if i == n + 1 else 'sensor'),
+                      'x': float(i % side) * MIN_DIST_BETWEEN_MOTES,
+                      'y': float(i // side) * MIN_DIST_BETWEEN_MOTES, 'z': 0.})
+    return motes
+
+
+def make_parameters(n):
+    """
+    This function creates the parameters of an experiment with n legitimate motes, as validated_parameters does.
+
+    :param n: number of legitimate motes
+    :return: dictionary of parameters
+    """
+    return {
+        'title': 'Benchmark', 'goal': '', 'notes': '', 'duration': 600, 'n': n,
+        'target': FIXTURE_TARGET, 'malicious_target': FIXTURE_TARGET,
+        'tx_range': MAX_DIST_BETWEEN_MOTES, 'int_range': 2 * MAX_DIST_BETWEEN_MOTES,
+        'mtype_root': 'root-dummy', 'mtype_sensor': 'sensor-dummy', 'mtype_malicious': 'malicious-sensor',
+        'blocks': sorted(get_building_blocks().keys()), 'motes': make_motes(n), 'layout': None,
+    }
+
+
+def make_simulation(path, n):
+    """
+    This function renders the simulation file template with n legitimate motes.
+
+    :param path: folder where the simulation file is to be written
+    :param n: number of legitimate motes
+    :return: path to the simulation file
+    """
+    env = Environment(loader=FileSystemLoader(join(TEMPLATES_FOLDER, 'experiment')))
+    kwargs = deepcopy(TEMPLATES['simulation.csc'])
+    for mote_type in kwargs['mote_types']:
+        mote_type['target'] = FIXTURE_TARGET
+    kwargs.update(title='Benchmark', goal='', notes='', target=FIXTURE_TARGET,
+                  target_capitalized=FIXTURE_TARGET.capitalize(), malicious_target=FIXTURE_TARGET,
+                  malicious_target_capitalized=FIXTURE_TARGET.capitalize(),
+                  transmitting_range=MAX_DIST_BETWEEN_MOTES, interference_range=2 * MAX_DIST_BETWEEN_MOTES,
+                  motes=MoteRows(make_motes(n)))
+    write_template(path, env, 'simulation.csc', **kwargs)
+    return join(path, 'simulation.csc')
+
+
+def make_templates(path, params):
+    """
+    This function copies the templates of an experiment to its folder and creates its structure, as the 'make'
+     command does before rendering the templates.
+
+    :param path: experiment folder path
+    :param params: dictionary of parameters (see make_parameters)
+    """
+    check_structure(path, create=True)
+    templates = get_path(path, 'templates', create=True)
+    get_path(templates, 'motes', create=True)
+    copy_files((TEMPLATES_FOLDER, 'experiment'), templates,
+               ('motes/{}.c'.format(params["mtype_root"]), 'motes/root.c'),
+               ('motes/{}.c'.format(params["mtype_sensor"]), 'motes/sensor.c'),
+               ('motes/{}.c'.format(params["mtype_malicious"]), 'motes/malicious.c'),
+               'motes/Makefile', 'Makefile', 'simulation.csc', 'script.js')
+
+
+def make_source(path, name, lines, targets):
+    """
+    This function writes a C-like source file with the target lines spread among filler lines.
+
+    :param path: folder where the source file is to be written
+    :param name: filename
+    :param lines: number of filler lines
+    :param targets: list of the lines to be spread in the file
+    :return: path to the source file
+    """
+    step = max(1, lines // (len(targets) + 1))
+    with open(join(path, name), 'w') as f:
+        for i in range(lines):
+            if i > 0 and i % step == 0 and i // step <= len(targets):
+                f.write(targets[i // step - 1] + '\n')
+            f.write('  rpl_variable_{0} = rpl_function_{0}(dag, instance, {0});\n'.format(i))
+    return join(path, name)
+
+
+def make_contiki_rpl(path, lines):
+    """
+    This function creates a ContikiRPL-like library holding the source lines replaced by the building blocks.
+
+    :param path: folder where the library is to be created
+    :param lines: number of filler lines of each file
+    :return: dictionary of the replacements of the building blocks (see apply_replacements)
+    """
+    replacements = {}
+    for block in get_building_blocks().values():
+        for key, value in block.items():
+            if key.endswith('.c') or key.endswith('.h'):
+                replacements.setdefault(key, [])
+                replacements[key].extend(value if isinstance(value[0], list) else [value])
+    for filename, pairs in replacements.items():
+        make_source(path, filename, lines, [src for src, _ in pairs])
+    return replacements
+
+
+def make_powertracker_log(path, n, samples=POWERTRACKER_SAMPLES):
+    """
+    This function writes a PowerTracker log (to ./data) as the simulation script does, with the radio statistics
+     of n motes at each sample.
+
+    :param path: path to the experiment (including [with-|without-malicious])
+    :param n: number of motes
+    :param samples: number of samples
+    :return: path to the log
+    """
+    data = get_path(path, 'data', create=True)
+    prefix = FIXTURE_TARGET.capitalize()
+    with open(join(data, 'powertracker.log'), 'w') as f:
+        for s in range(1, samples + 1):
+            monitored = s * 6 * 10 ** 6
+            for mote_id in range(1, n + 1):
+                f.write('{}_{} MONITORED {} us\n'.format(prefix, mote_id, monitored))
+                for item, ratio in [('ON', 1.2), ('TX', .3), ('RX', .2), ('INT', .05)]:
+                    time = int(monitored * ratio / 100) + mote_id
+                    f.write('{}_{} {} {} us {:.2f} %\n'.format(prefix, mote_id, item, time, ratio))
+    return join(data, 'powertracker.log')
+
+
+def make_relationships_log(path, n, changes=100):
+    """
+    This function writes a relationships log (to ./data) where each of the n motes changes of parent several times.
+
+    :param path: path to the experiment (including [with-|without-malicious])
+    :param n: number of motes
+    :param changes: number of parent changes per mote
+    :return: path to the log
+    """
+    data = get_path(path, 'data', create=True)
+    with open(join(data, 'relationships.log'), 'w') as f:
+        for c in range(changes):
+            time = c * 10 ** 6
+            for mote_id in range(1, n + 1):
+                # the previous parent is removed (flag 0) then the new one is added (flag 1)
+                f.write('{}\tID:{}\t#L {} 0\n'.format(time, mote_id, (mote_id + c - 1) % n))
+                f.write('{}\tID:{}\t#L {} 1\n'.format(time + 1, mote_id, (mote_id + c) % n))
+    return join(data, 'relationships.log')
+
+
+def make_experiments(path, count):
+    """
+    This function creates experiment folders complying with the experiment structure, with their data and results.
+
+    :param path: folder where the experiments are to be created
+    :param count: number of experiments
+    :return: list of the paths to the experiments
+    """
+    def populate(folder, structure):
+        for name, item in structure.items():
+            if isinstance(item, dict):
+                subfolder = get_path(folder, name, create=True)
+                populate(subfolder, item if len(item) > 0 else {'output.pcap.gz': False, 'serial.log.gz': False})
+            elif name != '*':
+                with open(join(folder, name.replace('.*', '.c')), 'w') as f:
+                    f.write(name)
+        if structure.get('*'):
+            for name in ['powertracker.csv', 'pcap.csv.gz', 'dodag.png', 'report.json']:
+                with open(join(folder, name), 'w') as f:
+                    f.write(name)
+
+    paths = []
+    for i in range(count):
+        paths.append(get_path(path, 'experiment-{}'.format(i), create=True))
+        populate(paths[-1], EXPERIMENT_STRUCTURE)
+    return paths
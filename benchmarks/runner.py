@@ -0,0 +1,149 @@
+# -*- coding: utf8 -*-
+import gc
+import json
+import platform
+from collections import OrderedDict
+from os import makedirs, rename
+from os.path import exists, isdir, join
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import time
+from timeit import default_timer
+
+from core.conf.constants import BENCHMARKS_FOLDER
+
+
+BENCHMARK_REPEAT = 5
+BENCHMARK_TOLERANCE = .25  # relative slowdown beyond which a benchmark is reported as a regression
+BENCHMARKS = OrderedDict()
+
+
+def benchmark(name, sizes, budgets=None):
+    """
+    This decorator registers a benchmark. The decorated function prepares the fixtures of the given size in a
+     temporary folder and returns the function to be timed, or a tuple with this function and a function restoring
+     the fixtures before each timing (for benchmarks altering their fixtures).
+
+    :param name: name of the benchmark
+    :param sizes: list of the sizes the benchmark is run with (the first one is used for a quick run)
+    :param budgets: dictionary with sizes as keys and the maximum median times in seconds as values (e.g. for
+                    checking a goal regardless of the baseline)
+    :return: the decorator
+    """
+    def decorator(f):
+        BENCHMARKS[name] = {'setup': f, 'sizes': sizes, 'budgets': budgets or {}}
+        return f
+    return decorator
+
+
+def run_benchmarks(patterns=None, quick=False, repeat=BENCHMARK_REPEAT, report=None):
+    """
+    This function runs the registered benchmarks. Each one is timed several times (with the garbage collector
+     disabled, as timeit does) and its median and minimum times are kept.
+
+    :param patterns: list of substrings for selecting benchmarks by name (default: all the benchmarks)
+    :param quick: only run each benchmark with its smallest size
+    :param repeat: number of timings per benchmark and size
+    :param report: function called with the key of the benchmark (e.g. 'generate_motes[100]') and its result
+    :return: dictionary with the keys of the benchmarks as keys and their results as values
+    """
+    results = OrderedDict()
+    for name, bench in BENCHMARKS.items():
+        if patterns and not any(p in name for p in patterns):
+            continue
+        for size in bench['sizes'][:1] if quick else bench['sizes']:
+            key, folder = '{}[{}]'.format(name, size), mkdtemp(prefix='rpla-benchmark-')
+            try:
+                run, timings = bench['setup'](folder, size), []
+                run, reset = run if isinstance(run, tuple) else (run, None)
+                for _ in range(repeat):
+                    if reset is not None:
+                        reset()
+                    gc.collect()
+                    gc.disable()
+                    try:
+                        start = default_timer()
+                        run()
+                        timings.append(default_timer() - start)
+                    finally:
+                        gc.enable()
+            finally:
+                rmtree(folder, ignore_errors=True)
+            timings.sort()
+            results[key] = {'median': timings[len(timings) // 2], 'min': timings[0], 'repeat': repeat}
+            if size in bench['budgets']:
+                results[key]['budget'] = bench['budgets'][size]
+            if report is not None:
+                report(key, results[key])
+    return results
+
+
+def get_results_file(name):
+    """
+    This function gets the path to stored benchmark results.
+
+    :param name: 'last' for the results of the last run, 'baseline' for the reference results or a path to a JSON
+    :return: path to the JSON file
+    """
+    return join(BENCHMARKS_FOLDER, '{}.json'.format(name)) if name in ['last', 'baseline'] else name
+
+
+def save_results(results, name='last'):
+    """
+    This function stores benchmark results with the information about the interpreter and the machine.
+
+    :param results: dictionary of results (see run_benchmarks)
+    :param name: 'last', 'baseline' or a path to a JSON file
+    :return: path to the JSON file
+    """
+    path = get_results_file(name)
+    if name in ['last', 'baseline'] and not isdir(BENCHMARKS_FOLDER):
+        makedirs(BENCHMARKS_FOLDER)
+    with open(path + '.tmp', 'w') as f:
+        json.dump({'time': time(), 'python': platform.python_version(), 'machine': platform.platform(),
+                   'results': results}, f, indent=2)
+    rename(path + '.tmp', path)
+    return path
+
+
+def load_results(name='baseline'):
+    """
+    This function loads stored benchmark results.
+
+    :param name: 'last', 'baseline' or a path to a JSON file
+    :return: dictionary of results (see run_benchmarks) or None if they could not be loaded
+    """
+    path = get_results_file(name)
+    if not exists(path):
+        return
+    try:
+        with open(path) as f:
+            return json.load(f)['results']
+    except (IOError, OSError, ValueError, KeyError):
+        return
+
+
+def compare_results(results, baseline, tolerance=BENCHMARK_TOLERANCE):
+    """
+    This function compares benchmark results against reference results, based on their median times.
+
+    :param results: dictionary of results (see run_benchmarks)
+    :param baseline: dictionary of reference results
+    :param tolerance: relative change of the median time beyond which a benchmark is slower or faster
+    :return: list of tuples (key, median time, reference median time or None, ratio or None, status amongst 'new',
+              'same', 'slower', 'faster' and 'over budget')
+    """
+    comparison = []
+    for key, result in results.items():
+        reference = (baseline or {}).get(key)
+        if 'budget' in result and result['median'] > result['budget']:
+            comparison.append((key, result['median'], None if reference is None else reference['median'],
+                               None if reference is None else result['median'] / reference['median'], 'over budget'))
+            continue
+        if reference is None or reference['median'] <= 0:
+            comparison.append((key, result['median'], None, None, 'new'))
+            continue
+        ratio = result['median'] / reference['median']
+        status = 'slower' if ratio > 1 + tolerance else ('faster' if ratio < 1 / (1 + tolerance) else 'same')
+        comparison.append((key, result['median'], reference['median'], ratio, status))
+    return comparison
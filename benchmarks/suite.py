@@ -0,0 +1,96 @@
+# -*- coding: utf8 -*-
+from os.path import join
+
+from core.common.helpers import open_file, replace_in_file
+from core.common.wsngenerator import generate_motes
+from core.conf.constants import DEFAULTS
+from core.utils.parser import get_relationships, PowerTrackerConverter
+from core.utils.rpla import apply_replacements, check_structure, get_motes_from_simulation, get_path, \
+                            render_templates, set_motes_to_simulation
+
+from .fixtures import FIXTURE_TARGET, make_contiki_rpl, make_experiments, make_parameters, make_powertracker_log, \
+                      make_relationships_log, make_simulation, make_source, make_templates
+from .runner import benchmark
+
+
+# ************************************** TOPOLOGIES AND SIMULATION FILES **************************************
+# the connectivity check of 10k motes must not list all the pairs of motes within range (about 50M for rings)
+@benchmark('generate_motes', sizes=[10, 100, 1000, 10000], budgets={10000: 1.})
+def bench_generate_motes(path, n):
+    # the rings fill the default area with 1530 motes at most (see get_rings), hence a single larger area
+    return lambda: generate_motes(defaults=DEFAULTS, n=n, seed=1, max_range=400.)
+
+
+@benchmark('get_motes_from_simulation', sizes=[1000, 10000])
+def bench_get_motes_from_simulation(path, n):
+    simfile = make_simulation(path, n)
+    return lambda: get_motes_from_simulation(simfile)
+
+
+@benchmark('set_motes_to_simulation', sizes=[1000, 10000])
+def bench_set_motes_to_simulation(path, n):
+    simfile = make_simulation(path, n)
+    positions = get_motes_from_simulation(simfile)
+    # the motes are moved back and forth so that the simulation file is rewritten at each run
+    moves, state = [{i: (x + 1., y) for i, (x, y) in positions.items()}, positions], [0]
+
+    def run():
+        set_motes_to_simulation(simfile, moves[state[0]])
+        state[0] = 1 - state[0]
+    return run
+
+
+# ************************************** TEMPLATES AND REPLACEMENTS ***************************************
+@benchmark('render_templates', sizes=[100, 1000])
+def bench_render_templates(path, n):
+    params = make_parameters(n)
+    make_templates(path, params)
+    return lambda: render_templates(path, **params)
+
+
+@benchmark('replace_in_file', sizes=[1000, 10000])
+def bench_replace_in_file(path, lines):
+    source = make_source(path, 'rpl-icmp6.c', lines, ['dag->version;'])
+    # the line is replaced back and forth so that each run makes a replacement
+    replacements, state = [('dag->version;', 'dag->version++;'), ('dag->version++;', 'dag->version;')], [0]
+
+    def run():
+        replace_in_file(source, replacements[state[0]])
+        state[0] = 1 - state[0]
+    return run
+
+
+@benchmark('apply_replacements', sizes=[1000, 10000])
+def bench_apply_replacements(path, lines):
+    contiki_rpl = get_path(path, 'rpl', create=True)
+    replacements = make_contiki_rpl(contiki_rpl, lines)
+    # some replacements cannot be reverted (e.g. removed lines), thus the library is created again before each run
+    return lambda: apply_replacements(contiki_rpl, replacements), lambda: make_contiki_rpl(contiki_rpl, lines)
+
+
+# ******************************************** PARSERS *********************************************
+@benchmark('powertracker', sizes=[100, 1000])
+def bench_powertracker(path, n):
+    make_powertracker_log(path, n)
+
+    # same as convert_powertracker_log_to_csv, without looking up the platforms in Contiki
+    def run():
+        with open(join(path, 'powertracker.csv'), 'w') as f:
+            converter = PowerTrackerConverter(f, platforms=[FIXTURE_TARGET])
+            with open_file(join(path, 'data', 'powertracker.log')) as log:
+                for line in log:
+                    converter.feed(line)
+    return run
+
+
+@benchmark('relationships', sizes=[100, 1000])
+def bench_relationships(path, n):
+    make_relationships_log(path, n)
+    return lambda: get_relationships(path)
+
+
+# ******************************************* STRUCTURE ********************************************
+@benchmark('check_structure', sizes=[100, 500])
+def bench_check_structure(path, count):
+    experiments = make_experiments(path, count)
+    return lambda: [check_structure(e) for e in experiments]
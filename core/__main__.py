@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+from argparse import ArgumentParser
+
+from core.batch import BATCH_INTERVAL, EXIT_USAGE, run_campaign
+from core.conf.logconfig import LOG_LEVELS, set_logging
+from core.utils.profiling import PROFILE_KINDS
+from core.utils.scheduler import PIPELINE_STAGES
+
+
+def main(argv=None):
+    parser = ArgumentParser(prog="python -m core", description="Run the RPL Attacks Framework without console.")
+    commands = parser.add_subparsers(dest='command')
+    batch = commands.add_parser('run-campaign', help="make, run and parse a campaign of experiments, reporting its "
+                                                     "progress as JSON lines on the standard output")
+    batch.add_argument('exp_file', help="experiments JSON filename or basename")
+    batch.add_argument('-j', '--jobs', type=int, default=None, help="number of processes [default: number of CPU's]")
+    batch.add_argument('-s', '--stages', default=','.join(PIPELINE_STAGES),
+                       help="comma-separated stages among {} [default: all]".format(', '.join(PIPELINE_STAGES)))
+    batch.add_argument('-i', '--interval', type=float, default=BATCH_INTERVAL,
+                       help="seconds between progress events [default: {}]".format(BATCH_INTERVAL))
+    batch.add_argument('-p', '--profile', choices=PROFILE_KINDS, default=None,
+                       help="profile the stages and save the profiles in the experiments")
+    batch.add_argument('-l', '--loglevel', choices=sorted(LOG_LEVELS.keys()), default='info',
+                       help="log level of the messages on the standard error [default: info]")
+    args = parser.parse_args(argv)
+    if args.command != 'run-campaign':
+        parser.print_usage()
+        return EXIT_USAGE
+    stages = [s.strip() for s in args.stages.split(',') if s.strip() != '']
+    if len(stages) == 0 or any(s not in PIPELINE_STAGES for s in stages) or (args.jobs is not None and args.jobs < 1):
+        batch.print_usage()
+        return EXIT_USAGE
+    set_logging(args.loglevel)
+    # the standard output is kept for the events ; everything else written to it (by the commands, the workers and
+    #  their subprocesses) goes to the standard error
+    sys.stdout.flush()
+    events = os.fdopen(os.dup(1), 'w')
+    os.dup2(2, 1)
+    return run_campaign(args.exp_file, stages, args.jobs, args.interval, events, args.profile)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+import json
+import sys
+from multiprocessing import cpu_count
+from os.path import exists, expanduser, join
+from signal import signal, SIGTERM
+from threading import Lock
+from time import sleep, time
+
+from core.conf.constants import EXPERIMENT_FOLDER
+from core.conf.logconfig import logger
+from core.console import FrameworkConsole
+from core.utils.helpers import read_config
+from core.utils.rpla import get_experiments, prepare_campaign
+from core.utils.scheduler import Pipeline, PIPELINE_STAGES, schedule
+
+
+BATCH_INTERVAL = 10  # seconds between progress events
+EXIT_SUCCESS, EXIT_FAILURE, EXIT_USAGE, EXIT_INTERRUPTED = 0, 1, 2, 130
+
+
+class EventWriter(object):
+    """
+    This class writes the events of a batch as JSON lines (one object per line, with its 'event' type and 'time').
+
+    :param stream: file object the events are written to
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = Lock()
+
+    def __call__(self, event, **info):
+        info.update(event=event, time=round(time(), 3))
+        # events are emitted by the main thread and by the pool's callbacks
+        with self.lock:
+            self.stream.write(json.dumps(info, sort_keys=True) + '\n')
+            self.stream.flush()
+
+
+def get_progress(console):
+    """
+    This function gets the telemetry of the pending tasks of a console.
+
+    :param console: console instance (holding the pool of processes)
+    :return: list of dictionaries (one per task)
+    """
+    console.clean_tasks()
+    tasks = []
+    for task, _ in sorted(console.get_tasks('PENDING'), key=lambda x: str(x[0])):
+        telemetry = console.telemetry.get(str(task)) or {}
+        tasks.append({
+            'task': str(task),
+            'stage': telemetry.get('stage'),
+            'elapsed': round(time() - telemetry['started'], 1) if 'started' in telemetry else None,
+            'cpu': round(telemetry.get('cpu', 0.), 1),
+            'rss': telemetry.get('rss', 0),
+            'progress': telemetry.get('progress'),
+        })
+    return tasks
+
+
+def run_campaign(exp_file, stages=None, jobs=None, interval=BATCH_INTERVAL, stream=None, profile=None):
+    """
+    This function runs the stages of a campaign of experiments without console, in a pool of processes, as the
+     'pipeline' command does, and reports its progress as JSON lines until all the experiments are over.
+
+    Events : 'campaign' (start), 'stage' (a stage was submitted or is over, with its status and result), 'progress'
+     (periodic telemetry of the pending tasks), 'error' and 'finished' (counts of the succeeded and failed
+     experiments).
+
+    :param exp_file: experiments JSON filename or basename (absolute or relative path ; if no path provided,
+                     the JSON file is searched in the experiments folder)
+    :param stages: list of the stages to be run among 'make', 'run' and 'parse' (default: all)
+    :param jobs: number of processes of the pool (default: number of CPU's)
+    :param interval: time between progress events, in seconds
+    :param stream: file object the events are written to (default: standard output)
+    :param profile: 'cpu' or 'memory' for profiling the stages (see core.utils.profiling)
+    :return: exit code (0 if all the experiments succeeded, 1 if some failed, 2 for invalid arguments and 130 if
+             interrupted)
+    """
+    emit = EventWriter(stream or sys.stdout)
+    stages = [s for s in PIPELINE_STAGES if s in (stages or PIPELINE_STAGES)]
+    exp_file = expanduser(join(EXPERIMENT_FOLDER, exp_file))
+    if not exp_file.endswith('.json'):
+        exp_file += '.json'
+    if not exists(exp_file):
+        emit('error', message="Experiment campaign '{}' does not exist".format(exp_file))
+        return EXIT_USAGE
+    names = [n for n in (get_experiments(exp_file, silent=True) or {}).keys() if n != 'BASE']
+    if len(names) == 0:
+        emit('error', message="Experiment campaign '{}' has no experiment".format(exp_file))
+        return EXIT_USAGE
+    jobs = jobs or cpu_count()
+    console = FrameworkConsole(parallel=True, interactive=False, processes=jobs)
+    start, failed, done = time(), set(), set()
+
+    def listener(name, stage, status, result):
+        emit('stage', experiment=name, stage=stage, status=status, result=None if result is None else str(result))
+        if status not in ['PENDING', 'SUCCESS']:
+            failed.add(name)
+        elif status == 'SUCCESS' and stage == stages[-1]:
+            done.add(name)
+
+    def terminate(signum, frame):
+        raise KeyboardInterrupt
+    signal(SIGTERM, terminate)
+    try:
+        if 'make' in stages:
+            console.do_clean_all(exp_file, silent=True)
+            experiments = schedule(prepare_campaign(exp_file), stages, jobs)
+        else:
+            experiments = [(n, read_config(join(EXPERIMENT_FOLDER, n))) for n in names]
+            experiments = [(n, {}) for n, _ in schedule(experiments, stages, jobs)]
+        emit('campaign', file=exp_file, experiments=[n for n, _ in experiments], stages=stages, jobs=jobs)
+        pipeline = Pipeline(console, stages, listener, profile)
+        pipeline.start(experiments)
+        last = time()
+        while len(pipeline.pending) > 0:
+            sleep(.5)
+            if time() - last >= interval:
+                emit('progress', tasks=get_progress(console))
+                last = time()
+    except KeyboardInterrupt:
+        logger.info(" > Terminating opened tasks...")
+        for task, _ in console.get_tasks('PENDING'):
+            task.kill()
+        console.pool.terminate()
+        console.pool.join()
+        emit('finished', succeeded=len(done), failed=len(failed), interrupted=True, elapsed=round(time() - start, 1))
+        return EXIT_INTERRUPTED
+    except Exception as e:  # e.g. the campaign could not be prepared
+        emit('error', message="{}: {}".format(e.__class__.__name__, e))
+        console.pool.terminate()
+        return EXIT_FAILURE
+    emit('finished', succeeded=len(done), failed=len(failed), interrupted=False, elapsed=round(time() - start, 1))
+    return EXIT_SUCCESS if len(failed) == 0 and len(done) == len(experiments) else EXIT_FAILURE
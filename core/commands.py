@@ -9,19 +9,28 @@ from terminaltables import SingleTable
 from time import sleep
 
 from core.common.helpers import copy_files, copy_folder, move_files, remove_files, remove_folder, std_input
-from core.conf.constants import CONTIKI_FOLDER, COOJA_FOLDER, DEFAULTS, EXPERIMENT_FOLDER, FRAMEWORK_FOLDER, \
-                                SHORTCUT, TEMPLATES_FOLDER
+from core.conf.constants import CONTIKI_FOLDER, COOJA_FOLDER, EXPERIMENT_FOLDER, FRAMEWORK_FOLDER, \
+                                REPORTS_FOLDER, SHORTCUT, TEMPLATES_FOLDER
 from core.conf.install import check_cooja, modify_cooja, modify_ipv6_debug, register_new_path_in_profile, \
                               update_cooja_build, update_cooja_user_properties
 from core.conf.logconfig import logger, set_logging, HIDDEN_ALL
 from core.utils.behaviors import MultiprocessedCommand
-from core.utils.decorators import CommandMonitor, command, stderr
+from core.utils.catalog import query_catalog, remove_from_catalog, sync_catalog
+from core.utils.decorators import CommandMonitor, command, record_stage, stderr
 from core.utils.helpers import read_config, write_config
-from core.utils.parser import parsing_chain
-from core.utils.rpla import apply_debug_flags, apply_replacements, check_structure, generate_motes, \
-                            get_motes_from_simulation, set_motes_to_simulation, \
-                            get_contiki_includes, get_experiments, get_path, list_campaigns, list_experiments, \
+from core.utils.live import LiveParser
+from core.utils.parser import draw_plots, parsing_chain
+from core.utils.processes import local_group
+from core.utils.profiling import aggregate_cpu_profiles, aggregate_memory_profiles, get_profile_file, get_profiles, \
+                                 PROFILE_KINDS
+from core.utils.report import compare_experiment, report_campaign
+from core.utils.rpla import apply_debug_flags, apply_replacements, check_structure, compress_data, \
+                            get_motes_from_simulation, get_moved_motes, get_contiki_includes, get_experiments, \
+                            get_path, list_campaigns, list_experiments, prepare_campaign, propagate_motes, \
                             render_campaign, render_templates, validated_parameters
+from core.utils.scheduler import Pipeline, PIPELINE_STAGES, schedule
+from core.utils.telemetry import stage
+from core.utils.tracing import export_chrome_trace
 
 
 reuse_bin_path = None
@@ -68,6 +77,8 @@ The available parameters of the 'command' decorator are :
     :param start_msg: message to be displayed before calling 'f'
     :param reexec_on_emptyline: boolean indicating if the command is to be re-executed when an empty line is
                                  input in the console
+    :param local: boolean indicating if the command is to be run by the client instead of the daemon, as it requires
+                   the operator's terminal (like the commands with 'requires_sudo')
     :param __base__: special parameter to be used if the command is to be multi-processed, it holds the
                       "monitored" version of the command (that is, encapsulated inside a try-except)
 
@@ -122,17 +133,42 @@ def clean(name, ask=True, **kwargs):
     :param ask: ask confirmation
     """
     console = kwargs.get('console')
-    if console is None or not any([i['name'] == name and i['status'] == 'PENDING' for i in console.tasklist.values()]):
+    if console is None or not any([i['name'] == name for _, i in console.get_tasks('PENDING')]):
         logger.debug(" > Cleaning folder...")
         with hide(*HIDDEN_ALL):
             local("rm -rf {}".format(kwargs['path']))
+        remove_from_catalog(name)
+
+
+def __compare(name, **kwargs):
+    """
+    Compare the simulations with and without the malicious mote of an experiment.
+
+    :param name: experiment name
+    :param path: expanded path of the experiment (dynamically filled in through 'command' decorator with 'expand'
+    """
+    set_logging(kwargs.get('loglevel'))
+    summary = compare_experiment(kwargs['path'])['summary']
+    return "TX delta: {:+.3f}s, RPL overhead delta: {:+d}B".format(summary['power_tx_delta'],
+                                                                    int(summary['rpl_bytes_delta']))
+_compare = CommandMonitor(__compare)
+compare = command(
+    autocomplete=lambda: list_experiments(),
+    examples=["my-simulation"],
+    expand=('name', {'new_arg': 'path', 'into': EXPERIMENT_FOLDER}),
+    not_exists=('path', {'loglvl': 'error', 'msg': (" > Experiment '{}' does not exist !", 'name')}),
+    start_msg=("COMPARING SIMULATIONS OF EXPERIMENT '{}'", 'name'),
+    behavior=MultiprocessedCommand,
+    __base__=_compare,
+)(__compare)
 
 
 @command(autocomplete=lambda: list_experiments(),
          examples=["my-simulation true"],
          expand=('name', {'new_arg': 'path', 'into': EXPERIMENT_FOLDER}),
          not_exists=('path', {'loglvl': 'error', 'msg': (" > Experiment '{}' does not exist !", 'name')}),
-         start_msg=("STARTING COOJA WITH EXPERIMENT '{}'", 'name'))
+         start_msg=("STARTING COOJA WITH EXPERIMENT '{}'", 'name'),
+         local=True)
 def cooja(name, with_malicious=True, **kwargs):
     """
     Start an experiment in Cooja with/without the malicious mote and updates the experiment if motes' positions
@@ -146,23 +182,56 @@ def cooja(name, with_malicious=True, **kwargs):
     motes_before = get_motes_from_simulation(join(sim_path, 'simulation.csc'), as_dictionary=True)
     with hide(*HIDDEN_ALL):
         with lcd(sim_path):
-            local("make cooja TASK={}".format(kwargs['task']))
-    motes_after = get_motes_from_simulation(join(sim_path, 'simulation.csc'), as_dictionary=True)
-    # if there was a change, update the other simulation in this experiment
-    if len(set(motes_before.items()) & set(motes_after.items())) > 0:
-        other_sim_path = join(kwargs['path'], 'with{}-malicious'.format(['', 'out'][with_malicious is True]))
-        set_motes_to_simulation(join(other_sim_path, 'simulation.csc'), motes_after)
-    # if this experiment is part of a campaign, update this
+            local_group("make cooja")
+    moves = get_moved_motes(motes_before, get_motes_from_simulation(join(sim_path, 'simulation.csc')))
+    if len(moves) == 0:
+        return
+    # if there was a change, update the other simulation in this experiment and, if this experiment is part of a
+    #  campaign, the simulations of the other experiments
+    simfiles = [join(kwargs['path'], 'with{}-malicious'.format(['', 'out'][with_malicious is True]), 'simulation.csc')]
     campaign = read_config(kwargs['path']).get('campaign')
     if campaign is not None:
         for experiment in get_experiments(campaign):
             if experiment in ['BASE', name]:
                 continue
             exp_path = join(EXPERIMENT_FOLDER, experiment)
-            set_motes_to_simulation(join(exp_path, 'with-malicious', 'simulation.csc'), motes_after)
-            set_motes_to_simulation(join(exp_path, 'without-malicious', 'simulation.csc'), motes_after)
+            simfiles.extend(join(exp_path, sim, 'simulation.csc') for sim in ['with-malicious', 'without-malicious'])
+    updated = propagate_motes(simfiles, moves)
+    logger.info(" > {} mote(s) moved, {} simulation file(s) updated ({} already up to date)"
+                .format(len(moves), len(updated), len(simfiles) - len(updated)))
+
 
+@record_stage('parse')
+def __parse(name, **kwargs):
+    """
+    Parse the simulations of an experiment again, only recomputing the results whose inputs (data files, parser
+     version or parameters) changed.
 
+    :param name: experiment name
+    :param path: expanded path of the experiment (dynamically filled in through 'command' decorator with 'expand'
+    """
+    set_logging(kwargs.get('loglevel'))
+    recomputed = []
+    for sim in ["without", "with"]:
+        sim_path = join(kwargs['path'], "{}-malicious".format(sim))
+        logger.debug(" > Parsing simulation {} the malicious mote...".format(sim))
+        stage('parse')
+        recomputed.extend(parsing_chain(sim_path, incremental=True))
+        compress_data(sim_path)
+    return "{} stage(s) recomputed".format(len(recomputed))
+_parse = CommandMonitor(__parse)
+parse = command(
+    autocomplete=lambda: list_experiments(),
+    examples=["my-simulation"],
+    expand=('name', {'new_arg': 'path', 'into': EXPERIMENT_FOLDER}),
+    not_exists=('path', {'loglvl': 'error', 'msg': (" > Experiment '{}' does not exist !", 'name')}),
+    start_msg=("PARSING EXPERIMENT '{}'", 'name'),
+    behavior=MultiprocessedCommand,
+    __base__=_parse,
+)(__parse)
+
+
+@record_stage('make')
 def __make(name, ask=True, **kwargs):
     """
     Make a new experiment.
@@ -176,6 +245,7 @@ def __make(name, ask=True, **kwargs):
     set_logging(kwargs.get('loglevel'))
     path = kwargs['path']
     logger.debug(" > Validating parameters...")
+    stage('validate')
     params = validated_parameters(kwargs)
     ext_lib = params.get("ext_lib")
     if ext_lib and not exists(ext_lib):
@@ -183,6 +253,7 @@ def __make(name, ask=True, **kwargs):
         logger.critical("Make aborded.")
         return False
     logger.debug(" > Creating simulation...")
+    stage('render')
     # create experiment's directories
     check_structure(path, create=True, remove=True)
     templates = get_path(path, 'templates', create=True)
@@ -197,7 +268,7 @@ def __make(name, ask=True, **kwargs):
     replacements = render_templates(path, **params)
     remove_folder(templates)
     # now, write the config file without the list of motes
-    del params['motes']
+    del params['motes'], params['layout']
     write_config(path, params)
     # now compile
     with settings(hide(*HIDDEN_ALL), warn_only=True):
@@ -206,21 +277,23 @@ def __make(name, ask=True, **kwargs):
         contiki = join(with_malicious, split(CONTIKI_FOLDER)[-1])
         contiki_rpl = join(contiki, 'core', 'net', 'rpl')
         # copy a reduced version of Contiki where the debug flags can be set for RPL files set in DEBUG_FILES
+        stage('copy')
         copy_folder(CONTIKI_FOLDER, with_malicious,
                     includes=get_contiki_includes(params["target"], params["malicious_target"]))
         apply_debug_flags(contiki_rpl, debug=['NONE', 'PRINT'][params["debug"]])
+        stage('compile')
         with lcd(with_malicious):
             # first, compile root and sensor mote types
             croot, csensor = 'root.{}'.format(params["target"]), 'sensor.{}'.format(params["target"])
             if reuse_bin_path is None or reuse_bin_path == with_malicious:
                 logger.debug(" > Making '{}'...".format(croot))
-                stderr(local)("make root CONTIKI={}".format(contiki), capture=True)
+                stderr(local_group)("make root CONTIKI={}".format(contiki), capture=True)
                 logger.debug(" > Making '{}'...".format(csensor))
-                stderr(local)("make sensor CONTIKI={}".format(contiki), capture=True)
+                stderr(local_group)("make sensor CONTIKI={}".format(contiki), capture=True)
                 # here, files are moved ; otherwise, 'make clean' would also remove *.z1
                 move_files(with_malicious, without_malicious, croot, csensor)
                 # after compiling, clean artifacts
-                local('make clean')
+                local_group('make clean')
                 remove_files(with_malicious, 'root.c', 'sensor.c')
             else:
                 copy_files(reuse_bin_path, without_malicious, croot, csensor)
@@ -231,12 +304,12 @@ def __make(name, ask=True, **kwargs):
                 copy_folder(ext_lib, contiki_rpl)
             apply_replacements(contiki_rpl, replacements)
             logger.debug(" > Making '{}'...".format(malicious))
-            stderr(local)("make malicious CONTIKI={} TARGET={}"
-                          .format(contiki, params["malicious_target"]), capture=True)
+            stderr(local_group)("make malicious CONTIKI={} TARGET={}"
+                                .format(contiki, params["malicious_target"]), capture=True)
             # temporary move compiled malicious mote, clean the compilation artifacts, move the malicious mote back
             #  from the temporary location and copy compiled root and sensor motes
             move_files(with_malicious, without_malicious, malicious)
-            local('make clean')
+            local_group('make clean')
             move_files(without_malicious, with_malicious, malicious)
             copy_files(without_malicious, with_malicious, croot, csensor)
             # finally, remove compilation sources
@@ -273,6 +346,7 @@ def __remake(name, build=False, **kwargs):
         logger.critical("Make aborted.")
         return False
     logger.debug(" > Recompiling malicious mote...")
+    stage('render')
     # remove former compiled malicious mote and prepare the template
     templates = get_path(path, 'templates', create=True)
     get_path(templates, 'motes', create=True)
@@ -292,7 +366,9 @@ def __remake(name, build=False, **kwargs):
             malicious = 'malicious.{}'.format(params["malicious_target"])
             croot, csensor = 'root.{}'.format(params["target"]), 'sensor.{}'.format(params["target"])
             # handle the malicious mote recompilation
+            stage('copy')
             copy_folder(CONTIKI_FOLDER, with_malicious, includes=get_contiki_includes(params["malicious_target"]))
+            stage('compile')
             if ext_lib is not None:
                 remove_folder(contiki_rpl)
                 copy_folder(ext_lib, contiki_rpl)
@@ -306,10 +382,10 @@ def __remake(name, build=False, **kwargs):
                 copy_files(with_malicious, build, malicious)
             else:
                 logger.debug(" > Making '{}'...".format(malicious))
-                stderr(local)("make malicious CONTIKI={} TARGET={}".format(contiki, params["malicious_target"]),
-                              capture=True)
+                stderr(local_group)("make malicious CONTIKI={} TARGET={}"
+                                    .format(contiki, params["malicious_target"]), capture=True)
             move_files(with_malicious, without_malicious, malicious)
-            local('make clean')
+            local_group('make clean')
             remove_files(with_malicious, 'malicious.c')
             move_files(without_malicious, with_malicious, malicious)
             copy_files(without_malicious, with_malicious, croot, csensor)
@@ -326,11 +402,14 @@ remake = command(
 )(__remake)
 
 
-def __run(name, **kwargs):
+@record_stage('run')
+def __run(name, parse=True, **kwargs):
     """
     Run an experiment.
 
     :param name: experiment name
+    :param parse: parse the simulations once run (otherwise, only what was parsed while running is kept, the
+                   remaining stages being left to the 'parse' command)
     :param path: expanded path of the experiment (dynamically filled in through 'command' decorator with 'expand'
     """
     set_logging(kwargs.get('loglevel'))
@@ -342,9 +421,15 @@ def __run(name, **kwargs):
             data, results = join(sim_path, 'data'), join(sim_path, 'results')
             # the Makefile is at experiment's root ('path')
             logger.debug(" > Running simulation {} the malicious mote...".format(sim))
-            with lcd(sim_path):
-                output = local("make run TASK={}".format(kwargs['task']), capture=True)
-            remove_files(sim_path, '.{}'.format(kwargs['task']))
+            stage('simulate')
+            # the logs are parsed while the simulation is running
+            live = LiveParser(sim_path)
+            live.start()
+            try:
+                with lcd(sim_path):
+                    output = local_group("make run", capture=True, name='cooja')
+            finally:
+                done = live.stop()
             error, interrupt, error_buffer = False, False, []
             for line in output.split('\n'):
                 if line.strip().startswith("FATAL") or line.strip().startswith("ERROR"):
@@ -363,7 +448,8 @@ def __run(name, **kwargs):
             #  the last screenshots ; move these to the results folder
             logger.debug(" > Gathering screenshots in an animated GIF...")
             with lcd(data):
-                local('convert -delay 10 -loop 0 network*.png wsn-{}-malicious.gif'.format(sim), capture=True)
+                local_group('convert -delay 10 -loop 0 network*.png wsn-{}-malicious.gif'.format(sim), capture=True,
+                            name='gif')
             network_images = {int(fn.split('.')[0].split('_')[-1]): fn for fn in listdir(data)
                               if fn.startswith('network_')}
             move_files(data, results, 'wsn-{}-malicious.gif'.format(sim))
@@ -375,10 +461,16 @@ def __run(name, **kwargs):
             net_end_new = 'wsn-{}-malicious_end{}'.format(sim, ext)
             move_files(data, results, (net_start_old, net_start_new), (net_end_old, net_end_new))
             remove_files(data, *network_images.values())
+            move_files(sim_path, results, 'COOJA.log')
+            if not parse:
+                parsing_chain(sim_path, stages=done, done=done)
+                continue
             # then start the parsing functions to derive more results
             logger.debug(" > Parsing simulation results...")
-            parsing_chain(sim_path)
-            move_files(sim_path, results, 'COOJA.log')
+            stage('parse')
+            parsing_chain(sim_path, done=done)
+            # finally, compress the data files as these are only read again by the parsers
+            compress_data(sim_path)
 _run = CommandMonitor(__run)
 run = command(
     autocomplete=lambda: list_experiments(),
@@ -442,23 +534,78 @@ def make_all(exp_file, **kwargs):
     global reuse_bin_path
     console = kwargs.get('console')
     clean_all(exp_file, silent=True) if console is None else console.do_clean_all(exp_file, silent=True)
-    experiments = get_experiments(exp_file, silent=True)
-    sim_json, motes = None, None
-    # if a simulation named 'BASE' is present, use it as a template simulation for all the other simulations
-    if 'BASE' in experiments.keys():
-        experiments['BASE']['silent'] = True
-        sim_json = dict(experiments['BASE']['simulation'])
-        motes = generate_motes(defaults=DEFAULTS, **validated_parameters(experiments['BASE']))
-        del experiments['BASE']
-    for name, params in sorted(experiments.items(), key=lambda x: x[0]):
-        params['campaign'] = splitext(basename(exp_file))[0]
-        if sim_json is not None:
-            params.setdefault('simulation', {})
-            for k, v in sim_json.items():
-                if k not in params['simulation'].keys():
-                    params['simulation'][k] = v
-            params['motes'] = motes
-        make(name, ask=False, **params) if console is None else console.do_make(name, ask=False, **params)
+    profile = kwargs.get('profile')
+    for name, params in schedule(prepare_campaign(exp_file), ['make']):
+        make(name, ask=False, profile=profile, **params) if console is None else \
+            console.do_make(name, ask=False, profile=profile, **params)
+
+
+@command(autocomplete=lambda: list_campaigns(),
+         examples=["my-simulation-campaign"],
+         expand=('exp_file', {'into': EXPERIMENT_FOLDER, 'ext': 'json'}),
+         not_exists=('exp_file', {'loglvl': 'error',
+                                  'msg': (" > Experiment campaign '{}' does not exist !", 'exp_file')}))
+def parse_all(exp_file, **kwargs):
+    """
+    Parse a campaign of experiments again, only recomputing the results whose inputs changed.
+
+    :param exp_file: experiments JSON filename or basename (absolute or relative path ; if no path provided,
+                     the JSON file is searched in the experiments folder)
+    """
+    console, profile = kwargs.get('console'), kwargs.get('profile')
+    for name in get_experiments(exp_file).keys():
+        if name != 'BASE':
+            parse(name, profile=profile) if console is None else console.do_parse(name, profile=profile)
+
+
+@command(autocomplete=lambda: list_campaigns(),
+         examples=["my-simulation-campaign"],
+         expand=('exp_file', {'into': EXPERIMENT_FOLDER, 'ext': 'json'}),
+         not_exists=('exp_file', {'loglvl': 'error',
+                                  'msg': (" > Experiment campaign '{}' does not exist !", 'exp_file')}),
+         start_msg=("STARTING PIPELINE OF EXPERIMENT CAMPAIGN AT '{}'", 'exp_file'))
+def pipeline(exp_file, **kwargs):
+    """
+    Make, run then parse a campaign of experiments, each experiment going to its next stage as soon as its previous
+     stage is over (so that simulations overlap with the compilation of the next experiments).
+
+    :param exp_file: experiments JSON filename or basename (absolute or relative path ; if no path provided,
+                     the JSON file is searched in the experiments folder)
+    """
+    console = kwargs.get('console')
+    clean_all(exp_file, silent=True) if console is None else console.do_clean_all(exp_file, silent=True)
+    experiments, profile = schedule(prepare_campaign(exp_file), PIPELINE_STAGES), kwargs.get('profile')
+    if console is not None:
+        Pipeline(console, PIPELINE_STAGES, profile=profile).start(experiments)
+        return
+    for name, params in experiments:
+        make(name, ask=False, profile=profile, **params)
+        run(name, parse=False, profile=profile)
+        parse(name, profile=profile)
+
+
+@command(autocomplete=lambda: list_campaigns(),
+         examples=["my-simulation-campaign"],
+         expand=('exp_file', {'into': EXPERIMENT_FOLDER, 'ext': 'json'}),
+         not_exists=('exp_file', {'loglvl': 'error',
+                                  'msg': (" > Experiment campaign '{}' does not exist !", 'exp_file')}))
+def plot_all(exp_file, **kwargs):
+    """
+    Render the missing or outdated plots of a campaign of experiments in a dedicated pool of processes.
+
+    :param exp_file: experiments JSON filename or basename (absolute or relative path ; if no path provided,
+                     the JSON file is searched in the experiments folder)
+    """
+    paths = []
+    for name in sorted(get_experiments(exp_file).keys()):
+        path = join(EXPERIMENT_FOLDER, name)
+        if name == 'BASE':
+            continue
+        if not exists(path):
+            logger.warning(" > Experiment '{}' does not exist (skipped)".format(name))
+            continue
+        paths.extend(join(path, "{}-malicious".format(sim)) for sim in ["without", "with"])
+    logger.info(" > {} plot(s) rendered".format(draw_plots(paths)))
 
 
 @command(autocomplete=lambda: list_campaigns(),
@@ -477,6 +624,44 @@ def prepare(exp_file, ask=True, **kwargs):
     render_campaign(exp_file)
 
 
+@command(autocomplete=lambda: list_campaigns(),
+         examples=["my-simulation-campaign", "my-simulation-campaign memory", "my-simulation-campaign cpu parse"],
+         expand=('exp_file', {'into': EXPERIMENT_FOLDER, 'ext': 'json'}),
+         not_exists=('exp_file', {'loglvl': 'error',
+                                  'msg': (" > Experiment campaign '{}' does not exist !", 'exp_file')}))
+def profile_all(exp_file, kind='cpu', name=None, **kwargs):
+    """
+    Aggregate the profiles of the tasks of a campaign of experiments (recorded with the 'profile' option).
+
+    :param exp_file: experiments JSON filename or basename (absolute or relative path ; if no path provided,
+                     the JSON file is searched in the experiments folder)
+    :param kind: 'cpu' or 'memory'
+    :param name: command whose profiles are aggregated (e.g. 'parse' ; default: all the commands)
+    """
+    if kind not in PROFILE_KINDS:
+        logger.error("Bad profile '{}' (should be {})".format(kind, ' or '.join(PROFILE_KINDS)))
+        return
+    campaign = splitext(basename(exp_file))[0]
+    paths = [join(EXPERIMENT_FOLDER, n) for n in sorted(get_experiments(exp_file).keys()) if n != 'BASE']
+    profiles = get_profiles(paths, kind, name)
+    if len(profiles) == 0:
+        logger.warning(" > No {} profile recorded yet for campaign '{}'".format(kind, campaign))
+        return
+    output = get_profile_file(get_path(REPORTS_FOLDER, campaign, create=True), name or 'all', kind)
+    get_path(dirname(output), create=True)
+    if kind == 'cpu':
+        data = [['Function', 'Calls', 'Own time (s)', 'Cumulative time (s)']]
+        for function, calls, own, cumulative in aggregate_cpu_profiles(profiles, output)[:15]:
+            data.append([function, str(calls), '{:.3f}'.format(own), '{:.3f}'.format(cumulative)])
+    else:
+        profile = aggregate_memory_profiles(profiles, output, name)
+        data = [['Line of code', 'Count', 'Size (KiB)']]
+        for a in profile['allocations'][:15]:
+            data.append(['{}:{}'.format(a['file'], a['line']), str(a['count']), '{:.1f}'.format(a['size'] / 1024.)])
+    print(SingleTable(data, 'Aggregated {} profile of {} task(s)'.format(kind, len(profiles))).table)
+    logger.info(" > Profile written to '{}'".format(output))
+
+
 @command(autocomplete=lambda: list_campaigns(),
          examples=["my-simulation-campaign"],
          expand=('exp_file', {'into': EXPERIMENT_FOLDER, 'ext': 'json'}),
@@ -489,10 +674,37 @@ def remake_all(exp_file, **kwargs):
     :param exp_file: experiments JSON filename or basename (absolute or relative path ; if no path provided,
                      the JSON file is searched in the experiments folder)
     """
-    console = kwargs.get('console')
+    console, profile = kwargs.get('console'), kwargs.get('profile')
     experiments = {k: v for k, v in get_experiments(exp_file).items() if k != 'BASE'}
     for name, params in sorted(experiments.items(), key=lambda x: x[0]):
-        remake(name, **params) if console is None else console.do_remake(name, **params)
+        remake(name, profile=profile, **params) if console is None else \
+            console.do_remake(name, profile=profile, **params)
+
+
+@command(autocomplete=lambda: list_campaigns(),
+         examples=["my-simulation-campaign"],
+         expand=('exp_file', {'into': EXPERIMENT_FOLDER, 'ext': 'json'}),
+         not_exists=('exp_file', {'loglvl': 'error',
+                                  'msg': (" > Experiment campaign '{}' does not exist !", 'exp_file')}),
+         start_msg=("REPORTING ON EXPERIMENT CAMPAIGN AT '{}'", 'exp_file'))
+def report_all(exp_file, **kwargs):
+    """
+    Compare the simulations with and without the malicious mote for a campaign of experiments and aggregate
+     the results in a single table and a set of figures.
+
+    :param exp_file: experiments JSON filename or basename (absolute or relative path ; if no path provided,
+                     the JSON file is searched in the experiments folder)
+    """
+    campaign = splitext(basename(exp_file))[0]
+    experiments = [(n, join(EXPERIMENT_FOLDER, n)) for n in sorted(get_experiments(exp_file).keys()) if n != 'BASE']
+    for name, path in experiments:
+        if not exists(path):
+            logger.warning(" > Experiment '{}' does not exist (skipped)".format(name))
+    report_path = get_path(REPORTS_FOLDER, campaign, create=True)
+    if report_campaign([(n, p) for n, p in experiments if exists(p)], report_path) is None:
+        logger.error("No experiment could be compared for campaign '{}'".format(campaign))
+    else:
+        logger.info(" > Campaign report written to '{}'".format(report_path))
 
 
 @command(autocomplete=lambda: list_campaigns(),
@@ -507,10 +719,32 @@ def run_all(exp_file, **kwargs):
     :param exp_file: experiments JSON filename or basename (absolute or relative path ; if no path provided,
                      the JSON file is searched in the experiments folder)
     """
-    console = kwargs.get('console')
-    for name in get_experiments(exp_file).keys():
-        if name != 'BASE':
-            run(name) if console is None else console.do_run(name)
+    console, profile = kwargs.get('console'), kwargs.get('profile')
+    experiments = [(name, read_config(join(EXPERIMENT_FOLDER, name))) for name in get_experiments(exp_file).keys()
+                   if name != 'BASE']
+    for name, _ in schedule(experiments, ['run']):
+        run(name, profile=profile) if console is None else console.do_run(name, profile=profile)
+
+
+@command(autocomplete=lambda: list_campaigns(),
+         examples=["my-simulation-campaign"],
+         expand=('exp_file', {'into': EXPERIMENT_FOLDER, 'ext': 'json'}),
+         not_exists=('exp_file', {'loglvl': 'error',
+                                  'msg': (" > Experiment campaign '{}' does not exist !", 'exp_file')}))
+def trace_all(exp_file, **kwargs):
+    """
+    Export the traces of the stages of a campaign of experiments in Chrome's trace event format.
+
+    :param exp_file: experiments JSON filename or basename (absolute or relative path ; if no path provided,
+                     the JSON file is searched in the experiments folder)
+    """
+    campaign = splitext(basename(exp_file))[0]
+    paths = [join(EXPERIMENT_FOLDER, n) for n in sorted(get_experiments(exp_file).keys()) if n != 'BASE']
+    output = join(get_path(REPORTS_FOLDER, campaign, create=True), 'trace.json')
+    if export_chrome_trace(paths, output) == 0:
+        logger.warning(" > No trace recorded yet for campaign '{}'".format(campaign))
+    else:
+        logger.info(" > Trace written to '{}' (to be opened in chrome://tracing)".format(output))
 
 
 # ************************************** INFORMATION COMMANDS *************************************
@@ -535,9 +769,50 @@ def list(item_type, **kwargs):
         print(table.table)
 
 
+@command(examples=["", "rebuild"],
+         start_msg="SYNCHRONIZING THE CATALOG OF EXPERIMENTS")
+def catalog(rebuild=False, **kwargs):
+    """
+    Synchronize the catalog of experiments with the experiments folder (only modified experiments are reindexed).
+
+    :param rebuild: 'rebuild' to reindex all the experiments
+    """
+    updated, removed = sync_catalog(rebuild=rebuild in [True, 'rebuild'])
+    logger.info(" > {} experiment(s) indexed, {} experiment(s) removed".format(updated, removed))
+
+
+@command(examples=["n>20 target=z1 blocks=decreased-rank sort=-avg_tx", "run_time>600 sort=run_time limit=10"],
+         reexec_on_emptyline=True)
+def query(*conditions, **kwargs):
+    """
+    Query the catalog of experiments. Comparisons (e.g. n>20) must precede equality filters (e.g. target=z1) ;
+     'sort' (prefix with '-' for a descending order) and 'limit' are also available.
+
+    :param conditions: comparisons formatted as [field][<|>|<=|>=][value]
+    """
+    options = {k: kwargs.pop(k, None) for k in ['sort', 'limit']}
+    filters = {k: v for k, v in kwargs.items() if k not in ['console', 'task', 'silent']}
+    try:
+        rows = query_catalog([c for c in conditions if c != ''], filters, **options)
+    except ValueError as e:
+        logger.error(str(e))
+        return
+    columns = ['name', 'campaign', 'target', 'n', 'duration', 'blocks', 'run_status', 'avg_tx']
+    sort = (options['sort'] or '').lstrip('-')
+    if sort != '' and sort not in columns:
+        columns.append(sort)
+    data = [columns]
+    for row in rows:
+        row['blocks'] = row['blocks'].strip(',')
+        data.append(['' if row[c] is None else str(round(row[c], 3) if isinstance(row[c], float) else row[c])
+                     for c in columns])
+    print(SingleTable(data, 'Matching experiments ({})'.format(len(rows))).table)
+
+
 # ***************************************** SETUP COMMANDS *****************************************
 @command(examples=["/opt/contiki", "~/contiki ~/Documents/experiments"],
-         start_msg="CREATING CONFIGURATION FILE AT '~/.rpl-attacks.conf'")
+         start_msg="CREATING CONFIGURATION FILE AT '~/.rpl-attacks.conf'",
+         local=True)
 def config(contiki_folder='~/contiki', experiments_folder='~/Experiments', silent=False, **kwargs):
     """
     Create a new configuration file at ~/.rpl-attacks.conf.
@@ -552,6 +827,19 @@ def config(contiki_folder='~/contiki', experiments_folder='~/Experiments', silen
         f.write('experiments_folder = {}\n'.format(experiments_folder))
 
 
+@command(examples=["", "baseline"],
+         start_msg="BENCHMARKING THE FRAMEWORK")
+def benchmark(baseline=False, **kwargs):
+    """
+    Run framework's benchmarks and compare their results with the baseline.
+
+    :param baseline: 'baseline' to save the results as the new baseline
+    """
+    with settings(warn_only=True):
+        with lcd(FRAMEWORK_FOLDER):
+            local("python -m benchmarks{}".format(" --save-baseline" if baseline in [True, 'baseline'] else ""))
+
+
 @command(start_msg="TESTING THE FRAMEWORK")
 def test(**kwargs):
     """
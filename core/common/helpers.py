@@ -1,12 +1,23 @@
 # -*- coding: utf8 -*-
+import gzip
 import re
 import sh
 from jsmin import jsmin
 from json import loads
-from os import makedirs
+from multiprocessing import cpu_count, current_process, Pool
+from os import makedirs, remove
 from os.path import exists, expanduser, join, split
+from shutil import copyfileobj
 from six import string_types
 from termcolor import colored
+# zstd compression is optional, gzip is used as a fallback
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSION_EXTENSIONS = {'gzip': '.gz', 'zstd': '.zst'}
 
 
 def __expand_folders(*folders):
@@ -73,6 +84,38 @@ def copy_files(src_path, dst_path, *files):
             sh.cp(src, dst)
 
 
+def compress_files(path, *files, **kwargs):
+    """
+    This helper function is aimed to compress files with a streaming codec, replacing the original files. If a file
+     does not exist, it fails silently.
+
+    :param path: absolute or relative source path
+    :param files: filenames of files to be compressed
+    :param codec: 'gzip' or 'zstd' (if the 'zstandard' module is not installed, 'gzip' is used instead)
+    :return: list of the paths to the compressed files
+    """
+    path = __expand_folders(path)
+    codec = kwargs.get('codec', 'gzip')
+    if codec not in COMPRESSION_EXTENSIONS.keys() or codec == 'zstd' and zstandard is None:
+        codec = 'gzip'
+    compressed = []
+    for file in files:
+        src = join(path, file)
+        if not exists(src):
+            continue
+        dst = src + COMPRESSION_EXTENSIONS[codec]
+        with open(src, 'rb') as sf:
+            if codec == 'zstd':
+                with open(dst, 'wb') as df:
+                    zstandard.ZstdCompressor().copy_stream(sf, df)
+            else:
+                with gzip.open(dst, 'wb') as df:
+                    copyfileobj(sf, df)
+        remove(src)
+        compressed.append(dst)
+    return compressed
+
+
 def copy_folder(src_path, dst_path, includes=None):
     """
     This helper function is aimed to copy an entire folder from a source path to a destination path.
@@ -97,6 +140,20 @@ def copy_folder(src_path, dst_path, includes=None):
             sh.cp('-R', src_path, dst_path)
 
 
+def find_file(path):
+    """
+    This helper function is aimed to find a file that may have been compressed (see compress_files).
+
+    :param path: path to the file, without the extension of the compression codec
+    :return: the path to the existing file, either uncompressed or compressed, or the input path if none exists
+    """
+    path = __expand_folders(path)
+    for ext in [''] + sorted(COMPRESSION_EXTENSIONS.values()):
+        if exists(path + ext):
+            return path + ext
+    return path
+
+
 def move_files(src_path, dst_path, *files):
     """
     This helper function is aimed to move files from a source path to a destination path.
@@ -140,6 +197,26 @@ def move_folder(src_path, dst_path, new_folder_name=None):
         pass
 
 
+def open_file(path, mode='r'):
+    """
+    This helper function is aimed to open a file that may have been compressed (see compress_files). In this case,
+     the content is decompressed while being read.
+
+    :param path: path to the file, without the extension of the compression codec
+    :param mode: 'r' for reading text or 'rb' for reading bytes
+    :return: file object
+    """
+    path = find_file(path)
+    if path.endswith(COMPRESSION_EXTENSIONS['gzip']):
+        return gzip.open(path, mode if 'b' in mode else 'rt')
+    if path.endswith(COMPRESSION_EXTENSIONS['zstd']):
+        if zstandard is None:
+            raise IOError("Module 'zstandard' is required for reading '{}'".format(path))
+        # the returned stream owns the underlying file, which is closed with it
+        return zstandard.open(path, 'rb' if 'b' in mode else 'rt')
+    return open(path, mode)
+
+
 def remove_files(path, *files):
     """
     This helper function is aimed to remove specified files. If a file does not exist,
@@ -236,3 +313,25 @@ def is_valid_commented_json(path, return_json=False, logger=None):
         if logger is not None:
             logger.error("JSON file '{}' cannot be read ! (check that the syntax is correct)".format(path))
         return False
+
+
+# *************************************** PROCESS-RELATED HELPER ***************************************
+def map_in_pool(function, jobs, processes=None):
+    """
+    This function applies a function to a list of jobs in a dedicated pool of processes, jobs being dispatched by
+     chunks. When called from a daemonic process (e.g. a task of the console), which cannot have children, or for
+     a single job, the jobs are run in the current process.
+
+    :param function: pickable function taking a job as its single argument
+    :param jobs: list of jobs to be processed
+    :param processes: number of processes to be used (default: number of CPU's)
+    :return: list of the results of the function, in the order of the jobs
+    """
+    if current_process().daemon or len(jobs) <= 1:
+        return [function(job) for job in jobs]
+    pool = Pool(min(processes or cpu_count(), len(jobs)))
+    try:
+        return pool.map(function, jobs)
+    finally:
+        pool.close()
+        pool.join()
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from pygments.lexer import RegexLexer, bygroups, using
 from pygments.token import Error, Keyword, Name, Number, Operator, String, Whitespace
+from re import sub, DOTALL
 
 
 class ValueLexer(RegexLexer):
@@ -20,18 +21,45 @@ class ValueLexer(RegexLexer):
     }
 
 
+def quote(value):
+    """
+    This function quotes a value as a single argument for ArgumentsLexer (between double quotes, with backslashes
+     escaping double quotes and backslashes), so that it is passed as is, whatever spaces or quotes it holds.
+
+    :param value: argument value
+    :return: quoted value
+    """
+    return '"{}"'.format(sub(r'(["\\])', r'\\\1', '{}'.format(value)))
+
+
+def unquote(value):
+    """
+    This function retrieves a value quoted with quote().
+
+    :param value: quoted value
+    :return: argument value
+    """
+    return sub(r'\\(.)', r'\1', value[1:-1], flags=DOTALL)
+
+
 class ArgumentsLexer(RegexLexer):
     """ A lexer to analyze command arguments with the following structure:
-          [arg1, arg2, ..., argN][, kwarg1, kwarg2, ..., kwargM]  """
+          [arg1, arg2, ..., argN][, kwarg1, kwarg2, ..., kwargM]
+        where values between double quotes are taken as a whole (see quote()). """
     tokens = {
         'root': [
             (r'\s+', Whitespace),
+            (r'([a-zA-Z]|[a-zA-Z][a-zA-Z0-9-_]*[a-zA-Z0-9])(=)("(?:[^"\\]|\\.)*")(\s+)',
+             bygroups(Name, Operator, String.Double, Whitespace), 'kwargs'),
             (r'([a-zA-Z]|[a-zA-Z][a-zA-Z0-9-_]*[a-zA-Z0-9])(=)(.+?)(\s+)',
              bygroups(Name, Operator, using(ValueLexer), Whitespace), 'kwargs'),
+            (r'("(?:[^"\\]|\\.)*")(\s+)', bygroups(String.Double, Whitespace), '#push'),
             (r'(.+?)(\s+)', bygroups(using(ValueLexer), Whitespace), '#push'),
         ],
         'kwargs': [
             (r'\s+', Whitespace),
+            (r'([a-zA-Z]|[a-zA-Z][a-zA-Z0-9-_]*[a-zA-Z0-9])(=)("(?:[^"\\]|\\.)*")(\s+)',
+             bygroups(Name, Operator, String.Double, Whitespace)),
             (r'([a-zA-Z]|[a-zA-Z][a-zA-Z0-9-_]*[a-zA-Z0-9])(=)(.+?)(\s+)',
              bygroups(Name, Operator, using(ValueLexer), Whitespace)),
         ],
@@ -42,6 +70,8 @@ class ArgumentsLexer(RegexLexer):
             return 2 * (None, )
         tokens, args, kwargs = self.get_tokens(text), [], {}
         for token, value in tokens:
+            if token is String.Double:
+                token, value = String, unquote(value)
             if token is Keyword:
                 token = token in ['true', 'True']
             elif token is Number:
@@ -50,5 +80,6 @@ class ArgumentsLexer(RegexLexer):
                 args.append(value)
             if token is Name:
                 next(tokens)  # pass the Operator '='
-                kwargs.update({value: next(tokens)[1]})
+                token, v = next(tokens)
+                kwargs.update({value: unquote(v) if token is String.Double else v})
         return args, kwargs
@@ -1,8 +1,29 @@
 # -*- coding: utf8 -*-
-from numpy import arccos, average, cos, pi, sign, sin, sqrt
-from random import randint, shuffle
+import numpy
+from collections import OrderedDict
+from numpy import arange, arccos, argsort, average, ceil, concatenate, cos, dstack, floor, inf, isfinite, maximum, \
+                  minimum, nextafter, ones, pi, searchsorted, sign, sin, sqrt, vstack, where, zeros
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
 
+WSN_ATTEMPTS = 10
 WSN_DENSITY_FACTOR = 3
+WSN_MODELS = OrderedDict()
+# version of the generation algorithm, to be incremented when it changes the generated topologies (see the
+#  topology store in core.utils.rpla)
+WSN_GENERATOR_VERSION = 5
+# number of candidate positions sampled at once for each quadrant, bounded by a budget of candidates per ring
+#  so that large rings remain fast to generate
+WSN_CANDIDATES = (16, 100)
+WSN_CANDIDATES_PER_RING = 50000
+# offsets of the neighbouring cells of the connectivity check (half of the cells at most 2 cells away, see
+#  is_connected)
+WSN_NEIGHBOR_CELLS = [(dx, dy) for dx in range(-2, 3) for dy in range(-2, 3) if (dx, dy) > (0, 0)]
+# average number of motes per cell up to which the pairs of motes within range are listed instead
+WSN_SPARSE_CELL = 8
+# number of times the positions closer to the root than the minimum range are sampled again (see sample_positions)
+WSN_RESAMPLING = 100
 
 
 # ************************************** NETWORK GENERATION FUNCTION ****************************************
@@ -10,60 +31,273 @@ def generate_motes(**kwargs):
     """
     This function generates a WSN with 1 root, n legitimate motes and 1 malicious mote
 
+    :param topology: topology model (see WSN_MODELS)
+    :param seed: seed of the random number generator (the same parameters and seed produce the same topology)
     :return: the list of motes (formatted as dictionaries like hereafter)
+    :raise ValueError: if no connected topology could be generated
     """
     defaults = kwargs.pop('defaults')
-    nodes = [{"id": 0, "type": "root", "x": 0, "y": 0, "z": 0}]
     n = kwargs.pop('n', defaults["number-motes"])
     min_range = kwargs.pop('min_range', defaults["minimum-distance-from-root"])
-    max_range = kwargs.pop('max_range', defaults["area-square-side"] // 2)
+    # the maximum distance from the root is the side of the area, as in validated_parameters
+    max_range = kwargs.pop('max_range', defaults["area-square-side"])
     tx_range = kwargs.pop('tx_range', defaults["transmission-range"])
-    # determine 'i', the number of steps for the algorithm
-    # at step i, the newtork must be filled with at most sum(f * 2 ** i)
-    #   e.g. if f = 3, with 10 nodes, root's proximity will hold 6 nodes then the 4 ones remaining in the next ring
-    i, s, ni = 1, 0, 0
-    node_ids = list(range(1, n + 1))
-    shuffle(node_ids)
-    while s <= n:
-        s += WSN_DENSITY_FACTOR * 2 ** i
-        i += 1
-    # now, generate the nodes
-    # first, the range increment is defined ; it will provide the interval of ranges for the quadrants
-    range_inc = min(tx_range, max_range / (i - 1))
-    for ns in range(1, i):
-        # determine the number of nodes to be generated inside the current ring
-        n_step = min(WSN_DENSITY_FACTOR * 2 ** ns, n - ni)
-        # determine the angle increment for the quadrants
-        angle_inc = 360 // n_step
-        # then, divide the ring in quadrants and generate 1 node per quadrant with a 10% margin either
-        #  for the angle or for the range
-        range_min, range_max = int((ns - 0.7) * range_inc), int((ns - 0.1) * range_inc)
-        for j in range(0, n_step):
-            ni += 1
-            angle_min, angle_max = int((j + 0.25) * angle_inc), int((j + 0.75) * angle_inc)
-            d, k, x, y = 0, 0, 0, 0
-            while not min_range < d < tx_range * 0.9 and k < 1000:
-                node_angle = randint(angle_min, angle_max) * pi / 180
-                node_range = randint(max(range_min, min_range), min(range_max, max_range))
-                # compute the coordinates and append the new node to the list
-                x, y = node_range * cos(node_angle), node_range * sin(node_angle)
-                for node in nodes:
-                    d = min(d, sqrt((x - node['x'])**2 + (y - node['y'])**2))
-                k += 1
-            nodes.append({'id': node_ids[ni-1], 'type': 'sensor', 'x': x, 'y': y, 'z': 0})
-        if ni == n:
+    model = kwargs.pop('topology', None) or defaults.get("topology", "rings")
+    rng = numpy.random.RandomState(kwargs.pop('seed', None))
+    # the topology is generated again (with the next random numbers) until the legitimate motes form a connected
+    #  network under the transmission range
+    for attempt in range(WSN_ATTEMPTS):
+        node_ids = rng.permutation(n) + 1
+        positions = vstack((zeros((1, 2)), WSN_MODELS[model](rng, n, min_range, max_range, tx_range)))
+        if is_connected(positions, tx_range):
             break
-        range_inc *= 0.75
+    else:
+        raise ValueError("No connected topology of {} motes could be generated in {} attempts with model '{}' and "
+                         "a transmission range of {}".format(n, WSN_ATTEMPTS, model, tx_range))
+    nodes = [{"id": 0, "type": "root", "x": 0, "y": 0, "z": 0}]
+    nodes.extend({'id': int(node_ids[k]), 'type': 'sensor', 'x': float(x), 'y': float(y), 'z': 0}
+                 for k, (x, y) in enumerate(positions[1:]))
     # finally, add the malicious mote in the middle of the network
     # get the average of the squared x and y deltas
-    avg_x = average([sign(n['x']) * n['x'] ** 2 for n in nodes])
+    avg_x = average(sign(positions[:, 0]) * positions[:, 0] ** 2)
     x = sign(avg_x) * sqrt(abs(avg_x))
-    avg_y = average([sign(n['y']) * n['y'] ** 2 for n in nodes])
+    avg_y = average(sign(positions[:, 1]) * positions[:, 1] ** 2)
     y = sign(avg_y) * sqrt(abs(avg_y))
     # if malicious mote is too close by the root, just push it away
     radius = sqrt(x ** 2 + y ** 2)
     if radius < min_range:
-        angle = arccos(x / radius)
+        angle = arccos(x / radius) if radius > 0 else 0.
         x, y = min_range * cos(angle), min_range * sin(angle)
-    nodes.append({'id': len(nodes), 'type': 'malicious', 'x': x, 'y': y, 'z': 0})
+    nodes.append({'id': len(nodes), 'type': 'malicious', 'x': float(x), 'y': float(y), 'z': 0})
     return sorted(nodes, key=lambda o: o['id'])
+
+
+# **************************************** CONNECTIVITY CHECK ******************************************
+def is_connected(positions, tx_range):
+    """
+    This function checks if a set of motes forms a connected network, that is, if every mote can reach every
+     other one through motes within the transmission range.
+
+    The motes are binned in square cells whose diagonal is the transmission range, so that the motes of a cell are
+     all connected together ; the cells are then merged (union-find) with their neighbouring cells holding at least
+     one pair of motes within range, without ever listing all the pairs of motes (which grows quadratically with
+     the density of the network). In sparse networks, the pairs are few and listing them is faster.
+
+    :param positions: array of (x, y) positions
+    :param tx_range: transmission range
+    :return: True if the network is connected
+    """
+    if len(positions) <= 1:
+        return True
+    cells, inverse = numpy.unique(floor(positions / (tx_range / sqrt(2))).astype(int), axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    if len(cells) == 1:
+        return True
+    if len(positions) <= WSN_SPARSE_CELL * len(cells):
+        pairs = cKDTree(positions).query_pairs(tx_range, output_type='ndarray')
+        graph = coo_matrix((ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(len(positions), ) * 2)
+        return connected_components(graph, directed=False)[0] == 1
+    order = argsort(inverse, kind='mergesort')
+    bounds = searchsorted(inverse[order], arange(len(cells) + 1))
+    members = [positions[order[bounds[c]:bounds[c + 1]]] for c in range(len(cells))]
+    index = {cell: c for c, cell in enumerate(map(tuple, cells.tolist()))}
+    parent, trees, components = list(range(len(cells))), {}, len(cells)
+
+    def find(c):
+        while parent[c] != c:
+            parent[c] = parent[parent[c]]
+            c = parent[c]
+        return c
+
+    # points at exactly the transmission range are connected, as with a distance test
+    bound = nextafter(tx_range, inf)
+    for c, (x, y) in enumerate(cells.tolist()):
+        # cells further than 2 cells apart cannot hold motes within range ; each pair of cells is checked once
+        for dx, dy in WSN_NEIGHBOR_CELLS:
+            other = index.get((x + dx, y + dy))
+            if other is None:
+                continue
+            a, b = find(c), find(other)
+            if a == b:
+                continue
+            # the smaller cell is queried against the KD-tree of the bigger one
+            small, big = (c, other) if len(members[c]) <= len(members[other]) else (other, c)
+            if big not in trees:
+                trees[big] = cKDTree(members[big])
+            if isfinite(trees[big].query(members[small], distance_upper_bound=bound)[0]).any():
+                parent[a] = b
+                components -= 1
+                if components == 1:
+                    return True
+    return False
+
+
+# ***************************************** TOPOLOGY MODELS ********************************************
+def topology_model(name):
+    """
+    This decorator registers a topology model. A model takes the random number generator, the number of motes
+     to be placed, the minimum distance from the root, the maximum distance from the root and the transmission
+     range, then returns the array of (x, y) positions of the legitimate motes (the root being at (0, 0)).
+
+    :param name: name of the model
+    :return: the decorator function
+    """
+    def decorator(f):
+        WSN_MODELS[name] = f
+        return f
+    return decorator
+
+
+def sample_positions(sample, n, min_range):
+    """
+    This function samples the positions of the motes of a random model, sampling again the positions that are closer
+     to the root than the minimum range.
+
+    :param sample: function taking a number of positions and returning an array of (x, y) positions
+    :param n: number of positions
+    :param min_range: minimum distance from the root
+    :return: the array of (x, y) positions
+    :raise ValueError: if some positions remain within the minimum range
+    """
+    positions = sample(n)
+    for _ in range(WSN_RESAMPLING):
+        close = (positions ** 2).sum(1) < min_range ** 2
+        if not close.any():
+            return positions
+        positions[close] = sample(int(close.sum()))
+    raise ValueError("Motes could not be placed further than {} from the root".format(min_range))
+
+
+@topology_model('rings')
+def generate_rings(rng, n, min_range, max_range, tx_range):
+    """
+    Motes are placed in concentric rings around the root, each ring being divided in quadrants holding 1 mote (see
+     get_rings for the layout of the rings).
+    """
+    rings = get_rings(min_range, max_range, tx_range, n)
+    # now, generate the nodes ; a node is valid if the distance to its nearest neighbor is between the minimum
+    #  range and 90% of the transmission range
+    positions, d_min, d_max = zeros((1, 2)), min_range, tx_range * 0.9
+    for n_step, range_min, range_max in rings:
+        # determine the angle increment for the quadrants
+        angle_inc = 2 * pi / n_step
+        # then, divide the ring in quadrants and sample candidates for every quadrant at once with a 25% margin
+        #  for the angle and within the radii of the ring
+        shape = (n_step, max(WSN_CANDIDATES[0], min(WSN_CANDIDATES[1], WSN_CANDIDATES_PER_RING // n_step)))
+        angles = (arange(n_step)[:, None] + rng.uniform(.25, .75, shape)) * angle_inc
+        ranges = rng.uniform(range_min, range_max, shape)
+        candidates = dstack((ranges * cos(angles), ranges * sin(angles)))
+        # distances to the nearest node of the previous rings are computed in a single query of a KD-tree
+        distances = cKDTree(positions).query(candidates.reshape(-1, 2), distance_upper_bound=d_max)[0].reshape(shape)
+        # the nodes of the current ring that may be within the valid distance of a quadrant are in the 'w'
+        #  quadrants on either side (further nodes can only be closer in rings that cannot respect the minimum
+        #  range anyway) ; hence, quadrants that are more than 'w' quadrants apart are placed together, in 'w + 1'
+        #  batches, then the remaining quadrants at the end of the ring are placed one by one
+        w = min(n_step - 1, int(ceil(d_max / max(d_min, range_min * angle_inc, 1e-9))) + 1)
+        ring, placed = zeros((n_step, 2)), zeros(n_step, dtype=bool)
+        offsets = concatenate((arange(-w, 0), arange(1, w + 1)))
+        main = n_step - n_step % (w + 1) if n_step >= 2 * (w + 1) else 0
+        batches = [arange(c, main, w + 1) for c in range(w + 1) if main > 0] + \
+                  [arange(q, q + 1) for q in range(main, n_step)]
+        for qs in batches:
+            d = distances[qs]
+            neighbors = (qs[:, None] + offsets[None, :]) % n_step
+            mask = placed[neighbors]
+            if mask.any():
+                delta = candidates[qs][:, :, None, :] - ring[neighbors][:, None, :, :]
+                d = minimum(d, where(mask[:, None, :], sqrt((delta ** 2).sum(-1)), inf).min(2))
+            # keep the first valid candidate of each quadrant or the one that violates the distance constraints
+            #  the least
+            best = (maximum(d_min - d, 0) + maximum(d - d_max, 0)).argmin(1)
+            ring[qs] = candidates[qs, best]
+            placed[qs] = True
+        positions = vstack((positions, ring))
+    return positions[1:]
+
+
+def get_rings(min_range, max_range, tx_range, n):
+    """
+    This function lays out the rings of the 'rings' model. At step i, the network must be filled with at most
+     sum(f * 2 ** i) motes (with f the density factor), e.g. if f = 3, with 10 motes, the root's proximity holds 6
+     motes then the 4 remaining ones are in the next ring. The i-th ring spans from (i - 0.7) to (i - 0.1) times the
+     range increment, which is the transmission range (reduced for the rings to fit in the area) shrunk by 25% at
+     each ring. The rings are bounded by the minimum and maximum ranges.
+
+    :param min_range: minimum distance from the root and between motes
+    :param max_range: maximum distance from the root
+    :param tx_range: transmission range
+    :param n: number of motes to be placed
+    :return: list of tuples (number of motes, minimum radius, maximum radius)
+    :raise ValueError: if a ring falls within the minimum range (that is, too many motes for the area)
+    """
+    # determine 'i', the number of steps for the algorithm
+    i, s = 1, 0
+    while s <= n:
+        s += WSN_DENSITY_FACTOR * 2 ** i
+        i += 1
+    # the range increment provides the interval of ranges for the quadrants
+    range_inc, rings, ni = min(tx_range, max_range / (i - 1)), [], 0
+    for ns in range(1, i):
+        # determine the number of nodes to be generated inside the current ring
+        n_step = min(WSN_DENSITY_FACTOR * 2 ** ns, n - ni)
+        if n_step <= 0:
+            break
+        range_min, range_max = max((ns - 0.7) * range_inc, min_range), min((ns - 0.1) * range_inc, max_range)
+        if range_min > range_max:
+            raise ValueError("{} motes do not fit in rings between {} and {} from the root (ring {} falls within the "
+                             "minimum range ; reduce the number of motes or enlarge the area)"
+                             .format(n, min_range, max_range, ns))
+        rings.append((n_step, range_min, range_max))
+        ni += n_step
+        range_inc *= 0.75
+    return rings
+
+
+@topology_model('grid')
+def generate_grid(rng, n, min_range, max_range, tx_range):
+    """
+    Motes are placed on the nodes of a square grid centered on the root, closest nodes first from the minimum range.
+     The step of the grid is 90% of the transmission range, reduced if necessary for fitting in the area.
+    """
+    side = int(ceil(sqrt(n + 1)))
+    step = min(tx_range * 0.9, 2. * max_range / max(side, 1))
+    # the grid is extended by the nodes that fall within the minimum range of the root
+    k = arange(-side - int(ceil(min_range / step)), side + int(ceil(min_range / step)) + 1)
+    nodes = dstack(numpy.meshgrid(k, k)).reshape(-1, 2) * step
+    distances = (nodes ** 2).sum(1)
+    # the root is at the center (that is, the node at distance 0) ; ties are broken randomly
+    order = numpy.lexsort((rng.random_sample(len(nodes)), distances))
+    return nodes[order[distances[order] >= min_range ** 2][:n]]
+
+
+@topology_model('random')
+def generate_random(rng, n, min_range, max_range, tx_range):
+    """
+    Motes are placed uniformly at random in the area (random geometric graph), from the minimum range.
+    """
+    return sample_positions(lambda k: rng.uniform(-max_range, max_range, (k, 2)), n, min_range)
+
+
+@topology_model('clustered')
+def generate_clustered(rng, n, min_range, max_range, tx_range):
+    """
+    Motes are grouped in clusters of about 10 motes around cluster centers placed uniformly at random in the area,
+     with a normal dispersion of half the transmission range, from the minimum range.
+    """
+    centers = rng.uniform(-max_range, max_range, (max(1, n // 10), 2))
+
+    def sample(k):
+        positions = centers[rng.randint(0, len(centers), k)] + rng.normal(0., tx_range / 2., (k, 2))
+        return positions.clip(-max_range, max_range)
+    return sample_positions(sample, n, min_range)
+
+
+@topology_model('corridor')
+def generate_corridor(rng, n, min_range, max_range, tx_range):
+    """
+    Motes are placed uniformly at random in a corridor of half the transmission range wide starting at the minimum
+     range from the root, whose length allows a density of about 2 motes per transmission range.
+    """
+    length = max(min_range, min(2. * max_range, n * tx_range / 2.))
+    return numpy.column_stack((rng.uniform(min_range, length, n), rng.uniform(-tx_range / 4., tx_range / 4., n)))
+
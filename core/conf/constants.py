@@ -20,12 +20,39 @@ try:
     EXPERIMENT_FOLDER = abspath(expanduser(confparser.get("RPL Attacks Framework Configuration", "experiments_folder")))
 except (configparser.NoOptionError, configparser.NoSectionError):
     EXPERIMENT_FOLDER = expanduser('~/Experiments')
+try:
+    COMPRESSION = confparser.get("RPL Attacks Framework Configuration", "compression").strip().lower()
+except (configparser.NoOptionError, configparser.NoSectionError):
+    COMPRESSION = "gzip"
+# plots can be skipped entirely (e.g. for headless screening of campaigns) and rendered later with 'plot_all'
+try:
+    PLOTS = confparser.getboolean("RPL Attacks Framework Configuration", "plots")
+except (configparser.NoOptionError, configparser.NoSectionError):
+    PLOTS = True
+try:
+    PLOT_FORMAT = confparser.get("RPL Attacks Framework Configuration", "plot_format").strip().lower()
+except (configparser.NoOptionError, configparser.NoSectionError):
+    PLOT_FORMAT = "png"
+try:
+    PLOT_DPI = confparser.getint("RPL Attacks Framework Configuration", "plot_dpi")
+except (configparser.NoOptionError, configparser.NoSectionError):
+    PLOT_DPI = 100
 del confparser
 if not exists(EXPERIMENT_FOLDER):
     makedirs(EXPERIMENT_FOLDER)
 FRAMEWORK_FOLDER = join(dirname(__file__), pardir, pardir)
 TEMPLATES_FOLDER = join(FRAMEWORK_FOLDER, "templates")
-PIDFILE = '/tmp/rpla.pid'
+REPORTS_FOLDER = join(EXPERIMENT_FOLDER, "reports")
+CACHE_FOLDER = join(EXPERIMENT_FOLDER, ".rpla")
+CATALOG = join(CACHE_FOLDER, "catalog.db")
+TOPOLOGIES_FOLDER = join(CACHE_FOLDER, "topologies")
+TASKS_FOLDER = join(CACHE_FOLDER, "tasks")
+TRACES_FOLDER = join(CACHE_FOLDER, "traces")
+BENCHMARKS_FOLDER = join(CACHE_FOLDER, "benchmarks")
+# the daemon owning the pool of processes is reached by consoles and fabric tasks through a Unix socket
+DAEMON_SOCKET = join(CACHE_FOLDER, "daemon.sock")
+DAEMON_LOG = join(CACHE_FOLDER, "daemon.log")
+PIDFILE = join(CACHE_FOLDER, "daemon.pid")
 
 # Contiki template list of includes for specific mote target compilation (subfolders for 'dev', 'cpu', 'platform'
 #  are determined based on the specified target).
@@ -82,9 +109,11 @@ DEFAULTS = {
     "notes": "",
     "number-motes": 10,
     "repeat": 1,
+    "seed": None,  # set to a random seed at parameter validation
     "target": "z1",
     "malicious-target": None,
     "title": "Default title",
+    "topology": "rings",
     "root": "dummy",
     "sensor": "dummy",
     "type": "sensor",
@@ -111,8 +140,14 @@ TEMPLATES = OrderedDict([
     }),
 ])
 
+# Data files that are compressed (with the codec defined by COMPRESSION, amongst 'gzip', 'zstd' or 'none') once
+#  a simulation is parsed ; parsers read the compressed versions transparently
+DATA_FILES = ["output.pcap", "powertracker.log", "relationships.log", "rpl.log", "serial.log"]
+RESULT_FILES = ["COOJA.log", "pcap.csv"]
+
 EXPERIMENT_STRUCTURE = {
     "simulation.conf": False,
+    "profiles": {"*": True},
     "with-malicious": {
         "Makefile": False,
         "simulation.csc": False,
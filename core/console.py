@@ -2,14 +2,13 @@
 import atexit
 import os
 from cmd import Cmd
-from copy import copy
 from funcsigs import signature
 from getpass import getuser
-from multiprocessing import cpu_count, Pool
-from signal import signal, SIGINT, SIG_IGN
+from multiprocessing import cpu_count, Pool, Queue
 from six.moves import zip_longest
 from socket import gethostname
 from sys import stdout
+from threading import RLock
 from termcolor import colored, cprint
 from terminaltables import SingleTable
 from types import MethodType
@@ -17,9 +16,10 @@ from types import MethodType
 from core.commands import get_commands
 from core.common.ansi import surround_ansi_escapes
 from core.common.termsize import get_terminal_size
-from core.conf.constants import BANNER, COMMAND_DOCSTRING, MIN_TERM_SIZE, PIDFILE
+from core.conf.constants import BANNER, COMMAND_DOCSTRING, MIN_TERM_SIZE
 from core.conf.logconfig import logger, LOG_LEVELS, set_logging
 from core.utils.decorators import no_arg_command, no_arg_command_except
+from core.utils.telemetry import collect, format_telemetry, init_worker
 
 
 class Console(Cmd, object):
@@ -33,14 +33,6 @@ class Console(Cmd, object):
     def __init__(self, *args, **kwargs):
         super(Console, self).__init__(*args, **kwargs)
         self.__history = []
-        self.pid = os.getpid()
-        self.already_running = os.path.isfile(PIDFILE)
-        if not self.already_running:
-            try:
-                with open(PIDFILE, 'w') as f:
-                    f.write(str(self.pid))
-            except IOError:
-                pass
 
     def cmdloop(self, intro=None):
         try:
@@ -105,24 +97,30 @@ class FrameworkConsole(Console):
         colored('>>', 'cyan'),
     ))
 
-    def __init__(self, parallel):
+    def __init__(self, parallel, interactive=True, processes=None):
         self.continuation_prompt = self.prompt
         self.parallel = parallel
         width, height = get_terminal_size() or MIN_TERM_SIZE
-        if any(map((lambda s: s[0] < s[1]), zip((height, width), MIN_TERM_SIZE))):
+        if interactive and any(map((lambda s: s[0] < s[1]), zip((height, width), MIN_TERM_SIZE))):
             stdout.write("\x1b[8;{rows};{cols}t".format(rows=max(MIN_TERM_SIZE[0], height),
                                                         cols=max(MIN_TERM_SIZE[1], width)))
         if self.parallel:
-            processes = cpu_count()
+            processes = processes or cpu_count()
             self.__last_tasklist = None
             self.tasklist = {}
-            self.pool = Pool(processes, lambda: signal(SIGINT, SIG_IGN))
+            # the tasklist is updated by the pool's callbacks (and the continuations they run), hence its lock
+            self.tasklist_lock = RLock()
+            self.processes = processes
+            # workers report the telemetry of their tasks through this queue (see core.utils.telemetry)
+            self.telemetry, self.__telemetry_queue = {}, Queue()
+            self.pool = Pool(processes, init_worker, (self.__telemetry_queue, ))
             atexit.register(self.graceful_exit)
         self.reexec = ['status']
         self.__bind_commands()
         super(FrameworkConsole, self).__init__()
         self.do_loglevel('info')
-        self.do_clear('')
+        if interactive:
+            self.do_clear('')
 
     def __bind_commands(self):
         if not self.parallel:
@@ -156,21 +154,20 @@ class FrameworkConsole(Console):
 
     def clean_tasks(self):
         """ Method for cleaning the list of tasks. """
-        for t in [x for x in self.tasklist.keys() if x.is_expired()]:
-            del self.tasklist[t]
+        # the telemetry is consumed under the lock too, as several daemon clients may clean the tasks concurrently
+        with self.tasklist_lock:
+            collect(self.__telemetry_queue, self.telemetry)
+            for t in [x for x in self.tasklist.keys() if x.is_expired()]:
+                del self.tasklist[t]
+                self.telemetry.pop(str(t), None)
 
-    def cmdloop(self, intro=None):
-        if self.already_running:
-            with open(PIDFILE) as f:
-                pid = f.read().strip()
-            logger.warn('RPL Attacks Framework is already running in another terminal (PID: {})'.format(pid))
-            self.graceful_exit()
-        else:
-            super(FrameworkConsole, self).cmdloop()
+    def get_tasks(self, status=None):
+        """ Method for getting a snapshot of the list of tasks, as (task, information) tuples. """
+        with self.tasklist_lock:
+            return [(t, dict(i)) for t, i in self.tasklist.items() if status is None or i['status'] == status]
 
     def complete_kill(self, text, *args):
-        return sorted([str(i) for i in self.tasklist.keys() if str(i).startswith(text) \
-            and i.tasklist[i]['status'] == "PENDING"])
+        return sorted([str(t) for t, _ in self.get_tasks('PENDING') if str(t).startswith(text)])
 
     def complete_loglevel(self, text, *args):
         return sorted([str(i) for i in LOG_LEVELS.keys() if str(i).startswith(text)])
@@ -179,7 +176,7 @@ class FrameworkConsole(Console):
         """
     Kill a task from the pool.
         """
-        matching = [t for t in self.tasklist.keys() if str(t) == task and self.tasklist[t]['status'] == 'PENDING']
+        matching = [t for t, _ in self.get_tasks('PENDING') if str(t) == task]
         if len(matching) > 0:
             matching[0].kill()
         else:
@@ -200,20 +197,26 @@ class FrameworkConsole(Console):
     Display process pool status.
         """
         self.clean_tasks()
+        tasklist = dict(self.get_tasks())
+        # partial metrics of running simulations are part of the status (see core.utils.live)
+        progress = {task: task.get_progress() for task in tasklist.keys()}
+        telemetry = {task: format_telemetry(self.telemetry.get(str(task))) for task in tasklist.keys()}
         # this prevents from re-displaying the same status table once ENTER is pressed
         #  (marker 'restart' is handled in emptyline() hereafter
         if line == 'restart' and self.__last_tasklist is not None and \
-                        hash(repr(self.tasklist)) == self.__last_tasklist:
+                        hash(repr(tasklist) + repr(progress) + repr(telemetry)) == self.__last_tasklist:
             return
-        self.__last_tasklist = hash(repr(copy(self.tasklist)))
-        if len(self.tasklist) == 0:
+        self.__last_tasklist = hash(repr(tasklist) + repr(progress) + repr(telemetry))
+        if len(tasklist) == 0:
             data = [['No task currently running']]
         else:
-            data = [['Task', 'Status', 'Result']]
-            for task, info in sorted(self.tasklist.items(), key=lambda x: str(x[0])):
-                data.append([str(task).ljust(15), info['status'].ljust(10), str(info['result']).ljust(40)])
+            data = [['Task', 'Status', 'Stage', 'Elapsed', 'CPU', 'Peak RSS', 'Progress', 'Result']]
+            for task, info in sorted(tasklist.items(), key=lambda x: str(x[0])):
+                result = progress[task] or info['result']
+                data.append([str(task).ljust(15), info['status'].ljust(10)] + telemetry[task] +
+                            [str(result).ljust(40)])
         table = SingleTable(data, 'Status of opened tasks')
-        table.justify_columns = {0: 'center', 1: 'center', 2: 'center'}
+        table.justify_columns = {i: 'center' for i in range(len(data[0]))}
         print(table.table)
 
     def emptyline(self):
@@ -229,11 +232,11 @@ class FrameworkConsole(Console):
 
     def graceful_exit(self):
         """ Exit handler for terminating the process pool gracefully. """
-        if 'PENDING' in [x['status'] for x in self.tasklist.values()]:
+        if len(self.get_tasks('PENDING')) > 0:
             logger.info(" > Waiting for opened processes to finish...")
             logger.warning("Hit CTRL+C a second time to force process termination.")
             try:
-                for task_obj in self.tasklist.keys():
+                for task_obj, _ in self.get_tasks():
                     # see: http://stackoverflow.com/questions/1408356/keyboard-interrupts-with-pythons-multiprocessing-pool
                     #  "The KeyboardInterrupt exception won't be delivered until wait() returns, and it never returns,
                     #   so the interrupt never happens. KeyboardInterrupt should almost certainly interrupt a condition
@@ -244,12 +247,10 @@ class FrameworkConsole(Console):
                 #self.pool.join()
             except KeyboardInterrupt:
                 logger.info(" > Terminating opened processes...")
-                for task_obj in self.tasklist.keys():
+                for task_obj, _ in self.get_tasks():
                     task_obj.kill()
                 self.pool.terminate()
                 self.pool.join()
-        if not self.already_running:
-            os.remove(PIDFILE)
 
     @staticmethod
     def complete_template(lazy_values):
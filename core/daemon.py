@@ -0,0 +1,470 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import os
+import socket
+import sys
+from fabric.utils import abort
+from functools import wraps
+from signal import signal, SIGTERM
+from subprocess import Popen
+from threading import current_thread, local, Thread
+from time import sleep, time
+
+from core.commands import get_commands
+from core.common.helpers import remove_folder, std_input
+from core.common.lexer import quote, ArgumentsLexer
+from core.conf.constants import CACHE_FOLDER, DAEMON_LOG, DAEMON_SOCKET, FRAMEWORK_FOLDER, PIDFILE, TASKS_FOLDER
+from core.conf.logconfig import logger, LOG_FORMAT
+from core.console import Console, FrameworkConsole
+try:
+    import coloredlogs
+except ImportError:
+    coloredlogs = None
+
+
+DAEMON_START_TIMEOUT = 10  # seconds
+DAEMON_POLL_INTERVAL = .5  # seconds between checks of the shutdown while waiting for connections
+LOCAL_COMMANDS = ['clear', 'EOF', 'exit', 'history']
+
+
+# ************************************** PROTOCOL **************************************
+def send(stream, **message):
+    """
+    This function sends a message as a JSON line.
+
+    :param stream: file object of the socket
+    :param message: keyword-arguments of the message
+    """
+    stream.write((json.dumps(message) + '\n').encode('utf-8'))
+    stream.flush()
+
+
+def receive(stream):
+    """
+    This function receives a message sent as a JSON line.
+
+    :param stream: file object of the socket
+    :return: dictionary of the message
+    """
+    line = stream.readline()
+    if not line:
+        raise EOFError("Connection closed")
+    return json.loads(line.decode('utf-8'))
+
+
+def connect(path=DAEMON_SOCKET):
+    """
+    This function opens a connection to the daemon.
+
+    :param path: path to the Unix socket of the daemon
+    :return: socket connected to the daemon
+    """
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(path)
+    except socket.error:
+        conn.close()
+        raise
+    return conn
+
+
+def is_running(path=DAEMON_SOCKET):
+    """
+    This function checks if the daemon is listening.
+
+    :param path: path to the Unix socket of the daemon
+    :return: True if the daemon is running
+    """
+    try:
+        connect(path).close()
+        return True
+    except socket.error:
+        return False
+
+
+def start_daemon(path=DAEMON_SOCKET, timeout=DAEMON_START_TIMEOUT):
+    """
+    This function starts the daemon in the background, in its own session so that it survives the terminal, and
+     waits for it to listen.
+
+    :param path: path to the Unix socket of the daemon
+    :param timeout: time given to the daemon for starting
+    :return: True if the daemon is running
+    """
+    if not os.path.isdir(CACHE_FOLDER):
+        os.makedirs(CACHE_FOLDER)
+    with open(os.devnull) as devnull, open(DAEMON_LOG, 'a') as log:
+        Popen([sys.executable, os.path.abspath(os.path.join(FRAMEWORK_FOLDER, 'main.py')), 'daemon'],
+              stdin=devnull, stdout=log, stderr=log, preexec_fn=os.setsid)
+    end = time() + timeout
+    while time() < end:
+        if is_running(path):
+            return True
+        sleep(.1)
+    return False
+
+
+# *************************************** DAEMON ***************************************
+class ClientStream(object):
+    """
+    This class is a file-like object standing for the terminal of the client whose request is being handled : what
+     is written is sent to the client and what is read is asked to the client (e.g. for confirmations). If the
+     client disconnects, the output is dropped and the inputs are empty so that the command still completes.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.closed = False
+
+    def __send(self, **message):
+        if not self.closed:
+            try:
+                send(self.stream, **message)
+            except (IOError, OSError, socket.error):
+                self.closed = True
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+    def readline(self):
+        self.__send(input=True)
+        try:
+            return receive(self.stream).get('input', '') + '\n'
+        except (EOFError, IOError, OSError, ValueError, socket.error):
+            self.closed = True
+            return '\n'
+
+    def write(self, data):
+        self.__send(output=data)
+
+
+class ThreadStream(object):
+    """
+    This class is a file-like object standing for the process-wide standard input or output of the daemon : it
+     dispatches to the stream of the client whose request is handled by the current thread (see ClientStream) or
+     to the default stream for the other threads (e.g. the pool's callbacks).
+
+    :param default: stream used outside of the requests
+    """
+    def __init__(self, default):
+        self.default = default
+        self.local = local()
+
+    def __getattr__(self, name):
+        return getattr(getattr(self.local, 'stream', None) or self.default, name)
+
+    def set(self, stream):
+        """
+        Set the stream of the current thread.
+
+        :param stream: client stream or None for the default stream
+        """
+        self.local.stream = stream
+
+
+class DaemonConsole(FrameworkConsole):
+    """
+    This class is a headless framework console whose state relative to a client is kept per thread, as the requests
+     of several clients are executed concurrently in their own threads : its last command (held by the client and
+     handed over with each request, see FrameworkDaemon.execute) and the last status displayed to it (see do_status).
+    """
+    client = local()
+
+    @property
+    def lastcmd(self):
+        return getattr(self.client, 'lastcmd', '')
+
+    @lastcmd.setter
+    def lastcmd(self, value):
+        self.client.lastcmd = value
+
+    @property
+    def _FrameworkConsole__last_tasklist(self):
+        return getattr(self.client, 'last_tasklist', None)
+
+    @_FrameworkConsole__last_tasklist.setter
+    def _FrameworkConsole__last_tasklist(self, value):
+        self.client.last_tasklist = value
+
+
+class ClientHandler(logging.StreamHandler):
+    """
+    This class forwards to the client the log records of the thread handling its request (not the ones of the
+     pool's callbacks, which only go to the daemon's log).
+    """
+    def __init__(self, stream):
+        super(ClientHandler, self).__init__(stream)
+        self.thread = current_thread().ident
+        self.setFormatter(logging.Formatter(LOG_FORMAT) if coloredlogs is None else
+                          coloredlogs.ColoredFormatter(LOG_FORMAT))
+
+    def emit(self, record):
+        if record.thread == self.thread:
+            super(ClientHandler, self).emit(record)
+
+
+class FrameworkDaemon(object):
+    """
+    This class owns the pool of processes and the list of tasks of a headless framework console and serves the
+     commands of its clients (consoles and fabric tasks) through a Unix socket, each connection being handled in
+     its own thread with its own streams (so that a prompt or a long command does not block the other clients).
+     Tasks thus survive the terminals that submitted them and several operators can submit and monitor them
+     concurrently.
+
+    :param path: path to the Unix socket
+    """
+    def __init__(self, path=DAEMON_SOCKET):
+        self.path = path
+        self.stopped = False
+        self.console = None
+        self.stdin, self.stdout = None, None
+
+    def complete(self, text, line, begidx, endidx):
+        """
+        Complete a command line as Cmd does with readline.
+
+        :return: list of completions
+        """
+        console = self.console
+        stripped = len(line) - len(line.lstrip())
+        line, begidx, endidx = line.lstrip(), begidx - stripped, endidx - stripped
+        if begidx > 0:
+            cmd = console.parseline(line)[0]
+            compfunc = console.completedefault if not cmd else \
+                getattr(console, 'complete_{}'.format(cmd), console.completedefault)
+        else:
+            compfunc = console.completenames
+        return compfunc(text, line, begidx, endidx) or []
+
+    def execute(self, stream, line, lastcmd=''):
+        """
+        Execute a command line on behalf of a client, redirecting the outputs and inputs to the client.
+
+        :param stream: file object of the client's connection
+        :param line: command line
+        :param lastcmd: last command of the client (for re-executing it on an empty line)
+        :return: tuple (new last command of the client, error message if the command failed or None)
+        """
+        client = ClientStream(stream)
+        handler = ClientHandler(client)
+        # the standard streams (used by print() and input() in the commands, and by Cmd, e.g. for 'help') dispatch
+        #  to the client of the current thread
+        self.stdin.set(client)
+        self.stdout.set(client)
+        logger.addHandler(handler)
+        # the last command is only set for the thread of this request (see DaemonConsole)
+        self.console.lastcmd, error = lastcmd, None
+        try:
+            self.console.onecmd(line)
+        except Exception as e:
+            error = "Command '{}' failed ({}: {})".format(line, e.__class__.__name__, e)
+            logger.error(error)
+        finally:
+            logger.removeHandler(handler)
+            self.stdin.set(None)
+            self.stdout.set(None)
+        return self.console.lastcmd, error
+
+    def handle(self, conn):
+        """
+        Handle a request from a client (in the thread of its connection).
+
+        :param conn: socket of the client's connection
+        """
+        stream = conn.makefile('rwb')
+        try:
+            request = receive(stream)
+            if 'complete' in request:
+                send(stream, matches=self.complete(*request['complete']))
+            elif 'line' in request and request['line'].strip() == 'shutdown':
+                logger.info(" > Shutting down the daemon once the opened tasks are over...")
+                self.stopped = True
+                send(stream, done=True, lastcmd=request.get('lastcmd') or '', stop=True)
+            elif 'line' in request:
+                lastcmd, error = self.execute(stream, request['line'], request.get('lastcmd') or '')
+                send(stream, done=True, lastcmd=lastcmd, stop=False, error=error)
+        except (EOFError, IOError, OSError, ValueError, socket.error):
+            pass  # the client disconnected ; its command, if any, was still executed
+        finally:
+            stream.close()
+            conn.close()
+
+    def serve(self):
+        """
+        Serve the requests of the clients until the 'shutdown' command ; SIGTERM (or CTRL+C) terminates the opened
+         tasks.
+        """
+        if is_running(self.path):
+            logger.warning("RPL Attacks Framework daemon is already running (socket: {})".format(self.path))
+            return
+        if not os.path.isdir(CACHE_FOLDER):
+            os.makedirs(CACHE_FOLDER)
+        if os.path.exists(self.path):
+            os.remove(self.path)  # stale socket of a daemon that did not exit properly
+        # process groups and cancellation flags left by a previous daemon are not relevant anymore
+        remove_folder(TASKS_FOLDER)
+        self.console = DaemonConsole(parallel=True, interactive=False)
+        sys.stdin = self.console.stdin = self.stdin = ThreadStream(sys.stdin)
+        sys.stdout = self.console.stdout = self.stdout = ThreadStream(sys.stdout)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        server.listen(5)
+        # accepting times out for checking the shutdown requested by a client in the meantime
+        server.settimeout(DAEMON_POLL_INTERVAL)
+        with open(PIDFILE, 'w') as f:
+            f.write(str(os.getpid()))
+
+        def terminate(signum, frame):
+            raise KeyboardInterrupt
+        signal(SIGTERM, terminate)
+        logger.info(" > Daemon listening on {} (PID: {})".format(self.path, os.getpid()))
+        try:
+            while not self.stopped:
+                try:
+                    conn = server.accept()[0]
+                except socket.timeout:
+                    continue
+                conn.settimeout(None)
+                # the requests being handled when shutting down are completed before exiting (non-daemonic threads)
+                Thread(target=self.handle, args=(conn, )).start()
+        except KeyboardInterrupt:
+            logger.info(" > Terminating opened tasks...")
+            for task, _ in self.console.get_tasks('PENDING'):
+                task.kill()
+            self.console.pool.terminate()
+            self.console.pool.join()
+        finally:
+            server.close()
+            for path in [self.path, PIDFILE]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+# *************************************** CLIENTS **************************************
+class DaemonClient(object):
+    """
+    This class submits command lines to the daemon and relays their outputs and inputs to the current terminal.
+
+    :param path: path to the Unix socket of the daemon
+    """
+    def __init__(self, path=DAEMON_SOCKET):
+        self.path = path
+
+    def complete(self, text, line, begidx, endidx):
+        """
+        Get the completions of a command line.
+
+        :return: list of completions
+        """
+        try:
+            conn = connect(self.path)
+        except socket.error:
+            return []
+        stream = conn.makefile('rwb')
+        try:
+            send(stream, complete=[text, line, begidx, endidx])
+            return receive(stream).get('matches', [])
+        except (EOFError, IOError, OSError, ValueError, socket.error):
+            return []
+        finally:
+            stream.close()
+            conn.close()
+
+    def execute(self, line, lastcmd=''):
+        """
+        Execute a command line in the daemon.
+
+        :param line: command line
+        :param lastcmd: last command executed by this client
+        :return: dictionary with the new last command ('lastcmd'), if the daemon is shutting down ('stop') and the
+                  error message if the command failed ('error')
+        """
+        conn = connect(self.path)
+        stream = conn.makefile('rwb')
+        try:
+            send(stream, line=line, lastcmd=lastcmd)
+            while True:
+                message = receive(stream)
+                if 'output' in message:
+                    sys.stdout.write(message['output'])
+                    sys.stdout.flush()
+                elif 'input' in message:
+                    send(stream, input=std_input('', choices=None))
+                elif message.get('done'):
+                    return message
+        finally:
+            stream.close()
+            conn.close()
+
+
+class ClientConsole(Console):
+    """ Command processor delegating the framework's commands to the daemon. """
+    prompt = FrameworkConsole.prompt
+
+    def __init__(self, path=DAEMON_SOCKET):
+        self.continuation_prompt = self.prompt
+        self.client = DaemonClient(path)
+        # commands requiring the operator's terminal (e.g. Cooja's GUI or a sudo prompt) are run by the client
+        self.commands = {n: f for n, f in get_commands() if getattr(f, 'local', False) or
+                         getattr(f, 'requires_sudo', False)}
+        self.lexer = ArgumentsLexer()
+        super(ClientConsole, self).__init__()
+        self.do_clear('')
+        if not is_running(path):
+            logger.info(" > Starting the daemon (log: {})...".format(DAEMON_LOG))
+            if not start_daemon(path):
+                logger.error("The daemon could not be started, please check its log")
+
+    def completedefault(self, text, line, begidx, endidx):
+        return self.client.complete(text, line, begidx, endidx)
+
+    def completenames(self, text, *ignored):
+        return self.client.complete(text, text, 0, len(text))
+
+    def onecmd(self, line):
+        cmd = self.parseline(line)[0]
+        if cmd in LOCAL_COMMANDS:
+            return super(ClientConsole, self).onecmd(line)
+        if cmd in self.commands.keys():
+            self.lastcmd = line
+            args, kwargs = self.lexer.analyze(line.split(' ', 1)[1] if ' ' in line.strip() else '')
+            if args is None and kwargs is None:
+                return self.default(line)
+            return self.commands[cmd](*args, **kwargs)
+        try:
+            result = self.client.execute(line, self.lastcmd)
+        except socket.error:
+            logger.error("The daemon is not running, please restart the console")
+            return
+        self.lastcmd = result.get('lastcmd') or ''
+        return result.get('stop')
+
+
+def delegate(name, f):
+    """
+    This function makes a command (as returned by get_commands) a thin client of the daemon when the daemon is
+     running : the command is then submitted to the daemon's pool of processes instead of being run sequentially,
+     aborting if it failed in the daemon. Commands requiring the operator's terminal are left unchanged.
+
+    :param name: command name
+    :param f: command function
+    :return: the delegating function
+    """
+    if getattr(f, 'local', False) or getattr(f, 'requires_sudo', False):
+        return f
+
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        if not is_running():
+            return f(*args, **kwargs)
+        # the arguments are quoted so that they reach the command as they were given (e.g. with spaces)
+        line = ' '.join([name] + [quote(a) for a in args] + ['{}={}'.format(k, quote(v)) for k, v in kwargs.items()])
+        result = DaemonClient().execute(line)
+        if result.get('error'):
+            abort(result['error'])
+    return wrapper
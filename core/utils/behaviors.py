@@ -1,13 +1,12 @@
 # -*- coding: utf8 -*-
 import dill
-import os
-import signal
-import time
 from datetime import datetime, timedelta
 from multiprocessing import TimeoutError
 
 from core.conf.constants import TASK_EXPIRATION
 from core.conf.logconfig import logger
+from core.utils.live import format_live_metrics, get_live_metrics
+from core.utils.processes import cancel_task, reset_task
 
 
 class DefaultCommand(object):
@@ -21,8 +20,7 @@ class DefaultCommand(object):
         self.tasklist = console.tasklist
         self.command = command
         self.name = name
-        self.pids = ['{}/with{}-malicious/.{}'.format(path, x, command.__name__.lstrip('_')) for x in ["out", ""]] \
-                    if path is not None else []
+        self.path = path
 
     def run(self, *args, **kwargs):
         return self.command(*args, **kwargs)
@@ -38,14 +36,17 @@ class MultiprocessedCommand(DefaultCommand):
     def __init__(self, console, command, name, path):
         super(MultiprocessedCommand, self).__init__(console, command, name, path)
         self.pool = console.pool
+        self.lock = console.tasklist_lock
         self.task = None
-        self.tasklist[self] = {
-            'name': name,
-            'command': self.command.__name__,
-            'status': 'INIT',
-            'expires': None,
-            'result': 'Not defined yet',
-        }
+        self.then = None
+        with self.lock:
+            self.tasklist[self] = {
+                'name': name,
+                'command': self.command.__name__,
+                'status': 'INIT',
+                'expires': None,
+                'result': 'Not defined yet',
+            }
 
     def __str__(self):
         return '{}[{}]'.format(self.name, self.command.__name__.lstrip('_'))
@@ -53,47 +54,66 @@ class MultiprocessedCommand(DefaultCommand):
     def __set_info(self, status, result=None, expires=True):
         if status != 'PENDING':
             logger.debug(' > Process {} is over.'.format(self))
-        self.tasklist[self].update({'status': status, 'result': result or self.tasklist[self]['result']})
-        if expires:
-            self.tasklist[self]['expires'] = datetime.now() + timedelta(seconds=TASK_EXPIRATION)
+        with self.lock:
+            self.tasklist[self].update({'status': status, 'result': result or self.tasklist[self]['result']})
+            if expires:
+                self.tasklist[self]['expires'] = datetime.now() + timedelta(seconds=TASK_EXPIRATION)
+            return self.tasklist[self]['status'], self.tasklist[self]['result']
 
     def callback(self, state):
+        # this is called in the pool's result handler thread, hence the tasklist is only accessed under its lock
         if isinstance(state, tuple):
-            self.__set_info(*state)
+            status, result = self.__set_info(*state)
         else:
-            self.__set_info('UNDEFINED', "None")
+            status, result = self.__set_info('UNDEFINED', "None")
+        # a continuation can be attached to the task (e.g. the next stage of a pipeline, see core.utils.scheduler) ;
+        #  it is called without holding the lock of the tasklist as it may start new tasks
+        if self.then is not None:
+            try:
+                self.then(status, result)
+            except Exception as e:
+                logger.error("Continuation of {} failed ({}: {})".format(self, e.__class__.__name__, e))
+
+    def get_progress(self):
+        """
+        Get the partial metrics of a pending 'run' task, as parsed while the simulations are running.
+
+        :return: formatted metrics or None
+        """
+        if self.command.__name__.lstrip('_') != 'run' or self.path is None or \
+                self.tasklist[self]['status'] != 'PENDING':
+            return
+        metrics = get_live_metrics(self.path)
+        return format_live_metrics(metrics) if len(metrics) > 0 else None
 
     def is_expired(self):
         return datetime.now() > (self.tasklist[self]['expires'] or datetime.now())
 
-    def kill(self, retries=3, pause=.1):
+    def kill(self):
+        # the task is flagged as cancelled so that it starts no new command (e.g. the simulation with the malicious
+        #  mote after the one without) and the process group it is running is terminated and reaped ; the status is
+        #  checked under the lock of the tasklist so that the task cannot be started again in the meantime
+        with self.lock:
+            if self.tasklist[self]['status'] == 'PENDING':
+                cancel_task(str(self))
         try:
-            try:
-                self.task.get(1)
-                self.__set_info('KILLED', "None")
-            except (AttributeError, TimeoutError):
-                self.__set_info('CANCELLED', "None")
-            except UnicodeEncodeError:
-                self.__set_info('CRASHED', "None")
-            for pid in self.pids:
-                try:
-                    with open(pid) as f:
-                        os.kill(int(f.read().strip()), signal.SIGTERM)
-                    os.remove(pid)
-                except (IOError, OSError):
-                    pass  # simply fail silently when no PID or OS cannot kill it as it is already terminated
-            if self.command.__name__.lstrip('_') == 'run' and retries > 0:
-                time.sleep(pause)  # wait ... sec that the next call from the command starts
-                                   # this is necessary e.g. with cooja command (when Cooja starts a first time for
-                                   #  a simulation without a malicious mote then a second time with)
-                self.kill(retries - 1, 2 * pause)  # then kill it
-        except KeyboardInterrupt:
-            self.kill(0, 0)
+            self.task.get(1)
+            self.__set_info('KILLED', "None")
+        except (AttributeError, TimeoutError):
+            self.__set_info('CANCELLED', "None")
+        except UnicodeEncodeError:
+            self.__set_info('CRASHED', "None")
 
     def run(self, *args, **kwargs):
-        if self not in self.tasklist.keys() or self.tasklist[self]['status'] != 'PENDING':
+        with self.lock:
+            if self in self.tasklist.keys() and self.tasklist[self]['status'] == 'PENDING':
+                return
+            # a cancellation flag left by a previous execution of this task would cancel this one at its first command
+            reset_task(str(self))
             self.__set_info('PENDING', expires=False)
-            kwargs.pop('console', None)  # console instance must be removed as it is unpickable and will thus make
-            #                               apply_async fail
-            kwargs['loglevel'] = logger.level  # logging level is appended to set it in the subprocess
-            self.task = self.pool.apply_async(self.command, args, kwargs, callback=self.callback)
+        self.then = kwargs.pop('then', None)  # the continuation is called in the console's process
+        kwargs.pop('console', None)  # console instance must be removed as it is unpickable and will thus make
+        #                               apply_async fail
+        kwargs['loglevel'] = logger.level  # logging level is appended to set it in the subprocess
+        kwargs['telemetry'] = str(self)    # task identifier is appended for reporting its telemetry
+        self.task = self.pool.apply_async(self.command, args, kwargs, callback=self.callback)
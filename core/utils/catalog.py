@@ -0,0 +1,288 @@
+# -*- coding: utf8 -*-
+import ast
+import json
+import sqlite3
+from collections import OrderedDict
+from datetime import datetime
+from hashlib import sha1
+from os import listdir, stat
+from os.path import basename, isdir, join, normpath
+from re import match
+from six import string_types
+
+from core.conf.constants import CACHE_FOLDER, CATALOG, DEFAULTS, EXPERIMENT_FOLDER
+from core.conf.logconfig import logger
+from core.utils.helpers import read_config
+from core.utils.report import get_simulation_metrics
+from core.utils.rpla import get_path
+
+
+# parameters from simulation.conf that are indexed in a dedicated column, with their SQL type
+CATALOG_PARAMETERS = OrderedDict([
+    ('campaign', 'TEXT'),
+    ('title', 'TEXT'),
+    ('target', 'TEXT'),
+    ('malicious_target', 'TEXT'),
+    ('n', 'INTEGER'),
+    ('duration', 'INTEGER'),
+    ('blocks', 'TEXT'),
+    ('mtype_root', 'TEXT'),
+    ('mtype_sensor', 'TEXT'),
+    ('mtype_malicious', 'TEXT'),
+    ('tx_range', 'REAL'),
+    ('int_range', 'REAL'),
+    ('area_side', 'REAL'),
+    ('debug', 'INTEGER'),
+])
+# stages whose status and timings are recorded
+CATALOG_STAGES = ['make', 'run']
+# summary metrics, suffixed with '_without' for the simulation without the malicious mote
+CATALOG_METRICS = OrderedDict([
+    ('avg_on', ('power_on', 'REAL')),
+    ('avg_tx', ('power_tx', 'REAL')),
+    ('avg_rx', ('power_rx', 'REAL')),
+    ('avg_int', ('power_int', 'REAL')),
+    ('rpl_messages', ('rpl_messages', 'INTEGER')),
+    ('rpl_bytes', ('rpl_bytes', 'INTEGER')),
+    ('depth_avg', ('depth_avg', 'REAL')),
+    ('delivery', ('delivery', 'REAL')),
+])
+CATALOG_COLUMNS = OrderedDict([('name', 'TEXT PRIMARY KEY')] + list(CATALOG_PARAMETERS.items()) +
+                              [('params', 'TEXT'), ('input_hash', 'TEXT'), ('mtime', 'REAL')] +
+                              [('{}_{}'.format(s, f), t) for s in CATALOG_STAGES
+                               for f, t in [('status', 'TEXT'), ('time', 'REAL'), ('at', 'TEXT')]] +
+                              [(m, t) for m, (_, t) in CATALOG_METRICS.items()] +
+                              [('{}_without'.format(m), t) for m, (_, t) in CATALOG_METRICS.items()])
+# history of the durations of the stages, with the parameters their cost depends on (see get_cost_parameters)
+TIMED_STAGES = ['make', 'run', 'parse']
+TIMINGS_COLUMNS = OrderedDict([('name', 'TEXT'), ('stage', 'TEXT'), ('elapsed', 'REAL'), ('at', 'TEXT'),
+                               ('target', 'TEXT'), ('n', 'INTEGER'), ('duration', 'INTEGER'), ('blocks', 'INTEGER')])
+CONDITION_REGEX = r'^(?P<column>[a-z_]+)(?P<operator><=|>=|<|>)(?P<value>.+)$'
+
+
+# ************************************** CATALOG CONNECTION *****************************************
+def connect():
+    """
+    This function opens the catalog of experiments, creating its schema if necessary.
+
+    :return: SQLite connection
+    """
+    get_path(CACHE_FOLDER, create=True)
+    db = sqlite3.connect(CATALOG, timeout=30)
+    db.row_factory = sqlite3.Row
+    db.execute('CREATE TABLE IF NOT EXISTS experiments ({})'
+               .format(', '.join('{} {}'.format(c, t) for c, t in CATALOG_COLUMNS.items())))
+    db.execute('CREATE TABLE IF NOT EXISTS timings ({})'
+               .format(', '.join('{} {}'.format(c, t) for c, t in TIMINGS_COLUMNS.items())))
+    return db
+
+
+# *********************************** CATALOG UPDATE FUNCTIONS **************************************
+def get_cost_parameters(params):
+    """
+    This function extracts the parameters the cost of an experiment's stages depends on.
+
+    :param params: configuration of an experiment (see validated_parameters) or its raw parameters in a campaign
+    :return: dictionary with 'target', 'n', 'duration' and 'blocks' (number of building blocks) keys
+    """
+    sim, malicious = params.get('simulation') or {}, params.get('malicious') or {}
+    return {
+        'target': params.get('target') or sim.get('target') or DEFAULTS['target'],
+        'n': params.get('n') or sim.get('number-motes') or DEFAULTS['number-motes'],
+        'duration': params.get('duration') or sim.get('duration') or DEFAULTS['duration'],
+        'blocks': len(params.get('blocks') or malicious.get('building-blocks') or DEFAULTS['building-blocks']),
+    }
+
+
+def get_experiment_mtime(path):
+    """
+    This function returns the last modification time of the items of an experiment that the catalog depends on.
+
+    :param path: path to the experiment
+    :return: modification time or None if the experiment is not configured
+    """
+    mtimes = []
+    for item in ['simulation.conf', 'with-malicious/results', 'without-malicious/results']:
+        try:
+            mtimes.append(stat(join(path, item)).st_mtime)
+        except OSError:
+            if item == 'simulation.conf':
+                return
+    return max(mtimes)
+
+
+def get_input_hash(path):
+    """
+    This function computes the hash of the inputs of an experiment, that is, its configuration and its
+     simulation files.
+
+    :param path: path to the experiment
+    :return: SHA1 hexdigest
+    """
+    h = sha1()
+    for item in ['simulation.conf', 'with-malicious/simulation.csc', 'without-malicious/simulation.csc']:
+        try:
+            with open(join(path, item), 'rb') as f:
+                for chunk in iter(lambda: f.read(65536), b''):
+                    h.update(chunk)
+        except IOError:
+            pass
+    return h.hexdigest()
+
+
+def index_experiment(path, stage=None, status=None, elapsed=None, db=None):
+    """
+    This function (re)indexes an experiment in the catalog, eventually recording the status and the duration
+     of one of its stages.
+
+    :param path: path to the experiment
+    :param stage: name of the stage that was just executed (amongst CATALOG_STAGES)
+    :param status: status of the stage
+    :param elapsed: duration of the stage in seconds
+    :param db: opened connection to the catalog (if None, a new one is opened then closed)
+    """
+    name, close = basename(normpath(path)), db is None
+    db = db or connect()
+    try:
+        params = read_config(path)
+        row = {p: params.get(p) for p in CATALOG_PARAMETERS.keys()}
+        row['blocks'] = ',{},'.format(','.join(row['blocks'] or []))
+        row.update(name=name, params=json.dumps(params), input_hash=get_input_hash(path),
+                   mtime=get_experiment_mtime(path))
+        for suffix, sim in [('', 'with'), ('_without', 'without')]:
+            try:
+                metrics = get_simulation_metrics(join(path, '{}-malicious'.format(sim)))[0]
+            except Exception:  # occurs when the experiment was not run yet or when its results are incomplete
+                metrics = {}
+            for column, (metric, _) in CATALOG_METRICS.items():
+                row[column + suffix] = metrics.get(metric)
+        if stage in CATALOG_STAGES:
+            row.update({'{}_status'.format(stage): status, '{}_time'.format(stage): elapsed,
+                        '{}_at'.format(stage): datetime.now().isoformat()})
+        with db:
+            db.execute('INSERT OR IGNORE INTO experiments (name) VALUES (?)', (name, ))
+            db.execute('UPDATE experiments SET {} WHERE name = ?'.format(', '.join('{} = ?'.format(c) for c in row)),
+                       list(row.values()) + [name])
+            # successful stages are kept in the history of timings for predicting the cost of the next ones
+            if stage in TIMED_STAGES and status == 'SUCCESS' and elapsed is not None:
+                timing = dict(get_cost_parameters(params), name=name, stage=stage, elapsed=elapsed,
+                              at=datetime.now().isoformat())
+                db.execute('INSERT INTO timings ({}) VALUES ({})'.format(', '.join(TIMINGS_COLUMNS.keys()),
+                                                                        ', '.join('?' * len(TIMINGS_COLUMNS))),
+                           [timing[c] for c in TIMINGS_COLUMNS.keys()])
+    finally:
+        if close:
+            db.close()
+
+
+def remove_from_catalog(name):
+    """
+    This function removes an experiment from the catalog.
+
+    :param name: experiment name
+    """
+    db = connect()
+    try:
+        with db:
+            db.execute('DELETE FROM experiments WHERE name = ?', (name, ))
+    finally:
+        db.close()
+
+
+def sync_catalog(rebuild=False):
+    """
+    This function synchronizes the catalog with the experiments folder. Only the experiments that were modified
+     since they were indexed are reindexed, based on the modification times of their configuration and results.
+
+    :param rebuild: reindex all the experiments
+    :return: tuple (number of reindexed experiments, number of removed experiments)
+    """
+    db = connect()
+    try:
+        indexed = {r['name']: r['mtime'] for r in db.execute('SELECT name, mtime FROM experiments')}
+        present, updated = set(), 0
+        for name in listdir(EXPERIMENT_FOLDER):
+            path = join(EXPERIMENT_FOLDER, name)
+            if name.startswith('.') or not isdir(path):
+                continue
+            mtime = get_experiment_mtime(path)
+            if mtime is None:
+                continue
+            present.add(name)
+            if rebuild or indexed.get(name) != mtime:
+                logger.debug(" > Indexing experiment '{}'...".format(name))
+                index_experiment(path, db=db)
+                updated += 1
+        removed = set(indexed.keys()) - present
+        with db:
+            db.executemany('DELETE FROM experiments WHERE name = ?', [(n, ) for n in removed])
+    finally:
+        db.close()
+    return updated, len(removed)
+
+
+# ************************************** CATALOG QUERY FUNCTIONS **************************************
+def get_timings(stages=None):
+    """
+    This function retrieves the history of the durations of experiments' stages.
+
+    :param stages: list of stages to be retrieved (default: all the stages in TIMED_STAGES)
+    :return: list of dictionaries formatted as TIMINGS_COLUMNS
+    """
+    stages = stages or TIMED_STAGES
+    db = connect()
+    try:
+        return [dict(r) for r in db.execute('SELECT * FROM timings WHERE stage IN ({})'
+                                            .format(', '.join('?' * len(stages))), stages)]
+    finally:
+        db.close()
+
+
+def query_catalog(conditions=(), filters=None, sort=None, limit=None):
+    """
+    This function queries the catalog of experiments.
+
+    :param conditions: list of comparisons formatted as '[column][<|>|<=|>=][value]' (e.g. 'n>20')
+    :param filters: dictionary of equality filters ; for the building blocks, experiments holding the given
+                     block are matched
+    :param sort: column to sort the results on, prefixed with '-' for a descending order
+    :param limit: maximum number of results
+    :return: list of dictionaries with the matching experiments
+    """
+    def value(v):
+        try:
+            return ast.literal_eval(v) if isinstance(v, string_types) else v
+        except (SyntaxError, ValueError):
+            return v
+
+    def column(c):
+        if c not in CATALOG_COLUMNS.keys():
+            raise ValueError("Unknown catalog field '{}'".format(c))
+        return c
+
+    clauses, values = [], []
+    for condition in conditions:
+        m = match(CONDITION_REGEX, condition)
+        if m is None:
+            raise ValueError("Bad condition '{}'".format(condition))
+        clauses.append('{} {} ?'.format(column(m.group('column')), m.group('operator')))
+        values.append(value(m.group('value')))
+    for k, v in (filters or {}).items():
+        if k == 'blocks':
+            clauses.append('blocks LIKE ?')
+            values.append('%,{},%'.format(v))
+        else:
+            clauses.append('{} = ?'.format(column(k)))
+            values.append(value(v))
+    sql = 'SELECT * FROM experiments'
+    if len(clauses) > 0:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    if sort is not None:
+        sql += ' ORDER BY {} {}'.format(column(sort.lstrip('-')), ['ASC', 'DESC'][sort.startswith('-')])
+    if limit is not None:
+        sql += ' LIMIT {:d}'.format(int(limit))
+    db = connect()
+    try:
+        return [dict(r) for r in db.execute(sql, values)]
+    finally:
+        db.close()
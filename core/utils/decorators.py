@@ -5,11 +5,16 @@ from functools import update_wrapper, wraps
 from os import system
 from os.path import dirname, exists, expanduser, join
 from re import match
+from time import time
 
 from core.common.helpers import std_input
 from core.common.lexer import ArgumentsLexer
 from core.conf.logconfig import logger
 from core.utils.behaviors import DefaultCommand, MultiprocessedCommand
+from core.utils.catalog import index_experiment
+from core.utils.processes import track_task, untrack_task
+from core.utils.profiling import PROFILE_KINDS, start_profile, stop_profile
+from core.utils.telemetry import start_task, stop_task
 
 
 lexer = ArgumentsLexer()
@@ -88,6 +93,10 @@ def command(**params):
                     print(console.badcmd_msg.format("Invalid", '{} {}'.format(f.__name__, line)))
                     return
                 kwargs.update(kwargs_tmp)
+            # the profiling option is handed over to the tasks of the pool (see CommandMonitor)
+            if kwargs.get('profile') not in [None] + PROFILE_KINDS:
+                logger.error("Bad profile '{}' (should be {})".format(kwargs['profile'], ' or '.join(PROFILE_KINDS)))
+                return
             # bad signature check
             sig = signature(f)
             args = () if args == ('',) else args     # occurs in case of Cmd ; an empty 'line' can be passed if a
@@ -147,7 +156,7 @@ def command(**params):
             # run the command and catch exception if any
             if console is not None and len(args) > 0:
                 console.clean_tasks()
-                pending_tasks = {i['name']: str(o) for o, i in console.tasklist.items() if i['status'] == 'PENDING'}
+                pending_tasks = {i['name']: str(o) for o, i in console.get_tasks('PENDING')}
                 if args[0] not in pending_tasks.keys():
                     if hasattr(f, 'start_msg'):
                         log_msg('info', f.start_msg)
@@ -167,7 +176,11 @@ def command(**params):
 class CommandMonitor(object):
     """
     This ugly class decorator is aimed to make a function 'f' pickable (required for multiprocessing) while
-     using a decoration that handles exceptions and returns a tuple ([status], [result/error message]).
+     using a decoration that handles exceptions and returns a tuple ([status], [result/error message]). When
+     it is given a 'telemetry' keyword-argument (the task identifier), the resources used by the function are
+     reported to the console while it runs (see core.utils.telemetry) and the process groups it runs are tracked
+     for cancellation (see core.utils.processes). When it is given a 'profile' keyword-argument ('cpu' or
+     'memory'), the function is profiled and its profile is saved in the experiment (see core.utils.profiling).
 
     :param f: the decorated function
     """
@@ -179,10 +192,51 @@ class CommandMonitor(object):
             pass
 
     def __call__(self, *args, **kwargs):
+        key, profile = kwargs.pop('telemetry', None), kwargs.pop('profile', None)
+        if key is not None:
+            track_task(key)
+            start_task(key, kwargs.get('path'))
+        if profile is not None:
+            start_profile(profile)
         try:
             return 'SUCCESS', self.f(*args, **kwargs) or 'No result'
         except Exception as e:
             return 'FAIL', '{}: {}'.format(e.__class__.__name__, str(e))
+        finally:
+            if profile is not None:
+                try:
+                    stop_profile(self.f.__name__.lstrip('_'), kwargs.get('path'))
+                except Exception as e:
+                    logger.warning("Profile could not be saved ({}: {})".format(e.__class__.__name__, str(e)))
+            if key is not None:
+                stop_task()
+                untrack_task()
+
+
+def record_stage(stage):
+    """
+    This decorator records the status and the duration of an experiment's stage in the catalog of experiments
+     once the decorated function is over. The decorated function must take the experiment's path as its 'path'
+     keyword-argument.
+
+    :param stage: name of the stage (e.g. 'make' or 'run')
+    :return: the decorator function
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            start, status = time(), 'FAIL'
+            try:
+                result = f(*args, **kwargs)
+                status = 'FAIL' if result is False else 'SUCCESS'
+                return result
+            finally:
+                try:
+                    index_experiment(kwargs['path'], stage, status, time() - start)
+                except Exception as e:
+                    logger.warning("Catalog could not be updated ({}: {})".format(e.__class__.__name__, str(e)))
+        return wrapper
+    return decorator
 
 
 def no_arg_command(f):
@@ -231,7 +285,7 @@ def stderr(f):
     """
     @wraps(f)
     def wrapper(cmd, *args, **kwargs):
-        if f.__name__ == 'local':
+        if f.__name__ in ['local', 'local_group']:
             kwargs['capture'] = True
         out = f(cmd + ' 2>&1 /dev/null', *args, **kwargs)
         if out is not None and out.return_code != 0:
@@ -0,0 +1,181 @@
+# -*- coding: utf8 -*-
+import json
+from collections import Counter
+from os import rename
+from os.path import dirname, exists, join, normpath
+from re import compile, match
+from threading import Event, Thread
+
+from core.conf.logconfig import logger
+from core.utils.helpers import read_config
+from core.utils.parser import PowerTrackerConverter, RELATIONSHIP_REGEX
+from core.utils.report import get_depths
+
+
+LIVE_FILE = '.live.json'
+LIVE_INTERVAL = 2  # seconds
+LIVE_STAGES = ['convert_powertracker_log_to_csv']
+RPL_MESSAGE_REGEX = compile(r'(?P<type>DIS|DIO|DAO-ACK|DAO ACK|DAO)\b')
+
+
+class LogFollower(object):
+    """
+    This class follows a log file while it is being written, returning its new complete lines at each read.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.buffer = ''
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+    def readlines(self):
+        """
+        Read the lines that were completed since the last read (the log may not exist yet).
+
+        :return: list of lines
+        """
+        if self.file is None:
+            if not exists(self.path):
+                return []
+            self.file = open(self.path)
+        self.buffer += self.file.read()
+        lines = self.buffer.split('\n')
+        self.buffer = lines.pop()
+        return lines
+
+
+class LiveParser(Thread):
+    """
+    This class parses the logs of a simulation (from ./data) while Cooja is running. It converts the PowerTracker
+     log on the fly (to ./results/powertracker.csv), keeps running aggregates of the DODAG, the radio usage and the
+     RPL messages and periodically writes these partial metrics (to ./.live.json) for the console's status.
+    """
+    def __init__(self, path, interval=LIVE_INTERVAL):
+        super(LiveParser, self).__init__()
+        self.daemon = True
+        self.path = path
+        self.interval = interval
+        self.stopped = Event()
+        self.duration = read_config(dirname(normpath(path))).get('duration')
+        self.logs = {k: LogFollower(join(path, 'data', '{}.log'.format(k)))
+                     for k in ['powertracker', 'relationships', 'rpl']}
+        self.power_file = open(join(path, 'results', 'powertracker.csv'), 'w')
+        self.power = PowerTrackerConverter(self.power_file)
+        self.parents, self.messages, self.time = {}, Counter(), 0.
+        self.failed = False
+
+    def get_metrics(self):
+        """
+        Compute the partial metrics from the running aggregates.
+
+        :return: dictionary of metrics
+        """
+        depths = list(get_depths(self.parents).values())
+        rows = [r for r in self.power.last.values() if r['monitored_time'] > 0]
+        return {
+            'time': self.time,
+            'progress': min(100., 100. * self.time / self.duration) if self.duration else None,
+            'motes': len(depths),
+            'depth_avg': float(sum(depths)) / len(depths) if len(depths) > 0 else None,
+            'radio_on': 100. * sum(r['on_time'] / r['monitored_time'] for r in rows) / len(rows)
+                        if len(rows) > 0 else None,
+            'rpl': dict(self.messages),
+        }
+
+    def update(self):
+        """
+        Consume the new lines of the logs and write the partial metrics.
+        """
+        for line in self.logs['powertracker'].readlines():
+            row = self.power.feed(line)
+            if row is not None:
+                self.time = max(self.time, row['monitored_time'])
+        for line in self.logs['relationships'].readlines():
+            self.__set_time(line)
+            try:
+                d = match(RELATIONSHIP_REGEX, line.strip()).groupdict()
+                if int(d['flag']) != 0:
+                    self.parents[int(d['mote_id'])] = int(d['parent_id'])
+            except AttributeError:
+                continue
+        for line in self.logs['rpl'].readlines():
+            self.__set_time(line)
+            m = RPL_MESSAGE_REGEX.search(line)
+            if m is not None:
+                self.messages[m.group('type').replace(' ', '-').lower()] += 1
+        self.power_file.flush()
+        # the metrics are written atomically as the console may read them at any time
+        tmp = join(self.path, LIVE_FILE + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.get_metrics(), f)
+        rename(tmp, join(self.path, LIVE_FILE))
+
+    def __set_time(self, line):
+        try:
+            self.time = max(self.time, int(line.split('\t', 1)[0]) / 10. ** 6)
+        except ValueError:
+            pass
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                self.update()
+            self.update()
+        except Exception as e:
+            self.failed = True
+            logger.warning("Live parsing of '{}' failed ({}: {})".format(self.path, e.__class__.__name__, e))
+        finally:
+            for log in self.logs.values():
+                log.close()
+            self.power_file.close()
+
+    def stop(self):
+        """
+        Stop following the logs after a last update.
+
+        :return: list of the parsing stages whose outputs are complete (see parsing_chain)
+        """
+        self.stopped.set()
+        self.join()
+        if self.failed or len(self.power.pending) > 0 or len(self.power.last) == 0:
+            return []
+        return LIVE_STAGES
+
+
+def get_live_metrics(path):
+    """
+    This function retrieves the partial metrics of the simulations of an experiment.
+
+    :param path: path to the experiment
+    :return: dictionary with simulation names as keys and metrics as values (only for started simulations)
+    """
+    metrics = {}
+    for sim in ["without", "with"]:
+        try:
+            with open(join(path, '{}-malicious'.format(sim), LIVE_FILE)) as f:
+                metrics[sim] = json.load(f)
+        except (IOError, OSError, ValueError):
+            continue
+    return metrics
+
+
+def format_live_metrics(metrics):
+    """
+    This function formats the partial metrics of the simulations of an experiment in a short string.
+
+    :param metrics: dictionary as returned by get_live_metrics
+    :return: formatted string
+    """
+    items = []
+    for sim, m in sorted(metrics.items(), key=lambda x: x[0] == 'with'):
+        item = "{}: {}".format(sim, "{:.0f}%".format(m['progress']) if m['progress'] is not None
+                               else "{:.0f}s".format(m['time']))
+        item += ", {} motes".format(m['motes'])
+        if m['radio_on'] is not None:
+            item += ", ON {:.1f}%".format(m['radio_on'])
+        item += ", {} RPL msgs".format(sum(m['rpl'].values()))
+        items.append(item)
+    return " | ".join(items)
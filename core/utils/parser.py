@@ -1,25 +1,181 @@
 # -*- coding: utf8 -*-
-import networkx
+import json
 import numpy
-from csv import DictReader, DictWriter
-from matplotlib import pyplot
-from matplotlib.patches import FancyArrowPatch
-from os.path import basename, join, normpath
-from re import finditer, match, MULTILINE
+import pandas
+from collections import OrderedDict
+from csv import DictWriter
+from hashlib import sha1
+from os import stat
+from os.path import basename, dirname, exists, join, normpath
+from re import compile, match
+from shutil import copyfileobj
 from subprocess import Popen, PIPE
 
+from core.common.helpers import find_file, open_file, remove_files, COMPRESSION_EXTENSIONS
+from core.conf.constants import PLOT_FORMAT, PLOTS
+from core.conf.logconfig import logger
+from core.utils.helpers import read_config
+from core.utils.plots import render_batch, render_plot
 from core.utils.rpla import get_available_platforms, get_motes_from_simulation
+from core.utils.tracing import trace
+
+
+MANIFEST = '.manifest.json'
+PARSING_STAGES = OrderedDict()
+
+
+def parsing_stage(inputs, outputs, version=1, parameters=None, config=None, plot=False):
+    """
+    This decorator registers a parsing function as a stage of the parsing chain. Stages are executed in the order
+     of their definition.
+
+    :param inputs: list of input files, relative to the experiment (including [with-|without-malicious])
+    :param outputs: list of output files, relative to the experiment (including [with-|without-malicious])
+    :param version: version of the parsing function, to be incremented when its outputs change
+    :param parameters: dictionary of keyword-arguments to be passed to the parsing function
+    :param config: list of experiment parameters (from simulation.conf) the outputs depend on
+    :param plot: whether the stage only renders plots (these stages are skipped when plots are disabled)
+    :return: the decorator function
+    """
+    def decorator(f):
+        PARSING_STAGES[f.__name__] = {'function': f, 'inputs': inputs, 'outputs': outputs, 'version': version,
+                                      'parameters': parameters or {}, 'config': config or [], 'plot': plot}
+        return f
+    return decorator
 
 
 # *************************************** MAIN PARSING FUNCTION ****************************************
-def parsing_chain(path):
-    convert_pcap_to_csv(path)
-    convert_powertracker_log_to_csv(path)
-    draw_dodag(path)
-    draw_power_barchart(path)
+def get_file_hash(path):
+    """
+    This function computes the hash of the (decompressed) content of a file, so that compressing a file does not
+     change its hash.
+
+    :param path: path to the file, without the extension of the compression codec
+    :return: SHA1 hexdigest
+    """
+    h = sha1()
+    with open_file(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def get_inputs_state(path, inputs, previous=None):
+    """
+    This function computes the state of a list of input files as [size, mtime, hash]. The hash is only computed
+     when the size or the modification time differ from the previous state.
+
+    :param path: path to the experiment (including [with-|without-malicious])
+    :param inputs: list of input files, relative to path
+    :param previous: previous state of the input files (from the manifest)
+    :return: dictionary with input files as keys and their states as values (None if a file does not exist)
+    """
+    state, previous = {}, previous or {}
+    for item in inputs:
+        filename = find_file(join(path, item))
+        try:
+            s = stat(filename)
+        except OSError:
+            state[item] = None
+            continue
+        old = previous.get(item)
+        if old is not None and old[:2] == [s.st_size, s.st_mtime]:
+            state[item] = old
+        else:
+            state[item] = [s.st_size, s.st_mtime, get_file_hash(join(path, item))]
+    return state
+
+
+def is_up_to_date(path, stage, entry, previous):
+    """
+    This function checks if the outputs of a parsing stage are up-to-date regarding its manifest entry.
+
+    :param path: path to the experiment (including [with-|without-malicious])
+    :param stage: parsing stage (from PARSING_STAGES)
+    :param entry: current manifest entry of the stage
+    :param previous: manifest entry of the stage when it was last computed
+    :return: True if the stage does not need to be recomputed
+    """
+    if any(entry[k] != previous.get(k) for k in ['version', 'parameters']):
+        return False
+    for item, state in entry['inputs'].items():
+        old = previous['inputs'].get(item)
+        if state is None or old is None or state[2] != old[2]:
+            return False
+    return all(exists(find_file(join(path, output))) for output in stage['outputs'])
+
+
+def parsing_chain(path, incremental=False, stages=None, plots=PLOTS, done=None):
+    """
+    This function runs the parsing stages for a simulation and keeps a manifest (to ./results/.manifest.json) of
+     the versions, parameters and input hashes each stage was computed with. In incremental mode, a stage is only
+     recomputed if one of these changed or if one of its outputs is missing.
+
+    :param path: path to the experiment (including [with-|without-malicious])
+    :param incremental: only recompute the stages whose inputs changed
+    :param stages: list of stages to be considered (default: all the stages)
+    :param plots: whether the plotting stages are to be run (default: see PLOTS)
+    :param done: list of stages whose outputs were already computed otherwise (e.g. while the simulation was
+                  running) and that are only to be recorded in the manifest
+    :return: list of the recomputed stages
+    """
+    manifest_path = join(path, 'results', MANIFEST)
+    manifest = {}
+    if exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    config, recomputed = read_config(dirname(normpath(path))), []
+    for name, stage in PARSING_STAGES.items():
+        if stages is not None and name not in stages or stage['plot'] and not plots:
+            continue
+        previous = manifest.get(name, {})
+        entry = {
+            'version': stage['version'],
+            'parameters': json.loads(json.dumps(dict([(k, config.get(k)) for k in stage['config']],
+                                                     **stage['parameters']))),
+            'inputs': get_inputs_state(path, stage['inputs'], previous.get('inputs')),
+        }
+        if name in (done or []) or incremental and is_up_to_date(path, stage, entry, previous):
+            manifest[name] = entry
+            continue
+        logger.debug(" > Parsing stage '{}'...".format(name))
+        with trace(name, simulation=basename(normpath(path))):
+            stage['function'](path, **stage['parameters'])
+        # remove outdated compressed versions of the outputs (these are compressed again afterwards)
+        for output in stage['outputs']:
+            remove_files(path, *[output + ext for ext in COMPRESSION_EXTENSIONS.values()
+                                 if exists(join(path, output + ext))])
+        manifest[name] = entry
+        recomputed.append(name)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return recomputed
+
+
+def _draw_plots(path):
+    """
+    This function is a pickable wrapper for rendering the outdated plots of a simulation with a pool of processes.
+
+    :param path: path to the experiment (including [with-|without-malicious])
+    :return: list of the rendered plots
+    """
+    return parsing_chain(path, incremental=True, stages=[n for n, s in PARSING_STAGES.items() if s['plot']],
+                         plots=True)
+
+
+def draw_plots(paths, processes=None):
+    """
+    This function renders the outdated plots of a list of simulations in a dedicated pool of processes.
+
+    :param paths: list of paths to experiments (including [with-|without-malicious])
+    :param processes: number of processes to be used (default: number of CPU's)
+    :return: number of rendered plots
+    """
+    return sum(len(r) for r in render_batch(_draw_plots, paths, processes) if r is not None)
 
 
 # *********************************** SIMULATION PARSING FUNCTIONS *************************************
+@parsing_stage(inputs=['data/output.pcap'], outputs=['results/pcap.csv'])
 def convert_pcap_to_csv(path):
     """
     This function creates a CSV file (to ./results) from a PCAP file (from ./data).
@@ -28,11 +184,15 @@ def convert_pcap_to_csv(path):
     :param path: path to the experiment (including [with-|without-malicious])
     """
     data, results = join(path, 'data'), join(path, 'results')
+    pcap = join(data, 'output.pcap')
+    # a compressed capture is streamed to tshark through its standard input
+    compressed = find_file(pcap) != pcap
     with open(join(results, 'pcap.csv'), 'wb') as f:
         p = Popen(['tshark',
                    '-T', 'fields',
                    '-E', 'header=y',
                    '-E', 'separator=,',
+                   '-E', 'quote=d',
                    '-e', 'frame.time',
                    '-e', 'frame.len',
                    '-e', 'wpan.src64',
@@ -42,15 +202,130 @@ def convert_pcap_to_csv(path):
                    '-e', 'ipv6.dst',
                    '-e', 'icmpv6.code',
                    '-e', 'data.data',
-                   '-r', join(data, 'output.pcap')], stdout=PIPE)
-        out, _ = p.communicate()
-        f.write(out)
+                   '-e', 'frame.time_relative',
+                   '-e', 'icmpv6.rpl.dio.version',
+                   '-e', 'icmpv6.rpl.dio.rank',
+                   '-r', '-' if compressed else pcap], stdin=PIPE if compressed else None, stdout=f)
+        if compressed:
+            try:
+                with open_file(pcap, 'rb') as pf:
+                    copyfileobj(pf, p.stdin)
+            except (IOError, OSError):
+                pass  # occurs when tshark exits before reading the whole capture
+            finally:
+                p.stdin.close()
+        p.wait()
+
+
+RPL_ICMPV6_TYPE = 155
+RPL_CONTROL_CODES = OrderedDict([(0, 'dis'), (1, 'dio'), (2, 'dao'), (3, 'dao_ack')])
+RPL_WINDOW = 10  # seconds
+
+
+def get_mote_ids(addresses):
+    """
+    This function derives mote identifiers from the 64-bit 802.15.4 source addresses found in the PCAP.
+    Cooja builds these addresses from the mote ID, either as 00:12:74:II:00:II:II:II (Sky-like platforms,
+     the 16-bit ID being held by the 5th and 6th bytes) or as XX:XX:00:00:00:00:II:II (Z1-like platforms).
+
+    :param addresses: pandas Series of 64-bit addresses formatted as xx:xx:xx:xx:xx:xx:xx:xx
+    :return: pandas Series of integer mote IDs (-1 when the address is missing)
+    """
+    addresses = addresses.fillna('').astype(str).str.replace(':', '')
+    ids = addresses.str[-4:].where(~addresses.str.startswith('001274'), addresses.str[8:12])
+    # conversion is only performed once per distinct address, then mapped to the whole column
+    ids_map = {a: int(a, 16) for a in ids.unique() if len(a) == 4}
+    return ids.map(ids_map).fillna(-1).astype(int)
+
+
+@parsing_stage(inputs=['results/pcap.csv'],
+               outputs=['results/rpl-control.csv', 'results/rpl-overhead.csv', 'results/rpl-dio.csv'],
+               parameters={'window': RPL_WINDOW})
+def parse_rpl_control_messages(path, window=RPL_WINDOW):
+    """
+    This function computes RPL control-plane statistics (to ./results) from the PCAP-converted CSV (from ./results).
+    ICMPv6 messages of type 155 are counted per mote and per time window for each RPL control code (DIS, DIO,
+     DAO and DAO-ACK), together with the control overhead in bytes. The following tables are written:
+     - rpl-control.csv: message counts and bytes per mote and per time window
+     - rpl-overhead.csv: message counts and bytes per mote for the whole simulation
+     - rpl-dio.csv: DODAG version and rank advertised by each mote per time window
+
+    :param path: path to the experiment (including [with-|without-malicious])
+    :param window: duration of a time window in seconds
+    """
+    results = join(path, 'results')
+    messages = list(RPL_CONTROL_CODES.values())
+    pcap = pandas.read_csv(find_file(join(results, 'pcap.csv')),
+                           usecols=['frame.len', 'frame.time_relative', 'wpan.src64', 'icmpv6.type', 'icmpv6.code',
+                                    'icmpv6.rpl.dio.version', 'icmpv6.rpl.dio.rank'])
+    for column in ['icmpv6.type', 'icmpv6.code', 'icmpv6.rpl.dio.version', 'icmpv6.rpl.dio.rank']:
+        pcap[column] = pandas.to_numeric(pcap[column], errors='coerce')
+    pcap = pcap[(pcap['icmpv6.type'] == RPL_ICMPV6_TYPE) & pcap['icmpv6.code'].isin(RPL_CONTROL_CODES.keys())]
+    pcap = pandas.DataFrame({
+        'mote_id': get_mote_ids(pcap['wpan.src64']),
+        'window': (pcap['frame.time_relative'] // window * window).astype(int),
+        'message': pcap['icmpv6.code'].map(RPL_CONTROL_CODES),
+        'bytes': pcap['frame.len'],
+        'version': pcap['icmpv6.rpl.dio.version'],
+        'rank': pcap['icmpv6.rpl.dio.rank'],
+    })
+    # count messages per mote and per time window, each message type being a column
+    grouped = pcap.groupby(['mote_id', 'window'])
+    control = pcap.pivot_table(index=['mote_id', 'window'], columns='message', values='bytes', aggfunc='count') \
+        if len(pcap) > 0 else pandas.DataFrame(index=grouped.size().index)
+    control = control.reindex(columns=messages).fillna(0).astype(int)
+    control['messages'] = control[messages].sum(axis=1)
+    control['bytes'] = grouped['bytes'].sum()
+    control.to_csv(join(results, 'rpl-control.csv'))
+    control.groupby(level='mote_id').sum().to_csv(join(results, 'rpl-overhead.csv'))
+    # keep the highest DODAG version and the last rank advertised through DIO's per mote and per time window
+    dio = pcap[pcap['message'] == 'dio'].groupby(['mote_id', 'window']).agg({'version': 'max', 'rank': 'last'})
+    dio[['version', 'rank']].to_csv(join(results, 'rpl-dio.csv'))
 
 
 PT_ITEMS = ['monitored', 'on', 'tx', 'rx', 'int']
 PT_REGEX = r'^({})_(?P<mote_id>\d+) {} (?P<{}>\d+)'
 
 
+class PowerTrackerConverter(object):
+    """
+    This class converts the lines of a PowerTracker log into rows of the PowerTracker CSV. A row is written as soon
+     as all the items of a mote are collected, so that the log can be converted while it is being written.
+
+    :param f: file object the CSV is written to
+    :param platforms: list of the platforms of the motes (default: the platforms available in Contiki)
+    """
+    fields = ['mote_id'] + ['{}_time'.format(it) for it in PT_ITEMS]
+
+    def __init__(self, f, platforms=None):
+        platforms = [p.capitalize() for p in (platforms or get_available_platforms())]
+        self.regex = compile(PT_REGEX.format('|'.join(platforms),
+                                             '(?P<item>{})'.format('|'.join(i.upper() for i in PT_ITEMS)), 'time'))
+        self.writer = DictWriter(f, delimiter=',', fieldnames=self.fields)
+        self.writer.writeheader()
+        self.pending = {}
+        self.last = {}
+
+    def feed(self, line):
+        """
+        Convert a line of the log.
+
+        :param line: line of the PowerTracker log
+        :return: the completed row or None
+        """
+        m = self.regex.match(line)
+        if m is None:
+            return
+        mote_id = int(m.group('mote_id'))
+        row = self.pending.setdefault(mote_id, {'mote_id': mote_id})
+        row['{}_time'.format(m.group('item').lower())] = float(m.group('time')) / 10 ** 6
+        if len(row) == len(self.fields):
+            self.writer.writerow(self.pending.pop(mote_id))
+            self.last[mote_id] = row
+            return row
+
+
+@parsing_stage(inputs=['data/powertracker.log'], outputs=['results/powertracker.csv'])
 def convert_powertracker_log_to_csv(path):
     """
     This function creates a CSV file (to ./results) from a PowerTracker log file (from ./data).
@@ -58,31 +333,43 @@ def convert_powertracker_log_to_csv(path):
 
     :param path: path to the experiment (including [with-|without-malicious])
     """
-    platforms = [p.capitalize() for p in get_available_platforms()]
     data, results = join(path, 'data'), join(path, 'results')
-    with open(join(data, 'powertracker.log')) as f:
-        log = f.read()
-    iterables, fields = [], ['mote_id']
-    for it in PT_ITEMS:
-        time_field = '{}_time'.format(it)
-        iterables.append(finditer(PT_REGEX.format('|'.join(platforms), it.upper(), time_field), log, MULTILINE))
-        fields.append(time_field)
+    # the log is streamed line by line
     with open(join(results, 'powertracker.csv'), 'w') as f:
-        writer = DictWriter(f, delimiter=',', fieldnames=fields)
-        writer.writeheader()
-        for matches in zip(*iterables):
-            row = {}
-            for m in matches:
-                row.update((k, int(v)) for k, v in m.groupdict().items())
-            for it in PT_ITEMS:
-                time_field = '{}_time'.format(it)
-                row[time_field] = float(row[time_field] / 10 ** 6)
-            writer.writerow(row)
+        converter = PowerTrackerConverter(f)
+        with open_file(join(data, 'powertracker.log')) as log:
+            for line in log:
+                converter.feed(line)
 
 
 RELATIONSHIP_REGEX = r'^\d+\s+ID\:(?P<mote_id>\d+)\s+#L\s+(?P<parent_id>\d+)\s+(?P<flag>\d+)$'
 
 
+def get_relationships(path):
+    """
+    This function retrieves the last parent of each mote from the relationships log (from ./data).
+
+    :param path: path to the experiment (including [with-|without-malicious])
+    :return: tuple (dictionary with each mote id as the key and its parent id as the value, flag telling if any
+              relationship was recorded)
+    """
+    edges, recorded = {}, False
+    with open_file(join(path, 'data', 'relationships.log')) as f:
+        for relationship in f:
+            recorded = recorded or len(relationship.strip()) > 0
+            try:
+                d = match(RELATIONSHIP_REGEX, relationship.strip()).groupdict()
+                if int(d['flag']) == 0:
+                    continue
+                mote, parent = int(d['mote_id']), int(d['parent_id'])
+                edges[mote] = parent
+            except AttributeError:
+                continue
+    return edges, recorded
+
+
+@parsing_stage(inputs=['simulation.csc', 'data/relationships.log'], outputs=['results/dodag.' + PLOT_FORMAT],
+               version=2, plot=True)
 def draw_dodag(path):
     """
     This function draws the DODAG (to ./results) from the list of motes (from ./simulation.csc) and the list of
@@ -90,75 +377,110 @@ def draw_dodag(path):
 
     :param path: path to the experiment (including [with-|without-malicious])
     """
-    pyplot.clf()
     with_malicious = (basename(normpath(path)) == 'with-malicious')
-    data, results = join(path, 'data'), join(path, 'results')
-    with open(join(data, 'relationships.log')) as f:
-        relationships = f.read()
-    # first, check if the mote relationships were recorded
-    if len(relationships.strip()) == 0:
+    results = join(path, 'results')
+    # retrieve edges from relationships.log then check if the mote relationships were recorded
+    edges, recorded = get_relationships(path)
+    if not recorded:
         return
     # retrieve motes and their colors
-    dodag = networkx.DiGraph()
     motes = get_motes_from_simulation(join(path, 'simulation.csc'))
-    dodag.add_nodes_from(motes.keys())
     colors = []
-    for n, p in motes.items():
-        x, y = p
-        dodag.node[n]['pos'] = motes[n] = (x, -y)
+    for n, (x, y) in motes.items():
+        motes[n] = (x, -y)
         colors.append('green' if n == 0 else ('yellow' if not with_malicious or
                                               (with_malicious and 0 < n < len(motes) - 1) else 'red'))
-    # retrieve edges from relationships.log
-    edges = {}
-    for relationship in relationships.split('\n'):
-        try:
-            d = match(RELATIONSHIP_REGEX, relationship.strip()).groupdict()
-            if int(d['flag']) == 0:
-                continue
-            mote, parent = int(d['mote_id']), int(d['parent_id'])
-            edges[mote] = parent
-        except AttributeError:
-            continue
-    # now, fill in the graph with edges
-    dodag.add_edges_from(edges.items())
-    # finally, draw the graph
-    networkx.draw(dodag, motes, node_color=colors, with_labels=True)
-    pyplot.savefig(join(results, 'dodag.png'), arrow_style=FancyArrowPatch)
+    # finally, draw the graph (leaving out the edges with motes that are not part of the simulation)
+    edges = [(m, p) for m, p in edges.items() if m in motes and p in motes]
+    render_plot('dodag', join(results, 'dodag'), positions=motes, edges=edges, colors=colors)
 
 
+@parsing_stage(inputs=['results/powertracker.csv'], outputs=['results/powertracking.' + PLOT_FORMAT], version=3,
+               plot=True)
 def draw_power_barchart(path):
     """
-    This function plots the average power tracking data from the CSV at:
+    This function plots the power tracking data from the CSV at:
      [EXPERIMENT]/[with-|without-malicious]/results/powertracker.csv
 
+    The times of the radio states are given as percentages of the monitored time at the last sample of each mote.
+
     :param path: path to the experiment (including [with-|without-malicious])
     :return:
     """
-    pyplot.clf()
     items = ['on', 'tx', 'rx', 'int']
-    series = {i: [] for i in items}
-    averages, c = {}, 0
-    with open(join(path, 'results', 'powertracker.csv')) as f:
-        for row in DictReader(f):
-            mid = int(row['mote_id'])
-            averages.setdefault(mid, {i: 0.0 for i in items})
-            for s, k in zip(items, [i + '_time' for i in items]):
-                averages[mid][s] += float(row[k])
-            c += 1
-    n = len(averages)
-    ind = numpy.arange(n)
-    c //= n
-    averages = {mid: {k: v / c for k, v in avg.items()} for mid, avg in averages.items()}
-    for mid, avg in sorted(averages.items(), key=lambda x: x[0]):
-        for k, v in series.items():
-            v.append(avg[k])
-    width = 0.5
-    plots = []
-    for s, color in zip(items, ['r', 'b', 'g', 'y']):
-        plots.append(pyplot.bar(ind, series[s], width, color=color))
-    pyplot.title("Power tracking per mote")
-    pyplot.xticks(ind + width / 2., tuple(sorted(averages.keys())))
-    pyplot.yticks(numpy.arange(0, 31, 10))
-    pyplot.ylabel("Consumed power (%)")
-    pyplot.legend((p[0] for p in plots), (i.upper() for i in items))
-    pyplot.savefig(join(path, 'results', 'powertracking.png'))
+    power = pandas.read_csv(join(path, 'results', 'powertracker.csv')).groupby('mote_id').last().sort_index()
+    ratios = power[['{}_time'.format(i) for i in items]].div(power['monitored_time'], axis=0).fillna(0.) * 100
+    render_plot('power', join(path, 'results', 'powertracking'), motes=list(ratios.index),
+                ratios=OrderedDict((i, list(ratios['{}_time'.format(i)])) for i in items))
+
+
+# radio currents (in mA) for each state of the transceiver of a platform, with the supply voltage (in V) and the
+#  battery capacity (in mAh) ; 'listen' is the idle listening state (radio ON but neither TX, RX nor INT)
+ENERGY_PROFILES = {
+    'sky': {'voltage': 3.0, 'battery': 2500., 'off': 0.02, 'listen': 18.8, 'tx': 17.4, 'rx': 18.8, 'int': 18.8},
+    'z1': {'voltage': 3.0, 'battery': 2500., 'off': 0.02, 'listen': 18.8, 'tx': 17.4, 'rx': 18.8, 'int': 18.8},
+    'wismote': {'voltage': 3.0, 'battery': 2500., 'off': 0.001, 'listen': 18.5, 'tx': 25.8, 'rx': 18.5,
+                'int': 18.5},
+}
+ENERGY_DEFAULT_PROFILE = 'sky'
+ENERGY_STATES = ['off', 'listen', 'tx', 'rx', 'int']
+
+
+def get_energy_profile(target):
+    """
+    This function retrieves the energy profile of a platform, falling back to the default profile.
+
+    :param target: platform name (e.g. 'z1' or 'sky')
+    :return: dictionary with the currents, the voltage and the battery capacity
+    """
+    if target not in ENERGY_PROFILES:
+        logger.warning("No energy profile for platform '{}' ; '{}' is used instead"
+                       .format(target, ENERGY_DEFAULT_PROFILE))
+    return ENERGY_PROFILES.get(target, ENERGY_PROFILES[ENERGY_DEFAULT_PROFILE])
+
+
+@parsing_stage(inputs=['results/powertracker.csv'], outputs=['results/energy.csv', 'results/energy-summary.csv'],
+               config=['target'])
+def compute_energy(path):
+    """
+    This function computes the energy consumed by each mote (to ./results) from the cumulative radio state times of
+     the PowerTracker CSV (from ./results), using the energy profile of the target platform.
+
+    energy.csv holds, per mote and per sample, the times spent in each radio state during the interval since the
+     previous sample and the energy consumed (in mJ). energy-summary.csv holds, per mote, the total energy, the
+     average power (in mW) and the estimated lifetime (in hours) on the battery of the profile.
+
+    :param path: path to the experiment (including [with-|without-malicious])
+    :return: estimated network lifetime in hours (time until the first mote depletes its battery)
+    """
+    results = join(path, 'results')
+    profile = get_energy_profile(read_config(dirname(normpath(path))).get('target'))
+    power = pandas.read_csv(join(results, 'powertracker.csv'))
+    power['sample'] = power.groupby('mote_id').cumcount()
+    power = power.sort_values(['mote_id', 'sample']).reset_index(drop=True)
+    fields = ['{}_time'.format(i) for i in PT_ITEMS]
+    # cumulative times are turned into per-interval deltas ; the first sample of a mote is its own delta
+    deltas = power.groupby('mote_id')[fields].diff().fillna(power[fields])
+    deltas.columns = [c.replace('_time', '') for c in deltas.columns]
+    states = numpy.column_stack([
+        (deltas['monitored'] - deltas['on']).clip(lower=0.).values,
+        (deltas['on'] - deltas['tx'] - deltas['rx'] - deltas['int']).clip(lower=0.).values,
+        deltas['tx'].values,
+        deltas['rx'].values,
+        deltas['int'].values,
+    ])
+    currents = numpy.array([profile[s] for s in ENERGY_STATES])
+    energy = pandas.DataFrame(states, columns=ENERGY_STATES)
+    energy.insert(0, 'mote_id', power['mote_id'])
+    energy.insert(1, 'sample', power['sample'])
+    energy.insert(2, 'time', power['monitored_time'])
+    # s * mA * V = mJ
+    energy['energy'] = states.dot(currents) * profile['voltage']
+    energy['cumulative_energy'] = energy.groupby('mote_id')['energy'].cumsum()
+    energy.to_csv(join(results, 'energy.csv'), index=False)
+    summary = energy.groupby('mote_id').agg({'time': 'last', 'energy': 'sum'})
+    summary['avg_power'] = (summary['energy'] / summary['time']).where(summary['time'] > 0)
+    battery = profile['battery'] * 3600 * profile['voltage']
+    summary['lifetime'] = battery / summary['avg_power'] / 3600
+    summary.to_csv(join(results, 'energy-summary.csv'))
+    return float(summary['lifetime'].min())
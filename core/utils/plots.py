@@ -0,0 +1,154 @@
+# -*- coding: utf8 -*-
+import networkx
+import numpy
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from core.common.helpers import map_in_pool
+from core.conf.constants import PLOT_DPI, PLOT_FORMAT
+from core.conf.logconfig import logger
+
+
+PLOT_RENDERERS = {}
+# figures are created once per kind of plot and per process, then cleared and reused for the next plots
+FIGURES = {}
+
+
+def renderer(kind, figsize=(8, 6)):
+    """
+    This decorator registers a function drawing a kind of plot on a figure.
+
+    :param kind: name of the kind of plot
+    :param figsize: default size of the figure in inches
+    :return: the decorator function
+    """
+    def decorator(f):
+        PLOT_RENDERERS[kind] = {'function': f, 'figsize': figsize}
+        return f
+    return decorator
+
+
+def get_figure(kind):
+    """
+    This function retrieves the figure of a kind of plot for the current process, creating it with an Agg canvas
+     (thus, without relying on pyplot's global state) at first use and clearing it otherwise.
+
+    :param kind: name of the kind of plot
+    :return: matplotlib Figure
+    """
+    figure = FIGURES.get(kind)
+    if figure is None:
+        figure = FIGURES[kind] = Figure(figsize=PLOT_RENDERERS[kind]['figsize'])
+        FigureCanvasAgg(figure)
+    else:
+        figure.clf()
+        figure.set_size_inches(*PLOT_RENDERERS[kind]['figsize'])
+    return figure
+
+
+def render_plot(kind, filename, **data):
+    """
+    This function renders a plot in the current process and saves it with the configured format and resolution
+     (see PLOT_FORMAT and PLOT_DPI).
+
+    :param kind: name of the kind of plot (see PLOT_RENDERERS)
+    :param filename: path to the output file, without extension
+    :param data: keyword-arguments to be passed to the renderer
+    :return: path to the output file
+    """
+    figure = get_figure(kind)
+    PLOT_RENDERERS[kind]['function'](figure, **data)
+    filename = '{}.{}'.format(filename, PLOT_FORMAT)
+    figure.savefig(filename, format=PLOT_FORMAT, dpi=PLOT_DPI)
+    return filename
+
+
+def _render(job):
+    """
+    This function is a pickable wrapper for running a plot job with a pool of processes.
+
+    :param job: tuple (function, argument)
+    :return: result of the function or None in case of failure
+    """
+    function, arg = job
+    try:
+        return function(arg)
+    except Exception as e:
+        logger.error("Plot job '{}' failed ({}: {})".format(arg, e.__class__.__name__, e))
+
+
+def render_batch(function, items, processes=None):
+    """
+    This function runs plot jobs in a dedicated pool of processes. Each worker keeps its figures between jobs,
+     so that figures are reused across the whole batch. When called from a daemonic process (e.g. a task of the
+     console), which cannot have children, jobs are run in the current process.
+
+    :param function: pickable function taking an item as its single argument
+    :param items: list of items to be processed
+    :param processes: number of processes to be used (default: number of CPU's)
+    :return: list of the results of the function
+    """
+    jobs = [(function, item) for item in items]
+    return map_in_pool(_render, jobs, processes)
+
+
+# *************************************** PLOT RENDERERS ****************************************
+@renderer('dodag')
+def render_dodag(figure, positions, edges, colors):
+    """
+    This function draws a DODAG.
+
+    :param figure: matplotlib Figure
+    :param positions: dictionary with mote ID's as keys and (x, y) tuples as values
+    :param edges: list of (mote ID, parent ID) tuples
+    :param colors: list of node colors, in the order of positions' keys
+    """
+    dodag = networkx.DiGraph()
+    dodag.add_nodes_from(positions.keys())
+    dodag.add_edges_from(edges)
+    networkx.draw(dodag, positions, ax=figure.add_subplot(111), nodelist=list(positions.keys()),
+                  node_color=colors, with_labels=True)
+
+
+@renderer('power')
+def render_power_barchart(figure, motes, ratios):
+    """
+    This function plots the percentages of time spent by each mote in each radio state.
+
+    :param figure: matplotlib Figure
+    :param motes: list of mote ID's
+    :param ratios: ordered dictionary with radio states as keys and lists of percentages (per mote) as values
+    """
+    ax = figure.add_subplot(111)
+    ind, width = numpy.arange(len(motes)), 0.5
+    plots = []
+    for (state, values), color in zip(ratios.items(), ['r', 'b', 'g', 'y']):
+        plots.append(ax.bar(ind, values, width, color=color))
+    ax.set_title("Power tracking per mote")
+    ax.set_xticks(ind + width / 2.)
+    ax.set_xticklabels(motes)
+    ax.set_ylim(0, max([1.] + [max(v) * 1.1 for v in ratios.values() if len(v) > 0]))
+    ax.set_ylabel("Consumed power (%)")
+    ax.legend([p[0] for p in plots], [s.upper() for s in ratios.keys()])
+
+
+@renderer('comparison')
+def render_comparison_barchart(figure, experiments, values, label):
+    """
+    This function plots a metric for both simulations of each experiment of a campaign.
+
+    :param figure: matplotlib Figure
+    :param experiments: list of experiment names
+    :param values: ordered dictionary with simulation names as keys and lists of values (per experiment) as values
+    :param label: label of the metric
+    """
+    figure.set_size_inches(max(6, len(experiments) * .6), 5)
+    ax = figure.add_subplot(111)
+    ind, width = numpy.arange(len(experiments)), 0.4
+    for i, ((sim, v), color) in enumerate(zip(values.items(), ['b', 'r'])):
+        ax.bar(ind + i * width, v, width, color=color, label="{} the malicious mote".format(sim.capitalize()))
+    ax.set_title(label)
+    ax.set_xticks(ind + width / 2.)
+    ax.set_xticklabels(experiments, rotation=45, ha='right')
+    ax.legend()
+    figure.tight_layout()
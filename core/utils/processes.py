@@ -0,0 +1,231 @@
+# -*- coding: utf8 -*-
+import errno
+import os
+from fabric.api import env
+from fabric.utils import abort
+from os.path import exists, isdir, join
+from signal import SIGKILL, SIGTERM
+from subprocess import Popen, PIPE
+from time import sleep, time
+
+from core.conf.constants import TASKS_FOLDER
+from core.conf.logconfig import logger
+from core.utils.tracing import trace
+
+
+PROCESS_TERM_TIMEOUT = 5  # seconds before killing the processes that ignore SIGTERM
+# identifier of the task currently executed by this process (see track_task)
+task = None
+
+
+class CommandOutput(str):
+    """
+    This class holds the output of a command with its return code, as fabric's local does.
+    """
+    return_code, stderr = None, ''
+
+    @property
+    def failed(self):
+        return self.return_code != 0
+
+    @property
+    def succeeded(self):
+        return not self.failed
+
+
+# ************************************** WORKER SIDE ***************************************
+def get_task_file(key, ext):
+    """
+    This function returns the path to a file of the tracking of a task.
+
+    :param key: task identifier, as displayed in the console (e.g. 'my-simulation[run]')
+    :param ext: 'pid' for the process group being executed or 'cancel' for the cancellation flag
+    :return: path to the file
+    """
+    return join(TASKS_FOLDER, '{}.{}'.format(key, ext))
+
+
+def track_task(key):
+    """
+    This function starts the tracking of the process groups of a task in the current worker.
+
+    :param key: task identifier
+    """
+    global task
+    task = key
+    if not isdir(TASKS_FOLDER):
+        try:
+            os.makedirs(TASKS_FOLDER)
+        except OSError:  # occurs when another worker created the folder in the meantime
+            pass
+
+
+def untrack_task():
+    """
+    This function stops the tracking of the task of the current worker, removing its files.
+    """
+    global task
+    if task is not None:
+        for ext in ['pid', 'cancel']:
+            try:
+                os.remove(get_task_file(task, ext))
+            except OSError:
+                pass
+        task = None
+
+
+def is_cancelled():
+    """
+    This function checks if the task of the current worker was cancelled from the console.
+
+    :return: True if the task was cancelled
+    """
+    return task is not None and exists(get_task_file(task, 'cancel'))
+
+
+def local_group(command, capture=False, name=None):
+    """
+    This function runs a shell command as fabric's local does (honoring 'lcd' and 'warn_only'), but in its own
+     session, thus in its own process group. While it runs, the ID of this group is recorded for the current task
+     so that the console can terminate the whole group (e.g. make and Cooja's JVM) ; once the command is over, the
+     processes it left in its group are terminated too. The command is recorded as a step of the trace of the task
+     (see core.utils.tracing).
+
+    :param command: shell command
+    :param capture: capture the standard output of the command
+    :param name: name of the step in the trace (default: the command without its options, e.g. 'make root')
+    :return: the output of the command (if captured) with its return code
+    """
+    if is_cancelled():
+        raise Exception("Task cancelled")
+    name = name or ' '.join([w for w in command.split() if not w.startswith('-') and '=' not in w][:2])
+    with trace(name, command=command):
+        output = _run_group(command, capture)
+    if output.failed and not env.warn_only:
+        abort("local() encountered an error (return code {}) while executing '{}'"
+              .format(output.return_code, command))
+    return output
+
+
+def _run_group(command, capture):
+    """
+    This function runs a shell command in its own process group for local_group.
+
+    :param command: shell command
+    :param capture: capture the standard output of the command
+    :return: the output of the command (if captured) with its return code
+    """
+    process = Popen(command, shell=True, cwd=env.lcwd or None, stdout=PIPE if capture else None,
+                    universal_newlines=True, preexec_fn=os.setsid)
+    pidfile = get_task_file(task, 'pid') if task is not None else None
+    if pidfile is not None:
+        with open(pidfile, 'w') as f:
+            f.write(str(process.pid))
+    try:
+        stdout = process.communicate()[0]
+    except BaseException:
+        terminate_group(process.pid)
+        raise
+    finally:
+        if pidfile is not None:
+            try:
+                os.remove(pidfile)
+            except OSError:
+                pass
+    terminate_group(process.pid)
+    if is_cancelled():
+        raise Exception("Task cancelled")
+    output = CommandOutput((stdout or '').strip())
+    output.return_code = process.returncode
+    return output
+
+
+# ************************************ PROCESS GROUPS **************************************
+def get_group_members(pgid):
+    """
+    This function retrieves the living processes of a process group (zombies excluded).
+
+    :param pgid: process group ID
+    :return: list of PID's
+    """
+    if not isdir('/proc'):
+        try:
+            os.killpg(pgid, 0)
+            return [pgid]
+        except OSError as e:
+            return [pgid] if e.errno == errno.EPERM else []
+    members = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open('/proc/{}/stat'.format(entry)) as f:
+                # state and process group are the fields 3 and 5 of the stat file (1 and 3 after the command name)
+                fields = f.read().rsplit(')', 1)[1].split()
+        except (IOError, OSError, IndexError):
+            continue
+        if int(fields[2]) == pgid and fields[0] != 'Z':
+            members.append(int(entry))
+    return members
+
+
+def terminate_group(pgid, timeout=PROCESS_TERM_TIMEOUT):
+    """
+    This function terminates a process group then reaps it : it waits for all the processes of the group to exit
+     and kills the remaining ones once the timeout is over.
+
+    :param pgid: process group ID
+    :param timeout: time given to the processes for exiting after SIGTERM
+    :return: True if all the processes of the group exited
+    """
+    for sig, delay in [(SIGTERM, timeout), (SIGKILL, 1)]:
+        if len(get_group_members(pgid)) == 0:
+            return True
+        try:
+            os.killpg(pgid, sig)
+        except OSError:
+            pass
+        end = time() + delay
+        while time() < end:
+            if len(get_group_members(pgid)) == 0:
+                return True
+            sleep(.05)
+    return len(get_group_members(pgid)) == 0
+
+
+# ************************************** CONSOLE SIDE **************************************
+def cancel_task(key):
+    """
+    This function cancels a task : the task is flagged so that it starts no new command and the process group it
+     is running, if any, is terminated and reaped.
+
+    :param key: task identifier
+    :return: True if no process of the task remains
+    """
+    try:
+        with open(get_task_file(key, 'cancel'), 'w'):
+            pass
+    except (IOError, OSError):
+        pass
+    try:
+        with open(get_task_file(key, 'pid')) as f:
+            pgid = int(f.read().strip())
+    except (IOError, OSError, ValueError):
+        return True
+    if not terminate_group(pgid):
+        logger.warning("Some processes of task {} could not be terminated (process group {})".format(key, pgid))
+        return False
+    return True
+
+
+def reset_task(key):
+    """
+    This function removes the cancellation flag of a task before it is started, as a flag can be left by a previous
+     task with the same identifier that was cancelled while it was ending (thus after it removed its files).
+
+    :param key: task identifier
+    """
+    try:
+        os.remove(get_task_file(key, 'cancel'))
+    except OSError:
+        pass
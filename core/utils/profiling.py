@@ -0,0 +1,181 @@
+# -*- coding: utf8 -*-
+import json
+import os
+import pstats
+from collections import defaultdict
+from cProfile import Profile
+from os.path import isdir, join
+try:
+    import tracemalloc
+except ImportError:  # only available from Python 3.4
+    tracemalloc = None
+
+from core.conf.logconfig import logger
+
+
+PROFILE_KINDS = ['cpu', 'memory']
+PROFILE_FOLDER = 'profiles'  # subfolder of the experiments holding the profiles of their tasks
+PROFILE_TOP = 50  # number of functions or lines of code kept in the summaries
+# profiler of the task currently executed by this process (see start_profile), None if it is not profiled
+profiler = None
+
+
+# ************************************** WORKER SIDE ***************************************
+def start_profile(kind):
+    """
+    This function starts profiling the task of the current worker, either its CPU time per function (with cProfile)
+     or its memory allocations per line of code (with tracemalloc).
+
+    :param kind: 'cpu' or 'memory'
+    """
+    global profiler
+    if kind == 'cpu':
+        profiler = Profile()
+        profiler.enable()
+    elif kind == 'memory':
+        if tracemalloc is None:
+            logger.warning("Memory profiling requires Python 3.4 or higher")
+            return
+        tracemalloc.start()
+        profiler = tracemalloc.take_snapshot()
+
+
+def stop_profile(name, path=None):
+    """
+    This function stops profiling the task of the current worker and saves its profile in the experiment (see
+     get_profile_file), replacing the one of the previous execution of the same command : the statistics of cProfile
+     ('.prof', readable with pstats) or the memory allocated per line of code and not freed at the end of the task
+     ('.json'), each with a text summary ('.txt').
+
+    :param name: name of the command (e.g. 'parse')
+    :param path: path to the experiment of the task (if None, the profile is dropped)
+    """
+    global profiler
+    started, profiler = profiler, None
+    if started is None:
+        return
+    if isinstance(started, Profile):
+        started.disable()
+    else:
+        snapshot, peak = tracemalloc.take_snapshot(), tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    if path is None or not isdir(path):
+        return
+    folder = join(path, PROFILE_FOLDER)
+    if not isdir(folder):
+        os.makedirs(folder)
+    if isinstance(started, Profile):
+        started.dump_stats(get_profile_file(path, name, 'cpu'))
+        with open(get_profile_file(path, name, 'cpu', 'txt'), 'w') as f:
+            pstats.Stats(started, stream=f).sort_stats('cumulative').print_stats(PROFILE_TOP)
+    else:
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, '<frozen *>'),
+                   tracemalloc.Filter(False, '<unknown>')]
+        # only the memory allocated during the task and still held at its end is kept
+        diff = snapshot.filter_traces(filters).compare_to(started.filter_traces(filters), 'lineno')
+        allocations = [{'file': s.traceback[0].filename, 'line': s.traceback[0].lineno, 'size': s.size_diff,
+                        'count': s.count_diff} for s in diff if s.size_diff > 0][:PROFILE_TOP]
+        profile = {'command': name, 'peak': peak, 'allocations': allocations}
+        with open(get_profile_file(path, name, 'memory'), 'w') as f:
+            json.dump(profile, f, indent=2)
+        with open(get_profile_file(path, name, 'memory', 'txt'), 'w') as f:
+            f.write(format_memory_profile(profile))
+
+
+# ************************************** CONSOLE SIDE **************************************
+def get_profile_file(path, name, kind, ext=None):
+    """
+    This function gets the path to a profile of a task of an experiment.
+
+    :param path: path to the experiment
+    :param name: name of the command (e.g. 'parse')
+    :param kind: 'cpu' or 'memory'
+    :param ext: extension of the file (default: 'prof' for CPU profiles and 'json' for memory profiles)
+    :return: path to the profile
+    """
+    return join(path, PROFILE_FOLDER, '{}.{}.{}'.format(name, kind, ext or ('prof' if kind == 'cpu' else 'json')))
+
+
+def get_profiles(paths, kind, name=None):
+    """
+    This function lists the profiles of a given kind recorded for experiments.
+
+    :param paths: list of paths to experiments
+    :param kind: 'cpu' or 'memory'
+    :param name: name of the command (default: all the commands)
+    :return: list of paths to the profiles
+    """
+    profiles, ext = [], '.{}.{}'.format(kind, 'prof' if kind == 'cpu' else 'json')
+    for path in paths:
+        folder = join(path, PROFILE_FOLDER)
+        if not isdir(folder):
+            continue
+        profiles.extend(join(folder, f) for f in sorted(os.listdir(folder))
+                        if f.endswith(ext) and (name is None or f == name + ext))
+    return profiles
+
+
+def aggregate_cpu_profiles(profiles, output):
+    """
+    This function merges CPU profiles and saves the result (readable with pstats) with a text summary.
+
+    :param profiles: list of paths to CPU profiles
+    :param output: path to the merged profile (the summary is written with the '.txt' extension instead)
+    :return: list of tuples (function, number of calls, own time, cumulative time) sorted by decreasing own time
+    """
+    stats = pstats.Stats(*profiles)
+    stats.dump_stats(output)
+    with open('{}.txt'.format(os.path.splitext(output)[0]), 'w') as f:
+        stats.stream = f
+        stats.sort_stats('cumulative').print_stats(PROFILE_TOP)
+        stats.sort_stats('tottime').print_stats(PROFILE_TOP)
+    functions = [(pstats.func_std_string(func), nc, tt, ct) for func, (cc, nc, tt, ct, _) in stats.stats.items()]
+    return sorted(functions, key=lambda x: -x[2])[:PROFILE_TOP]
+
+
+def aggregate_memory_profiles(profiles, output, name=None):
+    """
+    This function sums the memory allocations of memory profiles per line of code and saves the result with a text
+     summary.
+
+    :param profiles: list of paths to memory profiles
+    :param output: path to the JSON of the aggregated profile (the summary is written with the '.txt' extension
+                   instead)
+    :param name: name of the aggregated command (default: all the commands)
+    :return: aggregated profile, as a dictionary with the highest 'peak' and the list of 'allocations'
+    """
+    sizes, counts, peak = defaultdict(int), defaultdict(int), 0
+    for path in profiles:
+        try:
+            with open(path) as f:
+                profile = json.load(f)
+        except (IOError, OSError, ValueError):
+            logger.warning(" > Profile '{}' could not be read".format(path))
+            continue
+        peak = max(peak, profile['peak'])
+        for a in profile['allocations']:
+            sizes[(a['file'], a['line'])] += a['size']
+            counts[(a['file'], a['line'])] += a['count']
+    allocations = [{'file': k[0], 'line': k[1], 'size': s, 'count': counts[k]}
+                   for k, s in sorted(sizes.items(), key=lambda x: -x[1])[:PROFILE_TOP]]
+    profile = {'command': name or 'all', 'peak': peak, 'allocations': allocations}
+    with open(output, 'w') as f:
+        json.dump(profile, f, indent=2)
+    with open('{}.txt'.format(os.path.splitext(output)[0]), 'w') as f:
+        f.write(format_memory_profile(profile))
+    return profile
+
+
+def format_memory_profile(profile):
+    """
+    This function formats a memory profile as text.
+
+    :param profile: dictionary with the command, the 'peak' and the list of 'allocations'
+    :return: formatted profile
+    """
+    lines = ["Command: {}".format(profile['command']),
+             "Peak of traced memory: {:.1f} KiB".format(profile['peak'] / 1024.),
+             "", "{:>12}  {:>8}  {}".format("Size (KiB)", "Count", "Line of code")]
+    for a in profile['allocations']:
+        lines.append("{:>12.1f}  {:>8}  {}:{}".format(a['size'] / 1024., a['count'], a['file'], a['line']))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,244 @@
+# -*- coding: utf8 -*-
+import json
+import numpy
+import pandas
+from collections import OrderedDict
+from os import stat
+from os.path import exists, join
+from re import match
+
+from core.common.helpers import find_file, map_in_pool, open_file
+from core.conf.logconfig import logger
+from core.utils.parser import RELATIONSHIP_REGEX
+from core.utils.plots import render_plot
+
+
+COMPARISON_FILE = 'comparison.json'
+# version of the comparison, to be incremented when the metrics change (the cached comparisons are then recomputed)
+COMPARISON_VERSION = 2
+COMPARISON_INPUTS = [
+    join('data', 'relationships.log'),
+    join('data', 'serial.log'),
+    join('results', 'powertracker.csv'),
+    join('results', 'rpl-overhead.csv'),
+    join('results', 'energy-summary.csv'),
+]
+COMPARISON_METRICS = OrderedDict([
+    ('power_on', "Average radio ON time per mote (s)"),
+    ('power_tx', "Average radio TX time per mote (s)"),
+    ('power_rx', "Average radio RX time per mote (s)"),
+    ('power_int', "Average radio INT time per mote (s)"),
+    ('energy', "Average energy consumed per mote (mJ)"),
+    ('lifetime', "Network lifetime (h)"),
+    ('rpl_messages', "RPL control messages"),
+    ('rpl_bytes', "RPL control overhead (bytes)"),
+    ('depth_avg', "Average DODAG depth"),
+    ('depth_max', "Maximum DODAG depth"),
+    ('delivery', "Delivery ratio"),
+])
+DELIVERY_MESSAGES = {'sent': 'Client sending to', 'received': 'Response from the server'}
+SIMULATIONS = ['without', 'with']
+
+
+# *********************************** SIMULATION METRICS FUNCTIONS *************************************
+def get_delivery_ratio(path):
+    """
+    This function computes the ratio of answered requests from the serial log (from ./data) of echo sensors.
+
+    :param path: path to the experiment (including [with-|without-malicious])
+    :return: delivery ratio or NaN if no request was sent (e.g. with dummy sensors)
+    """
+    counts = {k: 0 for k in DELIVERY_MESSAGES.keys()}
+    with open_file(join(path, 'data', 'serial.log')) as f:
+        for line in f:
+            for k, msg in DELIVERY_MESSAGES.items():
+                if msg in line:
+                    counts[k] += 1
+    return float(counts['received']) / counts['sent'] if counts['sent'] > 0 else numpy.nan
+
+
+def get_dodag_depths(path):
+    """
+    This function computes the depth of each mote in the last known state of the DODAG, based on the list of
+     edges (from ./data/relationships.log).
+
+    :param path: path to the experiment (including [with-|without-malicious])
+    :return: dictionary with mote ID's as keys and depths as values (motes without route to the root are left out)
+    """
+    parents = {}
+    with open_file(join(path, 'data', 'relationships.log')) as f:
+        for relationship in f:
+            try:
+                d = match(RELATIONSHIP_REGEX, relationship.strip()).groupdict()
+                if int(d['flag']) == 0:
+                    continue
+                parents[int(d['mote_id'])] = int(d['parent_id'])
+            except AttributeError:
+                continue
+    return get_depths(parents)
+
+
+def get_depths(parents):
+    """
+    This function computes the depth of each mote in a DODAG.
+
+    :param parents: dictionary with mote ID's as keys and the ID's of their parents as values
+    :return: dictionary with mote ID's as keys and depths as values (motes without route to the root are left out)
+    """
+    depths = {0: 0}
+    for mote in parents.keys():
+        branch = []
+        # climb up the DODAG until a mote with a known depth is found, taking care of loops
+        while mote not in depths and mote in parents and mote not in branch:
+            branch.append(mote)
+            mote = parents[mote]
+        if mote not in depths:
+            continue
+        for i, m in enumerate(reversed(branch)):
+            depths[m] = depths[mote] + i + 1
+    del depths[0]
+    return depths
+
+
+def get_simulation_metrics(path):
+    """
+    This function gathers the metrics of a single simulation of an experiment.
+
+    :param path: path to the experiment (including [with-|without-malicious])
+    :return: (dictionary of summary metrics, DataFrame of power tracking times per mote over the simulation)
+    """
+    results = join(path, 'results')
+    # PowerTracker times are cumulative, hence the last sample of each mote holds its times over the simulation (as
+    #  for the energy, see compute_energy)
+    power = pandas.read_csv(join(results, 'powertracker.csv')).groupby('mote_id').last()
+    power = power[['{}_time'.format(i) for i in ['on', 'tx', 'rx', 'int']]]
+    power.columns = [c.replace('_time', '') for c in power.columns]
+    overhead = pandas.read_csv(join(results, 'rpl-overhead.csv'))
+    depths = list(get_dodag_depths(path).values())
+    metrics = {'power_{}'.format(k): float(v) for k, v in power.mean().items()}
+    metrics.update({
+        'rpl_messages': int(overhead['messages'].sum()),
+        'rpl_bytes': int(overhead['bytes'].sum()),
+        'depth_avg': float(numpy.mean(depths)) if len(depths) > 0 else numpy.nan,
+        'depth_max': int(max(depths)) if len(depths) > 0 else numpy.nan,
+        'delivery': get_delivery_ratio(path),
+    })
+    # energy results are only available for simulations parsed with the energy model
+    try:
+        with open_file(join(results, 'energy-summary.csv')) as f:
+            energy = pandas.read_csv(f)
+        metrics['energy'] = float(energy['energy'].mean())
+        metrics['lifetime'] = float(energy['lifetime'].min())
+    except IOError:
+        metrics['energy'], metrics['lifetime'] = numpy.nan, numpy.nan
+    return metrics, power
+
+
+# ************************************** COMPARISON FUNCTIONS ***************************************
+def get_inputs_signature(path):
+    """
+    This function computes a signature of the files a comparison depends on, based on their sizes and
+     modification times.
+
+    :param path: path to the experiment
+    :return: dictionary with input files as keys and [size, mtime] as values
+    """
+    signature = {}
+    for sim in SIMULATIONS:
+        for item in COMPARISON_INPUTS:
+            fn = join('{}-malicious'.format(sim), item)
+            try:
+                s = stat(find_file(join(path, fn)))
+                signature[fn] = [s.st_size, s.st_mtime]
+            except OSError:
+                signature[fn] = None
+    return signature
+
+
+def compare_experiment(path, force=False):
+    """
+    This function compares the simulations with and without the malicious mote of an experiment. The result is
+     cached (to ./comparison.json) and only recomputed when the input files have changed.
+
+    :param path: path to the experiment
+    :param force: recompute the comparison even if the cache is up-to-date
+    :return: dictionary with the summary metrics of both simulations with their deltas ('summary') and the
+              power tracking deltas per mote ('motes')
+    """
+    cache, signature = join(path, COMPARISON_FILE), get_inputs_signature(path)
+    if not force and exists(cache):
+        with open(cache) as f:
+            comparison = json.load(f)
+        if comparison.get('signature') == signature and comparison.get('version') == COMPARISON_VERSION:
+            logger.debug(" > Comparison of '{}' is up-to-date".format(path))
+            return comparison
+    metrics, power = {}, {}
+    for sim in SIMULATIONS:
+        metrics[sim], power[sim] = get_simulation_metrics(join(path, '{}-malicious'.format(sim)))
+    summary = OrderedDict()
+    for metric in COMPARISON_METRICS.keys():
+        without, with_ = metrics['without'][metric], metrics['with'][metric]
+        summary.update([('{}_without'.format(metric), without), ('{}_with'.format(metric), with_),
+                        ('{}_delta'.format(metric), with_ - without)])
+    # per-mote deltas are only computed for the motes present in both simulations (that is, excluding the
+    #  malicious mote)
+    motes = (power['with'] - power['without']).dropna().add_prefix('delta_').reset_index()
+    comparison = {'signature': signature, 'version': COMPARISON_VERSION, 'summary': summary,
+                  'motes': json.loads(motes.to_json(orient='records'))}
+    with open(cache, 'w') as f:
+        json.dump(comparison, f, indent=2)
+    return comparison
+
+
+def _compare(item):
+    """
+    This function is a pickable wrapper of compare_experiment for use with a pool of processes.
+
+    :param item: tuple (experiment name, experiment path)
+    :return: tuple (experiment name, comparison or None in case of failure)
+    """
+    name, path = item
+    try:
+        return name, compare_experiment(path)
+    except Exception as e:
+        logger.error("Experiment '{}' could not be compared ({}: {})".format(name, e.__class__.__name__, e))
+        return name, None
+
+
+def report_campaign(experiments, path, processes=None):
+    """
+    This function compares the experiments of a campaign in parallel then writes an aggregated table
+     (report.csv), the per-mote power tracking deltas (report-motes.csv) and a figure per metric to the
+     report folder. When called from a daemonic process (e.g. a task of the console), which cannot have children,
+     the experiments are compared in the current process.
+
+    :param experiments: list of tuples (experiment name, experiment path)
+    :param path: path to the report folder
+    :param processes: number of processes to be used (default: number of CPU's)
+    :return: DataFrame with one row of summary metrics per experiment
+    """
+    comparisons = map_in_pool(_compare, experiments, processes)
+    comparisons = [(n, c) for n, c in comparisons if c is not None]
+    if len(comparisons) == 0:
+        return
+    report = pandas.DataFrame([c['summary'] for _, c in comparisons], index=[n for n, _ in comparisons])
+    report.index.name = 'experiment'
+    report.to_csv(join(path, 'report.csv'))
+    motes = pandas.concat([pandas.DataFrame(c['motes']).assign(experiment=n) for n, c in comparisons])
+    motes.set_index(['experiment', 'mote_id']).to_csv(join(path, 'report-motes.csv'))
+    for metric, label in COMPARISON_METRICS.items():
+        draw_comparison_barchart(report, metric, label, join(path, metric))
+    return report
+
+
+def draw_comparison_barchart(report, metric, label, filename):
+    """
+    This function plots a metric for both simulations of each experiment of a campaign.
+
+    :param report: DataFrame with one row of summary metrics per experiment
+    :param metric: name of the metric to be plotted
+    :param label: label of the metric
+    :param filename: path to the output figure, without extension
+    """
+    values = OrderedDict((sim, list(report['{}_{}'.format(metric, sim)])) for sim in SIMULATIONS)
+    render_plot('comparison', filename, experiments=list(report.index), values=values, label=label)
@@ -1,17 +1,29 @@
 # -*- coding: utf8 -*-
+import json
+import numpy
+from collections import OrderedDict
 from copy import deepcopy
+from hashlib import sha1
 from jinja2 import Environment, FileSystemLoader
 from math import sqrt
-from os import listdir, makedirs, rename
-from os.path import basename, dirname, exists, expanduser, isdir, isfile, join, split, splitext
-from re import findall, finditer, search, sub, DOTALL, MULTILINE
+from os import getpid, listdir, makedirs, remove, rename, stat, utime
+from os.path import basename, dirname, exists, expanduser, isdir, join, split, splitext
+from re import findall
+from random import randint
+from time import time
 from six import string_types
-
-from core.common.helpers import is_valid_commented_json, move_files, remove_files, replace_in_file
-from core.common.wsngenerator import generate_motes
-from core.conf.constants import CONTIKI_FILES, CONTIKI_FOLDER, DEBUG_FILES, DEFAULTS, EXPERIMENT_STRUCTURE, \
-                                EXPERIMENT_FOLDER, TEMPLATES, TEMPLATES_FOLDER
+from stat import S_ISREG
+from xml.etree.ElementTree import iterparse, ElementTree
+from xml.sax.saxutils import escape, quoteattr
+
+from core.common.helpers import compress_files, is_valid_commented_json, map_in_pool, remove_files, \
+    replace_in_file
+from core.common.wsngenerator import generate_motes, get_rings, WSN_GENERATOR_VERSION, WSN_MODELS
+from core.conf.constants import COMPRESSION, CONTIKI_FILES, CONTIKI_FOLDER, DATA_FILES, DEBUG_FILES, DEFAULTS, \
+                                EXPERIMENT_STRUCTURE, EXPERIMENT_FOLDER, RESULT_FILES, TEMPLATES, TEMPLATES_FOLDER, \
+                                TOPOLOGIES_FOLDER
 from core.conf.logconfig import logger
+from core.utils.tracing import trace
 
 
 # *********************************************** GET FUNCTIONS ************************************************
@@ -139,9 +151,95 @@ def get_experiments(exp_file, silent=False):
     return is_valid_commented_json(exp_file, return_json=True, logger=logger if not silent else None) or {}
 
 
+# paths of the fields of a mote element relatively to this element in a simulation file
+MOTE_FIELDS = OrderedDict([('id', 'interface_config/id'), ('x', 'interface_config/x'), ('y', 'interface_config/y'),
+                           ('motetype_identifier', 'motetype_identifier')])
+
+
+def iter_simulation_motes(context):
+    """
+    This generator yields the mote elements of a simulation file while it is being parsed, that is, the <mote>
+     children of <simulation> (not the mote references of plugins' configurations).
+
+    :param context: iterparse iterator over the simulation file, with 'start' and 'end' events (its root is set from
+                    the first event, while iterparse only sets it once the file is parsed)
+    :return: generator of mote elements, complete with their children
+    """
+    tags = []
+    for event, element in context:
+        if event == 'start':
+            if len(tags) == 0 and getattr(context, 'root', None) is None:
+                context.root = element
+            tags.append(element.tag)
+            continue
+        tags.pop()
+        if element.tag == 'mote' and tags[-1:] == ['simulation']:
+            yield element
+
+
+class SimulationWriter(object):
+    """
+    This class writes a simulation file to another file while it is parsed : it wraps the iterparse iterator over
+     the simulation file and writes each element as soon as the caller got its 'end' event (hence with the changes
+     made by the caller), so that the whole tree is never held in memory. The elements whose tags are containers
+     are written as opening and closing tags around their children ; the other children of containers are written
+     as a whole then removed from the tree.
+
+    :param context: iterparse iterator over the simulation file, with 'start' and 'end' events
+    :param f: file object the simulation is written to, opened in binary mode
+    :param containers: tags of the elements holding the streamed elements
+    """
+    def __init__(self, context, f, containers=('simconf', 'simulation')):
+        self.context = context
+        self.f = f
+        self.containers = containers
+        self.root = None
+
+    def __iter__(self):
+        self.__write("<?xml version='1.0' encoding='UTF-8'?>\n")
+        # 'opened' holds the open containers with a flag telling if their text was written ; 'pending' holds the last
+        #  element ended at the level of the containers (with a flag telling if it is written as a whole), as its
+        #  tail is only parsed with the next event
+        stack, opened, pending = [], [], None
+        for event, element in self.context:
+            if pending is not None:
+                # an element written as a whole is written with its tail
+                if pending[1]:
+                    ElementTree(pending[0]).write(self.f, encoding='UTF-8', xml_declaration=False)
+                    stack[-1].remove(pending[0])
+                else:
+                    self.__write(escape(pending[0].tail or ''))
+                pending = None
+            # the text of a container is parsed with the first event of its children or with its end
+            if 0 < len(opened) == len(stack) and not opened[-1][1]:
+                self.__write(escape(opened[-1][0].text or ''))
+                opened[-1][1] = True
+            if event == 'start':
+                if len(stack) == len(opened) and element.tag in self.containers:
+                    self.__write('<{}{}>'.format(element.tag, ''.join(' {}={}'.format(k, quoteattr(v))
+                                                                       for k, v in element.attrib.items())))
+                    opened.append([element, False])
+                stack.append(element)
+            else:
+                stack.pop()
+                if len(opened) > 0 and element is opened[-1][0]:
+                    self.__write('</{}>'.format(element.tag))
+                    opened.pop()
+                    pending = (element, False)
+                elif len(stack) == len(opened):
+                    pending = (element, True)
+            yield event, element
+        if pending is not None and pending[1]:
+            ElementTree(pending[0]).write(self.f, encoding='UTF-8', xml_declaration=False)
+
+    def __write(self, data):
+        self.f.write(data.encode('utf-8'))
+
+
 def get_motes_from_simulation(simfile, as_dictionary=True):
     """
-    This function retrieves motes data from a simulation file (.csc).
+    This function retrieves motes data from a simulation file (.csc), streaming through the file so that only
+     one mote element is kept in memory at a time.
 
     :param simfile: path to the simulation file
     :param as_dictionary: flag to indicate that the output has to be formatted as a dictionary
@@ -149,16 +247,11 @@ def get_motes_from_simulation(simfile, as_dictionary=True):
               short is False or a dictionary with each mote id as the key and its tuple (x, y) as the value
     """
     motes = []
-    with open(simfile) as f:
-        content = f.read()
-    iterables, fields = [], ['mote_id']
-    for it in ['id', 'x', 'y', 'motetype_identifier']:
-        iterables.append(finditer(r'^\s*<{0}>(?P<{0}>.*)</{0}>\s*$'.format(it), content, MULTILINE))
-    for matches in zip(*iterables):
-        mote = {}
-        for m in matches:
-            mote.update(m.groupdict())
-        motes.append(mote)
+    for mote in iter_simulation_motes(iterparse(simfile, events=('start', 'end'))):
+        motes.append({k: mote.findtext(p) for k, p in MOTE_FIELDS.items()})
+        mote.clear()
+    # motes lacking one of the fields (e.g. a mote type without position or ID interface) are ignored
+    motes = [m for m in motes if all(v is not None for v in m.values())]
     if as_dictionary:
         motes = {int(m['id']): (float(m['x']), float(m['y'])) for m in motes}
     return motes
@@ -214,26 +307,100 @@ def get_path(*args, **kwargs):
 
 
 # *********************************************** LIST FUNCTIONS ***********************************************
+# in-memory indexes of the validity of the campaigns and of the experiments, with the modification times they were
+#  checked at (see list_campaigns and list_experiments) ; they are long-lived in the console's daemon
+campaigns_index, experiments_index = {}, {}
+
+
+def get_structure_folders(files=None, path=''):
+    """
+    This function gets the folders listed by check_structure, that is, the folders whose modification times change
+     when the result of check_structure may change.
+
+    :param files: file structure as a dictionary
+    :param path: path of the structure relatively to the experiment
+    :return: list of relative paths
+    """
+    files = EXPERIMENT_STRUCTURE if files is None else files
+    if files.get('*'):
+        return []
+    folders = [path]
+    for name, subfiles in sorted(files.items()):
+        if isinstance(subfiles, dict):
+            folders.extend(get_structure_folders(subfiles, join(path, name)))
+    return folders
+
+
+STRUCTURE_FOLDERS = get_structure_folders()
+
+
+def get_modification_times(path, folders):
+    """
+    This function gets the modification times of folders (None for the missing ones).
+
+    :param path: base path
+    :param folders: list of relative paths
+    :return: tuple of modification times
+    """
+    mtimes = []
+    for folder in folders:
+        try:
+            mtimes.append(stat(join(path, folder)).st_mtime)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
 def list_campaigns():
     """
-    This function gets the list of existing simulation campaign JSON files.
+    This function gets the list of existing simulation campaign JSON files. Files are only parsed again when
+     modified since they were last listed.
 
     :return: list of JSON files
     """
-    return sorted([basename(f) for f in listdir(EXPERIMENT_FOLDER)
-                   if isfile(join(EXPERIMENT_FOLDER, f)) and f.endswith('.json') and
-                   is_valid_commented_json(join(EXPERIMENT_FOLDER, f))])
+    campaigns, names = [], [f for f in listdir(EXPERIMENT_FOLDER) if f.endswith('.json')]
+    for f in sorted(names):
+        try:
+            info = stat(join(EXPERIMENT_FOLDER, f))
+        except OSError:
+            continue
+        if not S_ISREG(info.st_mode):
+            continue
+        signature, indexed = (info.st_mtime, info.st_size), campaigns_index.get(f)
+        if indexed is None or indexed[0] != signature:
+            indexed = campaigns_index[f] = signature, bool(is_valid_commented_json(join(EXPERIMENT_FOLDER, f)))
+        if indexed[1]:
+            campaigns.append(f)
+    for f in set(campaigns_index.keys()) - set(names):
+        del campaigns_index[f]
+    return campaigns
 
 
 def list_experiments(check=True):
     """
-    This function gets the list of existing experiments.
+    This function gets the list of existing experiments. The structure of an experiment is only checked again when
+     one of the folders it consists of was modified since it was last listed.
 
     :return: list of experiments
     """
-    return sorted([d for d in listdir(EXPERIMENT_FOLDER)
-                   if isdir(join(EXPERIMENT_FOLDER, d)) and not d.startswith('.') and (not check or
-                   check_structure(join(EXPERIMENT_FOLDER, d)))])
+    experiments, names = [], [d for d in listdir(EXPERIMENT_FOLDER) if not d.startswith('.')]
+    for d in sorted(names):
+        path = join(EXPERIMENT_FOLDER, d)
+        if not isdir(path):
+            continue
+        if not check:
+            experiments.append(d)
+            continue
+        # the modification times are retrieved before checking the structure so that a concurrent change is seen
+        #  at the next listing
+        signature, indexed = get_modification_times(path, STRUCTURE_FOLDERS), experiments_index.get(d)
+        if indexed is None or indexed[0] != signature:
+            indexed = experiments_index[d] = signature, check_structure(path)
+        if indexed[1]:
+            experiments.append(d)
+    for d in set(experiments_index.keys()) - set(names):
+        del experiments_index[d]
+    return experiments
 
 
 def list_mote_types(mote_type, strip=True):
@@ -271,6 +438,19 @@ def apply_replacements(contiki_rpl, replacements):
         replace_in_file(join(contiki_rpl, filename), replacement)
 
 
+def compress_data(path):
+    """
+    This function compresses the data files and the bulky result files of a simulation once parsed, using the codec
+     set in the configuration (see COMPRESSION).
+
+    :param path: path to the experiment (including [with-|without-malicious])
+    """
+    if COMPRESSION != 'none':
+        logger.debug(" > Compressing simulation data...")
+        compress_files(join(path, 'data'), *DATA_FILES, codec=COMPRESSION)
+        compress_files(join(path, 'results'), *RESULT_FILES, codec=COMPRESSION)
+
+
 def check_structure(path, files=None, create=False, remove=False):
     """
     This function checks if the file structure given by the dictionary files exists at the input path.
@@ -339,8 +519,13 @@ def render_templates(path, only_malicious=False, **params):
         template_malicious = "motes/malicious.c"
         write_template(join(path, "with-malicious"), env, template_malicious, **templates[template_malicious])
         return replacements
-    # generate the list of motes (first one is the root, last one is the malicious mote)
-    motes = params['motes'] or generate_motes(defaults=DEFAULTS, **params)
+    # generate the list of motes (first one is the root, last one is the malicious mote) ; the motes are held in a
+    #  compact array, the simulation without the malicious mote using a view of this array
+    motes = params['motes']
+    if motes is None:
+        motes = get_topology(params) if params.get('layout') is None else \
+            load_campaign_topology(params['campaign'], params['layout'])
+    motes = to_mote_array(motes)
     # fill in simulation file templates
     templates["motes/Makefile"]["target"] = params["target"]
     # important note: timeout is milliseconds in the simulation script
@@ -357,7 +542,7 @@ def render_templates(path, only_malicious=False, **params):
     templates["simulation.csc"]["target_capitalized"] = params["target"].capitalize()
     templates["simulation.csc"]["malicious_target"] = params["malicious_target"]
     templates["simulation.csc"]["malicious_target_capitalized"] = params["malicious_target"].capitalize()
-    templates["simulation.csc"]["motes"] = motes
+    templates["simulation.csc"]["motes"] = MoteRows(motes)
     for mote_type in templates["simulation.csc"]["mote_types"]:
         mote_type["target"] = params["target"] if mote_type["name"] != "malicious" else params["malicious_target"]
     # render the templates for the simulation with the malicious mote
@@ -369,7 +554,7 @@ def render_templates(path, only_malicious=False, **params):
     del templates["motes/sensor.c"]
     del templates["motes/malicious.c"]
     templates["simulation.csc"]["title"] = params["title"] + ' (without the malicious mote)'
-    templates["simulation.csc"]["motes"] = motes[:-1]
+    templates["simulation.csc"]["motes"] = MoteRows(motes[:-1])
     del templates["simulation.csc"]["mote_types"][-1]
     # render the templates for the simulation without the malicious mote
     for name, kwargs in templates.items():
@@ -380,38 +565,90 @@ def render_templates(path, only_malicious=False, **params):
 def set_motes_to_simulation(simfile, motes):
     """
     This function replaces motes data from a list of motes (formatted as dictionaries with 'id', 'x', 'y' and
-     'motetype_identifier' keys) into a simulation file (.csc).
+     'motetype_identifier' keys) into a simulation file (.csc). The file is parsed once, the positions are updated
+     while parsing and each mote is streamed to a temporary file (see SimulationWriter), which then atomically
+     replaces the simulation file. If all the given motes are found at their position, parsing stops there and the
+     file is left untouched.
 
     :param simfile: path to the simulation file
     :param motes: list or dictionary of motes
+    :return: number of motes whose position was changed
     """
     if isinstance(motes, list):
         motes = {int(m['id']): (float(m['x']), float(m['y'])) for m in motes}
-    tmp = simfile + '.tmp'
-    with open(simfile) as of:
-        content = of.read()
-    for m in finditer(r'^\s*<mote>(?P<block>.*?)</mote>\s*$', content, DOTALL | MULTILINE):
-        block = m.groups('block')[0]
-        idmatch = search(r'^\s*<id>(?P<mote_id>\d+?)</id>\s*$', block, MULTILINE)
-        if idmatch is None:
-            continue
-        mote_id = int(idmatch.groups('mote_id')[0])
-        # e.g. occurs when modifying the simulation without malicious and the simulation with malicious has to be
-        #  update ; id of malicious mote is found in the simulation file but not in the dictionary of motes
-        if mote_id not in motes.keys():
-            continue
-        mote_pos = motes[mote_id]
-        block = sub(r'<x>(.*?)</x>', '<x>{}</x>'.format(mote_pos[0]), block, flags=MULTILINE)
-        block = sub(r'<y>(.*?)</y>', '<y>{}</y>'.format(mote_pos[1]), block, flags=MULTILINE)
-        content = content.replace(m.groups('block')[0], block)
-    with open(tmp, 'w+') as nf:
-        nf.write(content)
-    move_files('', '', (tmp, simfile))
+    changed, remaining, tmp = 0, set(motes.keys()), simfile + '.tmp'
+    with open(tmp, 'wb') as f:
+        for mote in iter_simulation_motes(SimulationWriter(iterparse(simfile, events=('start', 'end')), f)):
+            mote_id = mote.findtext(MOTE_FIELDS['id'])
+            # e.g. occurs when modifying the simulation without malicious and the simulation with malicious has to be
+            #  update ; id of malicious mote is found in the simulation file but not in the dictionary of motes
+            if mote_id is None or int(mote_id) not in motes.keys():
+                continue
+            moved = False
+            for field, value in zip(['x', 'y'], motes[int(mote_id)]):
+                element = mote.find(MOTE_FIELDS[field])
+                if element is not None and float(element.text) != float(value):
+                    element.text = '{}'.format(value)
+                    moved = True
+            changed += moved
+            remaining.discard(int(mote_id))
+            if changed == 0 and len(remaining) == 0:
+                break
+    if changed > 0:
+        rename(tmp, simfile)
+    else:
+        remove(tmp)
+    return changed
+
+
+def _set_motes_to_simulation(job):
+    """
+    This function is a pickable wrapper for updating a simulation file with a pool of processes.
+
+    :param job: tuple (path to the simulation file, dictionary of motes)
+    :return: tuple (path to the simulation file, number of motes whose position was changed)
+    """
+    simfile, motes = job
+    try:
+        return simfile, set_motes_to_simulation(simfile, motes)
+    except Exception as e:
+        logger.error("Simulation file '{}' could not be updated ({}: {})".format(simfile, e.__class__.__name__, e))
+        return simfile, 0
+
+
+def get_moved_motes(before, after):
+    """
+    This function computes the motes whose position changed between two states of a simulation.
+
+    :param before: dictionary with each mote id as the key and its tuple (x, y) as the value, before the change
+    :param after: dictionary with each mote id as the key and its tuple (x, y) as the value, after the change
+    :return: dictionary of the moved motes (formatted as the input dictionaries)
+    """
+    return {i: pos for i, pos in after.items() if before.get(i) != pos}
+
+
+def propagate_motes(simfiles, motes, processes=None):
+    """
+    This function propagates motes' positions to a set of simulation files in a pool of processes. Only the given
+     motes are looked up in each file, so that it is sufficient to pass the moved motes (see get_moved_motes) ;
+     files in which these motes are already up to date are not rewritten.
+
+    :param simfiles: list of paths to simulation files
+    :param motes: dictionary with each mote id as the key and its tuple (x, y) as the value
+    :param processes: number of processes to be used (default: number of CPU's)
+    :return: list of the paths to the simulation files that were updated
+    """
+    jobs = [(simfile, motes) for simfile in simfiles if exists(simfile)]
+    if len(motes) == 0 or len(jobs) == 0:
+        return []
+    results = map_in_pool(_set_motes_to_simulation, jobs, processes)
+    return [simfile for simfile, changed in results if changed > 0]
 
 
 def write_template(path, env, name, **kwargs):
     """
-    This function fills in a template and copy it to its destination.
+    This function fills in a template and copy it to its destination. The template is rendered as a stream,
+     written to the file chunk by chunk, so that large simulation files are never held in memory.
 
     :param path: folder where the template is to be copied
     :param env: template environment
@@ -419,9 +656,206 @@ def write_template(path, env, name, **kwargs):
     :param kwargs: parameters associated to this template
     """
     logger.debug(" > Setting template file: {}".format(name))
-    template = env.get_template(name).render(**kwargs)
     with open(join(path, name), "w") as f:
-        f.write(template)
+        for chunk in env.get_template(name).generate(**kwargs):
+            f.write(chunk)
+
+
+TOPOLOGY_PARAMETERS = ['topology', 'n', 'min_range', 'max_range', 'tx_range', 'seed']
+# limits of the topology store: number of stored topologies and age in seconds since their last use
+TOPOLOGIES_STORE_SIZE = 1000
+TOPOLOGIES_STORE_AGE = 30 * 24 * 3600
+
+
+def get_topology(params):
+    """
+    This function retrieves the topology for the given parameters from the topology store (in the cache folder),
+     keyed by the parameters of the generator and the seed. If it is not stored yet, it is generated then stored.
+     Topologies of random seeds (see validated_parameters) are never requested again, hence they are not stored.
+
+    :param params: dictionary of validated parameters (see validated_parameters)
+    :return: the list of motes (see generate_motes)
+    """
+    key = dict([(k, params.get(k)) for k in TOPOLOGY_PARAMETERS], version=WSN_GENERATOR_VERSION)
+    if key['seed'] is None or params.get('random_seed'):
+        with trace('topology', n=params.get('n'), model=params.get('topology')):
+            return generate_motes(defaults=DEFAULTS, **params)
+    path = join(get_path(TOPOLOGIES_FOLDER, create=True),
+                '{}.json'.format(sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()))
+    try:
+        with open(path) as f:
+            motes = json.load(f)['motes']
+        logger.debug(" > Reusing stored topology (seed: {})".format(key['seed']))
+        # the last use of the topology is recorded for pruning the store (see prune_topologies)
+        utime(path, None)
+        return motes
+    except (IOError, OSError, ValueError, KeyError):
+        pass
+    with trace('topology', n=params.get('n'), model=params.get('topology')):
+        motes = generate_motes(defaults=DEFAULTS, **params)
+    # the topology is written atomically as experiments of a campaign may be made in parallel
+    tmp = '{}.{}'.format(path, getpid())
+    with open(tmp, 'w') as f:
+        json.dump({'parameters': key, 'motes': motes}, f)
+    rename(tmp, path)
+    prune_topologies()
+    return motes
+
+
+def prune_topologies(size=TOPOLOGIES_STORE_SIZE, age=TOPOLOGIES_STORE_AGE):
+    """
+    This function removes the stored topologies that were not used for a given age, then the least recently used
+     ones beyond a given number of topologies.
+
+    :param size: maximum number of stored topologies
+    :param age: maximum age in seconds since the last use of a topology
+    :return: number of removed topologies
+    """
+    topologies = []
+    for name in listdir(TOPOLOGIES_FOLDER) if isdir(TOPOLOGIES_FOLDER) else []:
+        if name.endswith('.json'):
+            try:
+                topologies.append((stat(join(TOPOLOGIES_FOLDER, name)).st_mtime, name))
+            except OSError:  # removed in the meantime by another process
+                continue
+    topologies.sort(reverse=True)
+    limit, removed = time() - age, 0
+    for i, (mtime, name) in enumerate(topologies):
+        if i >= size or mtime < limit:
+            try:
+                remove(join(TOPOLOGIES_FOLDER, name))
+                removed += 1
+            except OSError:
+                continue
+    return removed
+
+
+# compact layout of a topology: one row per mote, with the same fields as the dictionaries of generate_motes (so
+#  that templates can use them the same way)
+MOTE_DTYPE = [('id', 'i4'), ('type', 'U9'), ('x', 'f8'), ('y', 'f8'), ('z', 'f8')]
+# compact layout of the topologies of a campaign: 'layout' being the index of the experiment's topology in the
+#  campaign
+TOPOLOGY_DTYPE = [('layout', 'i4')] + MOTE_DTYPE
+
+
+class MoteRows(object):
+    """
+    This class exposes an array of motes to the templates as the list of motes (see generate_motes) : each row is
+     converted to a dictionary while iterating, by chunks, so that the whole list is never built.
+    """
+    chunk = 1024
+
+    def __init__(self, motes):
+        self.motes = to_mote_array(motes)
+
+    def __iter__(self):
+        fields = [f for f, _ in MOTE_DTYPE]
+        for i in range(0, len(self.motes), self.chunk):
+            for row in self.motes[i:i + self.chunk].tolist():
+                yield dict(zip(fields, row))
+
+    def __len__(self):
+        return len(self.motes)
+
+
+def to_mote_array(motes):
+    """
+    This function converts a list of motes into a NumPy structured array (see MOTE_DTYPE).
+
+    :param motes: the list of motes (see generate_motes) or an array of motes
+    :return: the array of motes
+    """
+    if isinstance(motes, numpy.ndarray):
+        return motes
+    array = numpy.zeros(len(motes), dtype=MOTE_DTYPE)
+    for i, m in enumerate(motes):
+        array[i] = (m['id'], m['type'], m['x'], m['y'], m['z'])
+    return array
+
+
+def generate_campaign_topologies(campaign, params, processes=None):
+    """
+    This function generates the topologies of a campaign in a pool of processes (using the topology store, see
+     get_topology) and saves them as a single NumPy structured array (to [TOPOLOGIES_FOLDER]/[campaign].npy).
+
+    :param campaign: campaign name
+    :param params: list of dictionaries of validated parameters, the index in this list being the layout index
+    :param processes: number of processes to be used (default: number of CPU's)
+    :return: path to the saved array
+    """
+    topologies = map_in_pool(get_topology, params, processes)
+    layouts = numpy.zeros(sum(len(motes) for motes in topologies), dtype=TOPOLOGY_DTYPE)
+    i = 0
+    for layout, motes in enumerate(topologies):
+        motes = to_mote_array(motes)
+        layouts['layout'][i:i + len(motes)] = layout
+        for field, _ in MOTE_DTYPE:
+            layouts[field][i:i + len(motes)] = motes[field]
+        i += len(motes)
+    path = join(get_path(TOPOLOGIES_FOLDER, create=True), '{}.npy'.format(campaign))
+    numpy.save(path, layouts)
+    return path
+
+
+def prepare_campaign(exp_file):
+    """
+    This function prepares the parameters of the experiments of a campaign for making them. If an experiment named
+     'BASE' is present, it is used as a template for all the other experiments, which then share its topology.
+     Otherwise, all the topologies of the campaign are generated up front and experiments refer to their topology
+     by its index in the campaign (see generate_campaign_topologies).
+
+    :param exp_file: input JSON simulation campaign file
+    :return: list of tuples (experiment name, parameters), sorted by experiment name
+    """
+    experiments = get_experiments(exp_file, silent=True)
+    sim_json, motes = None, None
+    # if a simulation named 'BASE' is present, use it as a template simulation for all the other simulations
+    if 'BASE' in experiments.keys():
+        experiments['BASE']['silent'] = True
+        sim_json = dict(experiments['BASE']['simulation'])
+        base = validated_parameters(experiments['BASE'])
+        motes = to_mote_array(get_topology(base))
+        # experiments of the campaign share the seed of the BASE topology unless they define their own
+        sim_json.setdefault('seed', base['seed'])
+        del experiments['BASE']
+    campaign = splitext(basename(exp_file))[0]
+    experiments = sorted(experiments.items(), key=lambda x: x[0])
+    # otherwise, generate all the topologies of the campaign up front
+    if sim_json is None and len(experiments) > 0:
+        topologies = []
+        for name, params in experiments:
+            topology = validated_parameters(dict(params, silent=True))
+            # the seed is kept for the experiment so that it is saved in its configuration
+            params['simulation'] = dict(params.get('simulation') or {}, seed=topology['seed'])
+            params['layout'] = len(topologies)
+            topologies.append(topology)
+        logger.debug(" > Generating {} topologies...".format(len(topologies)))
+        generate_campaign_topologies(campaign, topologies)
+    for name, params in experiments:
+        params['campaign'] = campaign
+        if sim_json is not None:
+            params.setdefault('simulation', {})
+            for k, v in sim_json.items():
+                if k not in params['simulation'].keys():
+                    params['simulation'][k] = v
+            params['motes'] = motes
+    return experiments
+
+
+def load_campaign_topology(campaign, layout):
+    """
+    This function loads a topology from the layouts of a campaign (see generate_campaign_topologies).
+
+    :param campaign: campaign name
+    :param layout: index of the topology in the campaign
+    :return: the array of motes (see MOTE_DTYPE)
+    """
+    layouts = numpy.load(join(TOPOLOGIES_FOLDER, '{}.npy'.format(campaign)), mmap_mode='r')
+    selected = layouts[layouts['layout'] == layout]
+    motes = numpy.zeros(len(selected), dtype=MOTE_DTYPE)
+    for field, _ in MOTE_DTYPE:
+        motes[field] = selected[field]
+    return motes
 
 
 def validated_parameters(dictionary):
@@ -431,8 +865,10 @@ def validated_parameters(dictionary):
 
     :param dictionary: input parameters
     :return: dictionary of validated parameters
+    :raise ValueError: if the motes cannot be laid out with the rings model
     """
-    params = dict(motes=dictionary.get('motes'), campaign=dictionary.get('campaign'))
+    params = dict(motes=dictionary.get('motes'), campaign=dictionary.get('campaign'),
+                  layout=dictionary.get('layout'))
     # simulation parameters
     params["debug"] = get_parameter(dictionary, "simulation", "debug",
                                     lambda x: isinstance(x, bool), "is not a boolean")
@@ -448,6 +884,15 @@ def validated_parameters(dictionary):
                                 lambda x: isinstance(x, int) and x > 0, "is not an integer greater than 0")
     params["repeat"] = get_parameter(dictionary, "simulation", "repeat",
                                      lambda x: isinstance(x, int) and x > 0, "is not an integer greater than 0")
+    params["seed"] = get_parameter(dictionary, "simulation", "seed",
+                                   lambda x: x is None or isinstance(x, int) and x >= 0,
+                                   "is not a positive integer")
+    params["topology"] = get_parameter(dictionary, "simulation", "topology",
+                                       lambda x: x in WSN_MODELS.keys(), "is not a valid topology model")
+    # a random seed is chosen if none is given, so that the topology can be reproduced from simulation.conf
+    params["random_seed"] = params["seed"] is None
+    if params["seed"] is None:
+        params["seed"] = randint(0, 2 ** 31 - 1)
     params["target"] = get_parameter(dictionary, "simulation", "target",
                                      lambda x: x in get_available_platforms(), "is not a valid platform")
     params["malicious_target"] = get_parameter(dictionary, "malicious", "target",
@@ -485,4 +930,8 @@ def validated_parameters(dictionary):
                                         lambda x: isinstance(x, (int, float)) and x >= params["min_range"],
                                         "is not an integer or a float greater or equal to {:.0f}"
                                         .format(params["min_range"]))
+    # the rings model cannot lay out too many motes for the area, its rings then falling within the minimum range
+    #  from the root (see get_rings) ; the experiment is rejected rather than made with less motes
+    if params["topology"] == "rings":
+        get_rings(params["min_range"], params["max_range"], params["tx_range"], params["n"])
     return params
@@ -0,0 +1,227 @@
+# -*- coding: utf8 -*-
+import heapq
+import numpy
+from collections import defaultdict, deque
+from datetime import timedelta
+from multiprocessing import cpu_count
+from threading import RLock
+
+from core.conf.logconfig import logger
+from core.utils.catalog import get_cost_parameters, get_timings
+
+
+PIPELINE_STAGES = ['make', 'run', 'parse']
+
+
+# ************************************** COST PREDICTION ***************************************
+def get_features(params):
+    """
+    This function computes the features of the cost model of a stage.
+
+    :param params: dictionary of cost parameters (see get_cost_parameters)
+    :return: list of features
+    """
+    n, duration = float(params['n']), float(params['duration'])
+    return [1., n, duration, n * duration, float(params['blocks'])]
+
+
+class CostModel(object):
+    """
+    This class predicts the duration of the stages of experiments from the history of timings of the catalog. For
+     each stage, a linear model of the features (see get_features) is fitted by least squares, per target platform
+     if enough timings were recorded for this platform ; with too few timings, the average duration is used.
+
+    :param stages: list of the stages to be predicted
+    """
+    def __init__(self, stages=None):
+        self.models = {}
+        try:
+            timings = get_timings(stages)
+        except Exception as e:
+            logger.warning("Timings could not be retrieved ({}: {})".format(e.__class__.__name__, e))
+            timings = []
+        groups = defaultdict(list)
+        for t in timings:
+            groups[(t['stage'], None)].append(t)
+            groups[(t['stage'], t['target'])].append(t)
+        for key, rows in groups.items():
+            features = numpy.array([get_features(r) for r in rows])
+            elapsed = numpy.array([r['elapsed'] for r in rows])
+            if len(rows) > features.shape[1]:
+                self.models[key] = numpy.linalg.lstsq(features, elapsed, rcond=-1)[0]
+            elif key[1] is None:
+                self.models[key] = elapsed.mean()
+
+    def predict(self, stage, params):
+        """
+        Predict the duration of a stage of an experiment.
+
+        :param stage: name of the stage
+        :param params: configuration of the experiment or its raw parameters in a campaign
+        :return: predicted duration in seconds or None if no timing was recorded for this stage
+        """
+        params = get_cost_parameters(params)
+        model = self.models.get((stage, params['target']), self.models.get((stage, None)))
+        if model is None:
+            return
+        if isinstance(model, numpy.ndarray):
+            return max(0., float(numpy.dot(model, get_features(params))))
+        return float(model)
+
+
+def estimate_makespan(costs, processes):
+    """
+    This function estimates the time for running tasks in a pool of processes, in the order they are given (each
+     task going to the first available process).
+
+    :param costs: list of the durations of the tasks
+    :param processes: number of processes
+    :return: estimated time in seconds
+    """
+    workers = [0.] * max(1, processes)
+    for cost in costs:
+        heapq.heappush(workers, heapq.heappop(workers) + cost)
+    return max(workers)
+
+
+def schedule(experiments, stages, processes=None):
+    """
+    This function orders the experiments of a campaign longest-first according to the predicted duration of the
+     given stages, so that the longest experiments do not end up running alone at the end of the campaign, and logs
+     the estimated time for the whole campaign. Stages without any recorded timing are not accounted for and, if no
+     stage can be predicted, the biggest experiments (in number of motes and duration) come first.
+
+    :param experiments: list of tuples (experiment name, configuration or raw parameters in a campaign)
+    :param stages: list of the stages to be run for each experiment
+    :param processes: number of processes of the pool (default: number of CPU's)
+    :return: the ordered list of experiments
+    """
+    model, costs, unknown = CostModel(stages), {}, set()
+    for name, params in experiments:
+        costs[name] = 0.
+        for stage in stages:
+            predicted = model.predict(stage, params)
+            if predicted is None:
+                unknown.add(stage)
+            else:
+                costs[name] += predicted
+
+    def key(experiment):
+        name, params = experiment
+        size = get_cost_parameters(params)
+        return -costs[name], -size['n'] * size['duration']
+
+    experiments = sorted(experiments, key=key)
+    if len(experiments) == 0 or len(unknown) == len(stages):
+        logger.info(" > No estimated time yet (no recorded timing)")
+        return experiments
+    eta = estimate_makespan([costs[name] for name, _ in experiments], processes or cpu_count())
+    logger.info(" > Estimated time for {} experiment(s): {}{}".format(
+        len(experiments), timedelta(seconds=int(eta)),
+        " (without stage(s) {})".format(", ".join(s for s in stages if s in unknown)) if len(unknown) > 0 else ""))
+    return experiments
+
+
+# ***************************************** PIPELINE *******************************************
+class Pipeline(object):
+    """
+    This class schedules the stages of the experiments of a campaign as a graph of tasks in the console's pool of
+     processes : each stage of an experiment is submitted as soon as its previous stage succeeded, so that the
+     simulations of the first experiments overlap with the compilation of the next ones and so forth. If a stage
+     fails, the next stages of this experiment are cancelled. As the pool runs its tasks in order of submission, at
+     most as many first stages as processes are submitted at once, the next experiments waiting for one of them to
+     be over ; the next stages of the started experiments thus do not wait behind all the first stages.
+
+    :param console: console instance (holding the pool of processes)
+    :param stages: list of commands to be chained for each experiment
+    :param listener: function called with the experiment name, the stage, its status ('PENDING' when submitted)
+                      and its result each time a stage is submitted or over
+    :param profile: 'cpu' or 'memory' for profiling the stages (see core.utils.profiling)
+    """
+    def __init__(self, console, stages=None, listener=None, profile=None):
+        self.console = console
+        self.stages = stages or PIPELINE_STAGES
+        self.listener = listener
+        self.profile = profile
+        self.limit = getattr(console, 'processes', None) or cpu_count()
+        # continuations are called in the pool's result handler thread
+        self.lock = RLock()
+        self.pending = {}
+        self.starting = set()
+        self.waiting = deque()
+        self.feeding = False
+
+    def __continuation(self, name, index):
+        def then(status, result):
+            with self.lock:
+                if self.listener is not None:
+                    self.listener(name, self.stages[index], status, result)
+                self.starting.discard(name)
+                if status != 'SUCCESS':
+                    logger.warning(" > Pipeline of '{}' stopped at stage '{}' ({})"
+                                   .format(name, self.stages[index], result))
+                    del self.pending[name]
+                elif index + 1 < len(self.stages):
+                    # the next stage is submitted before the first stage of a waiting experiment
+                    self.submit(name, index + 1)
+                else:
+                    logger.info(" > Pipeline of '{}' completed".format(name))
+                    del self.pending[name]
+                self.__feed()
+                if len(self.pending) == 0:
+                    logger.info(" > Pipeline completed")
+        return then
+
+    def __feed(self):
+        # a stage refused by its command is over as soon as it is submitted, calling this again through its
+        #  continuation ; the waiting experiments are then left to the outer call
+        if self.feeding:
+            return
+        self.feeding = True
+        try:
+            while len(self.waiting) > 0 and len(self.starting) < self.limit:
+                name, params = self.waiting.popleft()
+                self.submit(name, **params)
+        finally:
+            self.feeding = False
+
+    def submit(self, name, index=0, **kwargs):
+        """
+        Submit a stage of an experiment.
+
+        :param name: experiment name
+        :param index: index of the stage
+        :param kwargs: keyword-arguments of the command of the stage
+        """
+        command = self.stages[index]
+        with self.lock:
+            self.pending[name] = command
+            if index == 0:
+                self.starting.add(name)
+        if self.profile is not None:
+            kwargs['profile'] = self.profile
+        if command == 'make':
+            kwargs['ask'] = False
+        # when the simulations are parsed afterwards in the pipeline, 'run' does not parse them itself
+        elif command == 'run' and 'parse' in self.stages[index + 1:]:
+            kwargs['parse'] = False
+        if self.listener is not None:
+            self.listener(name, command, 'PENDING', None)
+        tasks = set(t for t, _ in self.console.get_tasks())
+        then = self.__continuation(name, index)
+        getattr(self.console, 'do_{}'.format(command))(name, then=then, **kwargs)
+        # the command may refuse to start the stage (e.g. when the experiment does not exist), then no task is opened
+        if not any(i['name'] == name for t, i in self.console.get_tasks() if t not in tasks):
+            then('FAIL', "Stage '{}' could not be started".format(command))
+
+    def start(self, experiments):
+        """
+        Start the pipeline.
+
+        :param experiments: list of tuples (experiment name, keyword-arguments of the first stage)
+        """
+        with self.lock:
+            for name, params in experiments:
+                self.pending[name] = self.stages[0]
+                self.waiting.append((name, params))
+            self.__feed()
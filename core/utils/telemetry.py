@@ -0,0 +1,213 @@
+# -*- coding: utf8 -*-
+import os
+from collections import defaultdict
+from signal import signal, SIGINT, SIG_IGN
+from six.moves.queue import Empty
+from threading import Event, Thread
+from time import time
+
+from core.utils.live import get_live_metrics
+from core.utils.tracing import begin_stage, start_trace, stop_trace
+
+
+TELEMETRY_INTERVAL = 2  # seconds
+# channel from the workers of the console's pool to the console, set by the pool's initializer (see init_worker)
+channel = None
+# monitor of the task currently executed by this process, if any
+monitor = None
+
+
+# ************************************** WORKER SIDE ***************************************
+def init_worker(queue):
+    """
+    This function initializes a worker of the console's pool of processes : keyboard interrupts are ignored (they
+     are handled by the console) and the telemetry is sent through the given queue.
+
+    :param queue: multiprocessing Queue shared with the console
+    """
+    global channel
+    signal(SIGINT, SIG_IGN)
+    channel = queue
+
+
+def get_process_tree(pid):
+    """
+    This function retrieves the descendants of a process from /proc.
+
+    :param pid: process ID
+    :return: list of the PID's of the descendants
+    """
+    children = defaultdict(list)
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open('/proc/{}/stat'.format(entry)) as f:
+                # the command name, in parentheses, may contain spaces
+                children[int(f.read().rsplit(')', 1)[1].split()[1])].append(int(entry))
+        except (IOError, OSError, IndexError, ValueError):
+            continue
+    descendants, queue = [], list(children[pid])
+    while len(queue) > 0:
+        child = queue.pop()
+        descendants.append(child)
+        queue.extend(children[child])
+    return descendants
+
+
+def get_process_usage(pid):
+    """
+    This function retrieves the CPU time (including the one of its terminated children) and the peak resident set
+     size of a process from /proc.
+
+    :param pid: process ID
+    :return: tuple (CPU time in seconds, peak RSS in bytes) or None if the process does not exist anymore
+    """
+    try:
+        with open('/proc/{}/stat'.format(pid)) as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/{}/status'.format(pid)) as f:
+            hwm = [l.split()[1] for l in f if l.startswith('VmHWM:')]
+    except (IOError, OSError):
+        return
+    # utime, stime, cutime and cstime are the fields 14 to 17 of the stat file (11 to 14 after the command name)
+    cpu = sum(int(x) for x in fields[11:15]) / float(os.sysconf('SC_CLK_TCK'))
+    return cpu, int(hwm[0]) * 1024 if len(hwm) > 0 else 0
+
+
+class TaskMonitor(Thread):
+    """
+    This class periodically samples the resources used by the task executed in the current worker and by its
+     child processes (e.g. make, Cooja's JVM), then sends them to the console with the current stage and the
+     simulated-time progress.
+    """
+    def __init__(self, key, path=None, interval=TELEMETRY_INTERVAL):
+        super(TaskMonitor, self).__init__()
+        self.daemon = True
+        self.key = key
+        self.path = path
+        self.interval = interval
+        self.stopped = Event()
+        self.times = os.times()
+        self.info = {'started': time(), 'stage': None, 'cpu': 0., 'rss': 0, 'progress': None}
+
+    def sample(self):
+        """
+        Update the resources used by the task since its start.
+        """
+        t = os.times()
+        cpu = sum(t[:4]) - sum(self.times[:4])
+        rss = 0
+        if os.path.isdir('/proc'):
+            for pid in get_process_tree(os.getpid()):
+                usage = get_process_usage(pid)
+                if usage is not None:
+                    cpu += usage[0]
+                    rss += usage[1]
+        self.info['cpu'] = max(self.info['cpu'], cpu)
+        self.info['rss'] = max(self.info['rss'], rss)
+        if self.path is not None and self.info['stage'] == 'simulate':
+            metrics = get_live_metrics(self.path)
+            # the simulation without the malicious mote is run first, then the one with
+            self.info['progress'] = sum((metrics.get(sim) or {}).get('progress') or 0.
+                                        for sim in ['without', 'with']) / 2.
+
+    def send(self, **info):
+        """
+        Send the telemetry of the task to the console.
+
+        :param info: values to be updated before sending
+        """
+        self.info.update(info)
+        if channel is not None:
+            try:
+                channel.put_nowait((self.key, dict(self.info)))
+            except Exception:
+                pass  # telemetry is best effort ; a full or closed channel must not break the task
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+            self.send()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.sample()
+        self.send(stage=None, ended=time())
+
+
+def start_task(key, path=None):
+    """
+    This function starts the telemetry of a task in the current worker, including the tracing of its stages (see
+     core.utils.tracing).
+
+    :param key: task identifier, as displayed in the console (e.g. 'my-simulation[run]')
+    :param path: path to the experiment of the task, if any
+    """
+    global monitor
+    start_trace()
+    monitor = TaskMonitor(key, path)
+    monitor.send()
+    monitor.start()
+
+
+def stop_task():
+    """
+    This function stops the telemetry of the task of the current worker, sending its final state and saving its
+     trace.
+    """
+    global monitor
+    if monitor is not None:
+        monitor.stop()
+        stop_trace(monitor.key, monitor.path)
+        monitor = None
+
+
+def stage(name):
+    """
+    This function marks the beginning of a stage of the task executed in the current worker (e.g. 'compile'),
+     which ends the previous stage, for both the telemetry and the trace of the task.
+
+    :param name: name of the stage
+    """
+    begin_stage(name)
+    if monitor is not None:
+        monitor.send(stage=name)
+
+
+# ************************************** CONSOLE SIDE **************************************
+def collect(queue, telemetry):
+    """
+    This function consumes the telemetry sent by the workers so far.
+
+    :param queue: multiprocessing Queue shared with the workers
+    :param telemetry: dictionary with task identifiers as keys and their last telemetry as values (updated)
+    :return: the updated dictionary
+    """
+    while True:
+        try:
+            key, info = queue.get_nowait()
+        except Empty:
+            break
+        telemetry[key] = info
+    return telemetry
+
+
+def format_telemetry(info):
+    """
+    This function formats the telemetry of a task for the console's status table.
+
+    :param info: telemetry of the task (as sent by TaskMonitor)
+    :return: list of strings (stage, elapsed time, CPU time, peak RSS, progress)
+    """
+    if info is None:
+        return ['-'] * 5
+    elapsed = int((info.get('ended') or time()) - info['started'])
+    return [
+        info['stage'] or '-',
+        '{}:{:02d}:{:02d}'.format(elapsed // 3600, elapsed // 60 % 60, elapsed % 60),
+        '{:.1f}s'.format(info['cpu']),
+        '{:.0f}MB'.format(info['rss'] / 1024. ** 2) if info['rss'] > 0 else '-',
+        '{:.0f}%'.format(info['progress']) if info['progress'] is not None else '-',
+    ]
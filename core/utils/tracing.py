@@ -0,0 +1,182 @@
+# -*- coding: utf8 -*-
+import json
+import os
+from contextlib import contextmanager
+from os.path import basename, exists, join, normpath
+from time import time
+try:
+    from resource import getrusage, RUSAGE_CHILDREN, RUSAGE_SELF
+except ImportError:  # not available on Windows
+    getrusage = None
+
+from core.conf.constants import TRACES_FOLDER
+
+
+# spans recorded for the task currently executed by this process (see start_trace), None if it is not traced
+spans = None
+# span of the current stage of this task (see begin_stage)
+current = None
+
+
+# ************************************** WORKER SIDE ***************************************
+def get_usage():
+    """
+    This function retrieves the resources used so far by the current process and by its terminated children.
+
+    :return: tuple (CPU time in seconds, peak RSS in bytes of the process or of its largest terminated child)
+    """
+    cpu = sum(os.times()[:4])
+    if getrusage is None:
+        return cpu, 0
+    # ru_maxrss is given in kilobytes on Linux
+    return cpu, max(getrusage(RUSAGE_SELF).ru_maxrss, getrusage(RUSAGE_CHILDREN).ru_maxrss) * 1024
+
+
+def open_span(name, category, **args):
+    """
+    This function starts recording a span of the current task.
+
+    :param name: name of the span
+    :param category: 'stage' for the stages of the task (see begin_stage) or 'step' for the steps within a stage
+    :param args: additional information about the span
+    :return: the span
+    """
+    cpu, _ = get_usage()
+    span = {'name': name, 'cat': category, 'pid': os.getpid(), 'start': time(), 'cpu': cpu, 'args': args}
+    spans.append(span)
+    return span
+
+
+def close_span(span):
+    """
+    This function ends a span, computing its duration and the CPU time used during the span.
+
+    :param span: span as returned by open_span
+    """
+    cpu, rss = get_usage()
+    span.update(end=time(), cpu=round(cpu - span['cpu'], 3), rss=rss)
+
+
+def start_trace():
+    """
+    This function starts the tracing of a task in the current worker.
+    """
+    global spans, current
+    spans, current = [], None
+
+
+def begin_stage(name=None):
+    """
+    This function ends the current stage of the traced task, if any, then starts the given one.
+
+    :param name: name of the new stage (None for only ending the current stage)
+    """
+    global current
+    if spans is None:
+        return
+    if current is not None:
+        close_span(current)
+    current = None if name is None else open_span(name, 'stage')
+
+
+@contextmanager
+def trace(name, **args):
+    """
+    This context manager records a step of the traced task (e.g. a make target or a parser), if any.
+
+    :param name: name of the step
+    :param args: additional information about the step
+    """
+    if spans is None:
+        yield
+        return
+    span = open_span(name, 'step', **args)
+    try:
+        yield
+    finally:
+        close_span(span)
+
+
+def stop_trace(key, path=None):
+    """
+    This function stops the tracing of the task of the current worker and saves its spans with the trace of its
+     experiment (see get_trace_file), replacing the ones of the previous execution of the same task.
+
+    :param key: task identifier, as displayed in the console (e.g. 'my-simulation[run]')
+    :param path: path to the experiment of the task (if None, the spans are dropped)
+    """
+    global spans
+    begin_stage(None)
+    recorded, spans = spans, None
+    if recorded is None or path is None or len(recorded) == 0:
+        return
+    trace_file = get_trace_file(path)
+    tasks = read_trace(path)
+    tasks[key] = {'started': recorded[0]['start'], 'ended': max(s['end'] for s in recorded), 'spans': recorded}
+    if not os.path.isdir(TRACES_FOLDER):
+        try:
+            os.makedirs(TRACES_FOLDER)
+        except OSError:  # occurs when another worker created the folder in the meantime
+            pass
+    with open(trace_file + '.tmp', 'w') as f:
+        json.dump({'experiment': basename(normpath(path)), 'tasks': tasks}, f, indent=2)
+    os.rename(trace_file + '.tmp', trace_file)
+
+
+# ************************************** CONSOLE SIDE **************************************
+def get_trace_file(path):
+    """
+    This function gets the path to the trace of an experiment.
+
+    :param path: path to the experiment
+    :return: path to the JSON trace
+    """
+    return join(TRACES_FOLDER, '{}.json'.format(basename(normpath(path))))
+
+
+def read_trace(path):
+    """
+    This function reads the trace of an experiment.
+
+    :param path: path to the experiment
+    :return: dictionary with task identifiers as keys and dictionaries with 'started', 'ended' and 'spans' as values
+    """
+    trace_file = get_trace_file(path)
+    if not exists(trace_file):
+        return {}
+    try:
+        with open(trace_file) as f:
+            return json.load(f).get('tasks', {})
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def export_chrome_trace(paths, output):
+    """
+    This function exports the traces of experiments in the trace event format of Chrome (to be opened in
+     chrome://tracing or Perfetto), with one process per worker and the steps nested in the stages.
+
+    :param paths: list of paths to experiments
+    :param output: path to the JSON file to be written
+    :return: number of exported spans
+    """
+    events, pids = [], set()
+    for path in paths:
+        for key, task in sorted(read_trace(path).items(), key=lambda x: x[1]['started']):
+            for span in task['spans']:
+                pids.add(span['pid'])
+                events.append({
+                    'name': span['name'],
+                    'cat': span['cat'],
+                    'ph': 'X',
+                    'ts': int(span['start'] * 10 ** 6),
+                    'dur': int((span['end'] - span['start']) * 10 ** 6),
+                    'pid': span['pid'],
+                    'tid': span['pid'],
+                    'args': dict(span['args'], task=key, cpu=span['cpu'], rss=span['rss']),
+                })
+    events.extend({'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': 'worker {}'.format(pid)}}
+                  for pid in sorted(pids))
+    with open(output, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    return len(events) - len(pids)
@@ -3,6 +3,7 @@
 from fabric.api import local, settings, task
 
 from core.commands import get_commands
+from core.daemon import delegate
 
 
 @task
@@ -12,5 +13,12 @@ def console():
         local('python main.py')
 
 
+@task
+def daemon():
+    """ Start framework's daemon in the foreground. """
+    with settings(remote_interrupt=False):
+        local('python main.py daemon')
+
+
 for name, func in get_commands(exclude=['list']):
-    globals()[name] = task(func)
+    globals()[name] = task(delegate(name, func))
@@ -1,7 +1,12 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-from core.console import FrameworkConsole
+import sys
+
+from core.daemon import ClientConsole, FrameworkDaemon
 
 
 if __name__ == '__main__':
-    FrameworkConsole(parallel=True).cmdloop()
+    if sys.argv[1:] == ['daemon']:
+        FrameworkDaemon().serve()
+    else:
+        ClientConsole().cmdloop()
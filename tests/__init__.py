@@ -6,3 +6,5 @@ setup(silent=True)
 from .setup import Test1Config, Test2CoojaSetup
 from .experiment import Test3Make, Test4Remake, Test5Clean
 from .campaign import Test6Prepare, Test7Drop
+from .parser import Test8Parser
+from .scheduler import Test9Scheduler
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import pandas
+import unittest
+from os import makedirs
+from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from core.utils.parser import compute_energy, get_mote_ids, get_relationships
+
+
+class ParserTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.experiment = mkdtemp(prefix='rpla-test-')
+        cls.path = join(cls.experiment, 'with-malicious')
+        for folder in ['data', 'results']:
+            makedirs(join(cls.path, folder))
+        with open(join(cls.experiment, 'simulation.conf'), 'w') as f:
+            f.write("target = 'z1'\n")
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.experiment, ignore_errors=True)
+
+
+class Test8Parser(ParserTestCase):
+    """ 8. Parse PCAP addresses, relationships and PowerTracker times """
+
+    @classmethod
+    def setUpClass(cls):
+        super(Test8Parser, cls).setUpClass()
+        # two samples of cumulative times (in seconds) per mote, interleaved as PowerTrackerConverter writes them ;
+        #  mote 1 keeps its radio on 20% of the time while mote 2 never turns it on
+        with open(join(cls.path, 'results', 'powertracker.csv'), 'w') as f:
+            f.write("mote_id,monitored_time,on_time,tx_time,rx_time,int_time\n"
+                    "1,10.0,2.0,0.5,0.5,0.0\n"
+                    "2,10.0,0.0,0.0,0.0,0.0\n"
+                    "1,20.0,4.0,1.0,1.0,0.0\n"
+                    "2,20.0,0.0,0.0,0.0,0.0\n")
+        with open(join(cls.path, 'data', 'relationships.log'), 'w') as f:
+            f.write("1000\tID:1\t#L 0 1\n"
+                    "2000\tID:2\t#L 0 1\n"
+                    "3000\tID:2\t#L 0 0\n"
+                    "3001\tID:2\t#L 1 1\n"
+                    "not a relationship\n")
+        cls.lifetime = compute_energy(cls.path)
+
+    def test1_mote_ids(self):
+        """ > Are mote IDs derived from Sky-like and Z1-like addresses ? """
+        addresses = pandas.Series(['00:12:74:02:00:02:02:02', 'c1:0c:00:00:00:00:00:05', None])
+        self.assertEqual(list(get_mote_ids(addresses)), [2, 5, -1])
+
+    def test2_relationships(self):
+        """ > Is the last parent of each mote retrieved ? """
+        self.assertEqual(get_relationships(self.path), ({1: 0, 2: 1}, True))
+
+    def test3_energy_per_sample(self):
+        """ > Is the energy of each sample computed from the deltas of the cumulative times ? """
+        energy = pandas.read_csv(join(self.path, 'results', 'energy.csv'))
+        self.assertEqual(list(energy['sample']), [0, 1, 0, 1])
+        # mote 1 : 8s off, 1s listening, 0.5s in TX and 0.5s in RX at 3V per sample
+        for e, expected in zip(energy['energy'], [111.18, 111.18, .6, .6]):
+            self.assertAlmostEqual(e, expected, places=6)
+        self.assertAlmostEqual(list(energy['cumulative_energy'])[1], 222.36, places=6)
+
+    def test4_energy_summary(self):
+        """ > Are the average power and the network lifetime estimated ? """
+        summary = pandas.read_csv(join(self.path, 'results', 'energy-summary.csv'), index_col='mote_id')
+        self.assertAlmostEqual(summary.loc[1, 'avg_power'], 11.118, places=6)
+        self.assertAlmostEqual(summary.loc[2, 'avg_power'], .06, places=6)
+        # the first mote to deplete its 2500mAh battery gives the lifetime of the network
+        self.assertAlmostEqual(self.lifetime, 2500. * 3 / 11.118, places=6)
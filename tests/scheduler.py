@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+from itertools import product
+from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from core.utils import catalog
+from core.utils.catalog import connect, query_catalog, CATALOG_COLUMNS, TIMINGS_COLUMNS
+from core.utils.scheduler import estimate_makespan, CostModel
+
+
+EXPERIMENTS = [
+    {'name': 'small', 'target': 'z1', 'n': 5, 'duration': 60, 'blocks': ',hello-flood,'},
+    {'name': 'medium', 'target': 'sky', 'n': 20, 'duration': 120, 'blocks': ',hello-flood,increased-version,'},
+    {'name': 'big', 'target': 'z1', 'n': 50, 'duration': 300, 'blocks': ',increased-version,'},
+]
+
+
+def run_time(n, duration, blocks):
+    """ Duration of the 'run' stage of the recorded timings, linear in the features of the cost model """
+    return 2. + .1 * n + .01 * duration + .001 * n * duration + 3. * blocks
+
+
+class SchedulerTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # the catalog is redirected to a temporary folder so that the one of the experiments is left untouched
+        cls.folder, cls.backup = mkdtemp(prefix='rpla-test-'), (catalog.CACHE_FOLDER, catalog.CATALOG)
+        catalog.CACHE_FOLDER, catalog.CATALOG = cls.folder, join(cls.folder, 'catalog.db')
+        timings = [{'name': 'e{}'.format(i), 'stage': 'run', 'elapsed': run_time(*f), 'at': '', 'target': 'z1',
+                    'n': f[0], 'duration': f[1], 'blocks': f[2]}
+                   for i, f in enumerate(product([5, 10, 20], [60, 120], [1, 2]))]
+        timings += [{'name': 'e{}'.format(i), 'stage': 'make', 'elapsed': e, 'at': '', 'target': 'z1', 'n': 5,
+                     'duration': 60, 'blocks': 1} for i, e in enumerate([10., 20.])]
+        db = connect()
+        try:
+            with db:
+                for t in timings:
+                    db.execute('INSERT INTO timings ({}) VALUES ({})'.format(', '.join(TIMINGS_COLUMNS.keys()),
+                                                                            ', '.join('?' * len(TIMINGS_COLUMNS))),
+                               [t[c] for c in TIMINGS_COLUMNS.keys()])
+                for e in EXPERIMENTS:
+                    db.execute('INSERT INTO experiments ({}) VALUES ({})'.format(', '.join(e.keys()),
+                                                                                ', '.join('?' * len(e))),
+                               list(e.values()))
+        finally:
+            db.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        catalog.CACHE_FOLDER, catalog.CATALOG = cls.backup
+        rmtree(cls.folder, ignore_errors=True)
+
+
+class Test9Scheduler(SchedulerTestCase):
+    """ 9. Query the catalog and predict the cost of experiments """
+
+    def test1_query_conditions(self):
+        """ > Are experiments matched by comparisons and sorted ? """
+        names = [e['name'] for e in query_catalog(['n>5'], sort='-n')]
+        self.assertEqual(names, ['big', 'medium'])
+        names = [e['name'] for e in query_catalog(['duration<=120'], sort='n', limit=1)]
+        self.assertEqual(names, ['small'])
+
+    def test2_query_filters(self):
+        """ > Are experiments matched by equality and by building block ? """
+        names = sorted(e['name'] for e in query_catalog(filters={'blocks': 'increased-version'}))
+        self.assertEqual(names, ['big', 'medium'])
+        names = [e['name'] for e in query_catalog(filters={'target': 'z1', 'blocks': 'hello-flood'})]
+        self.assertEqual(names, ['small'])
+        self.assertEqual(set(query_catalog(limit=1)[0].keys()), set(CATALOG_COLUMNS.keys()))
+
+    def test3_query_errors(self):
+        """ > Are unknown fields and malformed conditions rejected ? """
+        self.assertRaises(ValueError, query_catalog, ['unknown>1'])
+        self.assertRaises(ValueError, query_catalog, ['n=5'])
+        self.assertRaises(ValueError, query_catalog, sort='-unknown')
+
+    def test4_cost_model_fit(self):
+        """ > Is the duration of a stage predicted from the fitted linear model ? """
+        model = CostModel(['run'])
+        params = {'target': 'z1', 'n': 30, 'duration': 600, 'blocks': ['hello-flood', 'increased-version']}
+        self.assertAlmostEqual(model.predict('run', params), run_time(30, 600, 2), places=6)
+        # without timings for its platform, the model of all the platforms is used
+        params['target'] = 'sky'
+        self.assertAlmostEqual(model.predict('run', params), run_time(30, 600, 2), places=6)
+
+    def test5_cost_model_fallback(self):
+        """ > Is the average duration used with too few timings and nothing predicted without timings ? """
+        model = CostModel(['make', 'run'])
+        params = {'target': 'z1', 'n': 30, 'duration': 600, 'blocks': ['hello-flood']}
+        self.assertAlmostEqual(model.predict('make', params), 15., places=6)
+        self.assertIsNone(model.predict('parse', params))
+
+    def test6_makespan(self):
+        """ > Is the time for running tasks in a pool of processes estimated ? """
+        self.assertEqual(estimate_makespan([], 2), 0.)
+        self.assertEqual(estimate_makespan([4., 3., 2., 1.], 1), 10.)
+        self.assertEqual(estimate_makespan([4., 3., 2., 1.], 2), 5.)
+        # tasks are given to the first available process in their order, hence a longest task last is worse
+        self.assertEqual(estimate_makespan([1., 2., 3., 4.], 2), 6.)
+        self.assertEqual(estimate_makespan([4., 3.], 0), 7.)